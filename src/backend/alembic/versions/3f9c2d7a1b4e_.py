@@ -0,0 +1,31 @@
+"""Add message conversation_id, position index
+
+Revision ID: 3f9c2d7a1b4e
+Revises: c15b848babe3
+Create Date: 2024-05-14 10:12:41.218304
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2d7a1b4e"
+down_revision: Union[str, None] = "c15b848babe3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "message_conversation_id_position",
+        "messages",
+        ["conversation_id", "position"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("message_conversation_id_position", table_name="messages")
@@ -0,0 +1,44 @@
+"""Add file ingestion status
+
+Revision ID: 5d1e7f3b9a20
+Revises: 8e41d0c6a2f5
+Create Date: 2024-05-16 11:02:45.118327
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1e7f3b9a20"
+down_revision: Union[str, None] = "8e41d0c6a2f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "files",
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING",
+                "PROCESSING",
+                "READY",
+                "FAILED",
+                name="filestatus",
+                native_enum=False,
+            ),
+            nullable=False,
+            server_default="PENDING",
+        ),
+    )
+    # Files uploaded before ingestion existed are indexed by their first chat turn
+    # and usable as is, only new uploads wait for the ingestion workers
+    op.execute("UPDATE files SET status = 'READY'")
+
+
+def downgrade() -> None:
+    op.drop_column("files", "status")
@@ -0,0 +1,31 @@
+"""Add conversation user_id, updated_at index
+
+Revision ID: 8e41d0c6a2f5
+Revises: 3f9c2d7a1b4e
+Create Date: 2024-05-15 09:47:03.581920
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e41d0c6a2f5"
+down_revision: Union[str, None] = "3f9c2d7a1b4e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "conversation_user_id_updated_at",
+        "conversations",
+        ["user_id", sa.text("updated_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("conversation_user_id_updated_at", table_name="conversations")
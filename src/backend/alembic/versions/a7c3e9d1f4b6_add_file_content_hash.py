@@ -0,0 +1,26 @@
+"""Add file content hash
+
+Revision ID: a7c3e9d1f4b6
+Revises: 5d1e7f3b9a20
+Create Date: 2024-05-17 14:21:09.402118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e9d1f4b6"
+down_revision: Union[str, None] = "5d1e7f3b9a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("files", sa.Column("content_hash", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("files", "content_hash")
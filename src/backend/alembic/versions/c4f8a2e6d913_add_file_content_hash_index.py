@@ -0,0 +1,25 @@
+"""Add file content_hash index
+
+Revision ID: c4f8a2e6d913
+Revises: a7c3e9d1f4b6
+Create Date: 2024-05-18 10:12:37.640251
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f8a2e6d913"
+down_revision: Union[str, None] = "a7c3e9d1f4b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("file_content_hash", "files", ["content_hash"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("file_content_hash", table_name="files")
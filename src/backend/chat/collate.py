@@ -1,12 +1,36 @@
+import hashlib
+import os
+from distutils.util import strtobool
 from itertools import zip_longest
 from typing import Any, Dict, List
 
+from backend.chat.local_rerank import local_reranker
 from backend.model_deployments.base import BaseDeployment
+from backend.services.concurrency import get_executor
+from backend.services.logger import get_logger
+
+# Number of documents kept per search query after reranking, 0 to keep all of them
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "0"))
+# Rerank with a local BM25 scorer when the deployment does not support rerank
+LOCAL_RERANK_ENABLED = bool(strtobool(os.getenv("LOCAL_RERANK_ENABLED", "true")))
+# Number of documents kept per search query by the local reranker when RERANK_TOP_N
+# keeps all of them, 0 to keep all of them
+LOCAL_RERANK_TOP_N = int(os.getenv("LOCAL_RERANK_TOP_N", "10"))
+# How documents of the search queries are combined, interleave or fusion
+DOCUMENT_COMBINE_MODE = os.getenv("DOCUMENT_COMBINE_MODE", "interleave")
+# Budget of the documents combined in fusion mode, 0 for no limit
+DOCUMENT_MAX_COUNT = int(os.getenv("DOCUMENT_MAX_COUNT", "0"))
+DOCUMENT_MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "0"))
+# Constant of reciprocal rank fusion, higher values flatten the rank weights
+RRF_K = 60
+
+logger = get_logger()
 
 
 def combine_documents(
     documents: Dict[str, List[Dict[str, Any]]],
     model: BaseDeployment,
+    mode: str | None = None,
 ) -> List[Dict[str, Any]]:
     """
     Combines documents from different retrievers and reranks them.
@@ -14,53 +38,162 @@ def combine_documents(
     Args:
         documents (Dict[str, List[Dict[str, Any]]]): Dictionary from queries of lists of documents.
         model (BaseDeployment): Model deployment.
+        mode (str | None): interleave or fusion, defaults to DOCUMENT_COMBINE_MODE.
 
     Returns:
         List[Dict[str, Any]]: List of combined documents.
     """
     reranked_documents = rerank(documents, model)
+
+    if (mode or DOCUMENT_COMBINE_MODE) == "fusion":
+        return fuse(
+            reranked_documents,
+            max_documents=DOCUMENT_MAX_COUNT,
+            max_chars=DOCUMENT_MAX_CHARS,
+        )
     return interleave(reranked_documents)
 
 
 def rerank(
-    documents_by_query: Dict[str, List[Dict[str, Any]]], model: BaseDeployment
+    documents_by_query: Dict[str, List[Dict[str, Any]]],
+    model: BaseDeployment,
+    top_n: int | None = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Takes a dictionary from queries of lists of documents and
     internally rerank the documents for each query e.g:
     [{"q1":[1, 2, 3],"q2": [4, 5, 6]] -> [{"q1":[2 , 3, 1],"q2": [4, 6, 5]]
 
+    The rerank calls of the queries run concurrently. Documents with the same text
+    are only sent once across the queries, with the first query that retrieved
+    them, and their score is used by every query that contains them. Documents
+    without text are ranked on their title or snippet, or kept after the ranked
+    documents if they have neither.
+
     Args:
         documents_by_query (Dict[str, List[Dict[str, Any]]]): Dictionary from queries of lists of documents.
-        model (BaseDeployment): Model deployment.
+        model (BaseDeployment): Model deployment, replaced by the local reranker
+            if it does not support rerank.
+        top_n (int | None): Number of documents kept per query, defaults to RERANK_TOP_N,
+            or LOCAL_RERANK_TOP_N for the local reranker.
 
     Returns:
         Dict[str, List[Dict[str, Any]]]: Dictionary from queries of lists of reranked documents.
     """
-    # If rerank is not enabled return documents as is:
+    # Deployments without rerank use the local reranker, or return documents as is
     if not model.rerank_enabled:
-        return documents_by_query
+        if not LOCAL_RERANK_ENABLED:
+            return documents_by_query
+        model = local_reranker
+        if top_n is None:
+            top_n = RERANK_TOP_N or LOCAL_RERANK_TOP_N
 
-    # rerank the documents by each query
-    all_rerank_docs = {}
+    if top_n is None:
+        top_n = RERANK_TOP_N
+
+    texts_by_query = {}
+    seen_texts = set()
     for query, documents in documents_by_query.items():
-        # Only rerank on text of document
-        # TODO handle no text in document
-        docs_to_rerank = [doc["text"] for doc in documents]
+        texts_by_query[query] = []
+        for document in documents:
+            text = get_rerank_text(document)
+            if text and text not in seen_texts:
+                seen_texts.add(text)
+                texts_by_query[query].append(text)
 
-        # If no documents to rerank, continue to the next query
-        if not docs_to_rerank:
+    executor = get_executor()
+    futures = {
+        query: executor.submit(score_texts, query, texts, model)
+        for query, texts in texts_by_query.items()
+        if texts
+    }
+
+    scores = {}
+    failed_queries = set()
+    for query, future in futures.items():
+        try:
+            scores.update(future.result())
+        except Exception as e:
+            logger.warning(f"Rerank failed for query: {query} - {str(e)}")
+            failed_queries.add(query)
+
+    all_rerank_docs = {}
+    for query, documents in documents_by_query.items():
+        if not documents:
             continue
 
-        res = model.invoke_rerank(query=query, documents=docs_to_rerank)
-        # Sort the results by relevance score
-        res.results.sort(key=lambda x: x.relevance_score, reverse=True)
-        # Map the results back to the original documents
-        all_rerank_docs[query] = [documents[r.index] for r in res.results]
+        if query in failed_queries:
+            # Keep the retriever order rather than dropping the documents
+            all_rerank_docs[query] = documents[: top_n or None]
+        else:
+            all_rerank_docs[query] = rank_documents(documents, scores)[: top_n or None]
 
     return all_rerank_docs
 
 
+def score_texts(
+    query: str, texts: List[str], model: BaseDeployment
+) -> Dict[str, float]:
+    """
+    Score texts against a single query.
+
+    Args:
+        query (str): Search query.
+        texts (List[str]): Distinct document texts.
+        model (BaseDeployment): Model deployment.
+
+    Returns:
+        Dict[str, float]: Relevance score per text.
+    """
+    res = model.invoke_rerank(query=query, documents=texts)
+    return {texts[r.index]: r.relevance_score for r in res.results}
+
+
+def rank_documents(
+    documents: List[Dict[str, Any]], scores: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """
+    Sort the documents of a query by the scores of their texts.
+
+    Args:
+        documents (List[Dict[str, Any]]): Documents retrieved for the query.
+        scores (Dict[str, float]): Relevance score per text.
+
+    Returns:
+        List[Dict[str, Any]]: Documents sorted by relevance, without duplicates,
+            followed by the documents without score in their retriever order.
+    """
+    documents_by_text = {}
+    unranked_documents = []
+    for document in documents:
+        text = get_rerank_text(document)
+        if text in scores:
+            documents_by_text.setdefault(text, document)
+        else:
+            unranked_documents.append(document)
+
+    # sorted is stable, texts with the same score keep their retriever order
+    texts = sorted(documents_by_text, key=lambda text: scores[text], reverse=True)
+    return [documents_by_text[text] for text in texts] + unranked_documents
+
+
+def get_rerank_text(document: Dict[str, Any]) -> str:
+    """
+    Get the text a document is reranked on.
+
+    Args:
+        document (Dict[str, Any]): Document.
+
+    Returns:
+        str: Text, falling back to the title or snippet, empty if the document has none.
+    """
+    for field in ("text", "title", "snippet"):
+        value = document.get(field)
+        if isinstance(value, str) and value.strip():
+            return value
+    return ""
+
+
 def interleave(documents: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
     """
     Takes a dictionary from queries of lists of documents and interleaves them
@@ -78,3 +211,68 @@ def interleave(documents: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any
         for y in x
         if y is not None
     ]
+
+
+def fuse(
+    documents: Dict[str, List[Dict[str, Any]]],
+    max_documents: int = 0,
+    max_chars: int = 0,
+    k: int = RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    Takes a dictionary from queries of lists of documents and merges them with
+    reciprocal rank fusion, each document scores the sum of 1 / (k + rank) over
+    the queries that returned it. Duplicates, the same URL and text, are merged
+    into their first occurrence.
+
+    Args:
+        documents (Dict[str, List[Dict[str, Any]]]): Dictionary from queries of lists of documents.
+        max_documents (int): Maximum number of documents returned, 0 for no limit.
+        max_chars (int): Maximum number of text characters returned, 0 for no limit.
+        k (int): Reciprocal rank fusion constant.
+
+    Returns:
+        List[Dict[str, Any]]: Documents sorted by fused score, within the budget.
+    """
+    scores = {}
+    fused_documents = {}
+    for query_documents in documents.values():
+        for rank, document in enumerate(query_documents, start=1):
+            key = get_document_key(document)
+            fused_documents.setdefault(key, document)
+            scores[key] = scores.get(key, 0) + 1 / (k + rank)
+
+    # sorted is stable, documents with the same score keep their first seen order
+    keys = sorted(fused_documents, key=lambda key: scores[key], reverse=True)
+
+    combined_documents = []
+    total_chars = 0
+    for key in keys:
+        if max_documents and len(combined_documents) >= max_documents:
+            break
+
+        document = fused_documents[key]
+        chars = len(get_rerank_text(document))
+        # Skip documents over the budget, a shorter one may still fit
+        if max_chars and total_chars + chars > max_chars:
+            continue
+
+        total_chars += chars
+        combined_documents.append(document)
+
+    return combined_documents
+
+
+def get_document_key(document: Dict[str, Any]) -> tuple[str, str]:
+    """
+    Get the key identifying duplicate documents.
+
+    Args:
+        document (Dict[str, Any]): Document.
+
+    Returns:
+        tuple[str, str]: URL and hash of the whitespace and case normalized text.
+    """
+    text = " ".join(get_rerank_text(document).lower().split())
+    text_hash = hashlib.sha1(text.encode()).hexdigest()
+    return document.get("url") or "", text_hash
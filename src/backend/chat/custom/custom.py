@@ -1,4 +1,3 @@
-import logging
 from typing import Any
 
 from fastapi import HTTPException
@@ -6,11 +5,21 @@ from fastapi import HTTPException
 from backend.chat.base import BaseChat
 from backend.chat.collate import combine_documents
 from backend.chat.custom.utils import get_deployment
+from backend.chat.retrieval import (
+    SPECULATIVE_RETRIEVAL_ENABLED,
+    get_retriever_name,
+    retrieve_documents,
+    retrieve_speculatively,
+)
+from backend.chat.search_queries import generate_search_queries
+from backend.chat.tool_executor import ToolCallExecutor
 from backend.config.tools import AVAILABLE_TOOLS, ToolName
 from backend.model_deployments.base import BaseDeployment
 from backend.schemas.cohere_chat import CohereChatRequest
 from backend.schemas.tool import Category, Tool
 from backend.services.logger import get_logger
+from backend.services.tracing import ChatTrace
+from backend.tools.cache import cache_tool
 
 
 class CustomChat(BaseChat):
@@ -29,6 +38,8 @@ class CustomChat(BaseChat):
         Returns:
             Generator[StreamResponse, None, None]: Chat response.
         """
+        trace = kwargs.get("trace") or ChatTrace()
+
         # Choose the deployment model - validation already performed by request validator
         deployment_model = get_deployment(kwargs.get("deployment_name"), **kwargs)
         self.logger.info(f"Using deployment {deployment_model.__class__.__name__}")
@@ -49,9 +60,19 @@ class CustomChat(BaseChat):
                     function_tools.append(Tool(**available_tool.model_dump()))
 
             if len(function_tools) > 0:
-                tool_results = self.get_tool_results(
-                    chat_request.message, function_tools, deployment_model
-                )
+                with trace.span("tool_calls"):
+                    tool_results = self.get_tool_results(
+                        chat_request.message, function_tools, deployment_model
+                    )
+                for tool_result in tool_results:
+                    self.logger.info(
+                        f"Tool {tool_result['call'].name} took {tool_result['duration_ms']:.0f}ms"
+                    )
+                # Only the call and outputs are sent to the model
+                tool_results = [
+                    {"call": tool_result["call"], "outputs": tool_result["outputs"]}
+                    for tool_result in tool_results
+                ]
 
                 chat_request.tools = None
                 if kwargs.get("stream", True) is True:
@@ -65,35 +86,44 @@ class CustomChat(BaseChat):
                         tool_results=tool_results,
                     )
 
-            queries = deployment_model.invoke_search_queries(
-                chat_request.message, chat_history
-            )
-            self.logger.info(f"Search queries generated: {queries}")
-
             # Fetch Documents
             retrievers = self.get_retrievers(
                 kwargs.get("file_paths", []), [tool.name for tool in chat_request.tools]
             )
             self.logger.info(
-                f"Using retrievers: {[retriever.__class__.__name__ for retriever in retrievers]}"
+                f"Using retrievers: {[get_retriever_name(retriever) for retriever in retrievers]}"
             )
 
-            # No search queries were generated but retrievers were selected, use user message as query
-            if len(queries) == 0 and len(retrievers) > 0:
-                queries = [chat_request.message]
+            def get_queries() -> list[str]:
+                with trace.span("search_queries"):
+                    queries = generate_search_queries(
+                        deployment_model,
+                        chat_request.message,
+                        chat_history,
+                        model=chat_request.model,
+                    )
+                self.logger.info(f"Search queries generated: {queries}")
+                return queries
 
-            all_documents = {}
-            # TODO: call in parallel and error handling
             # TODO: merge with regular function tools after multihop implemented
-            for retriever in retrievers:
-                for query in queries:
-                    parameters = {"query": query}
-                    all_documents.setdefault(query, []).extend(
-                        retriever.call(parameters)
+            if SPECULATIVE_RETRIEVAL_ENABLED and len(retrievers) > 0:
+                with trace.span("retrieval"):
+                    _, all_documents = retrieve_speculatively(
+                        retrievers, chat_request.message, get_queries, trace=trace
                     )
+            else:
+                queries = get_queries()
+
+                # No search queries were generated but retrievers were selected, use user message as query
+                if len(queries) == 0 and len(retrievers) > 0:
+                    queries = [chat_request.message]
+
+                with trace.span("retrieval"):
+                    all_documents = retrieve_documents(retrievers, queries, trace=trace)
 
             # Collate Documents
-            documents = combine_documents(all_documents, deployment_model)
+            with trace.span("rerank"):
+                documents = combine_documents(all_documents, deployment_model)
             chat_request.documents = documents
             chat_request.tools = []
 
@@ -139,6 +169,8 @@ class CustomChat(BaseChat):
             if tool.category == Category.FileLoader and file_paths is not None:
                 for file_path in file_paths:
                     retrievers.append(tool.implementation(file_path, **tool.kwargs))
+            elif tool.category == Category.DataLoader:
+                retrievers.append(cache_tool(tool, tool.implementation(**tool.kwargs)))
             elif tool.category != Category.FileLoader:
                 retrievers.append(tool.implementation(**tool.kwargs))
 
@@ -147,24 +179,18 @@ class CustomChat(BaseChat):
     def get_tool_results(
         self, message: str, tools: list[Tool], model: BaseDeployment
     ) -> list[dict[str, Any]]:
-        tool_results = []
-        tools_to_use = model.invoke_tools(message, tools)
-
-        tool_calls = tools_to_use.tool_calls if tools_to_use.tool_calls else []
-        for tool_call in tool_calls:
-            tool = AVAILABLE_TOOLS.get(tool_call.name)
-            if not tool:
-                logging.warning(f"Couldn't find tool {tool_call.name}")
-                continue
+        """
+        Get the tools the model wants to call and run them concurrently.
 
-            outputs = tool.implementation().call(
-                parameters=tool_call.parameters,
-            )
+        Args:
+            message (str): User message.
+            tools (list[Tool]): Function tools available for the message.
+            model (BaseDeployment): Model deployment.
 
-            # If the tool returns a list of outputs, append each output to the tool_results list
-            # Otherwise, append the single output to the tool_results list
-            outputs = outputs if isinstance(outputs, list) else [outputs]
-            for output in outputs:
-                tool_results.append({"call": tool_call, "outputs": [output]})
+        Returns:
+            list[dict[str, Any]]: Tool results with per-call timing.
+        """
+        tools_to_use = model.invoke_tools(message, tools)
 
-        return tool_results
+        tool_calls = tools_to_use.tool_calls if tools_to_use.tool_calls else []
+        return ToolCallExecutor(AVAILABLE_TOOLS).execute(tool_calls)
@@ -1,12 +1,28 @@
+import hashlib
+import json
+import os
 from typing import Any
 
 from backend.config.deployments import AVAILABLE_MODEL_DEPLOYMENTS
 from backend.model_deployments.base import BaseDeployment
+from backend.services.cache import LRUCache
+
+# Deployment instances hold the model clients and their connection pools, they
+# are reused across requests with the same deployment config
+DEPLOYMENT_CACHE_SIZE = int(os.getenv("DEPLOYMENT_CACHE_SIZE", "32"))
+DEPLOYMENT_CACHE_TTL = float(os.getenv("DEPLOYMENT_CACHE_TTL", "3600"))
+
+deployment_cache = LRUCache(
+    "deployments", max_size=DEPLOYMENT_CACHE_SIZE, ttl=DEPLOYMENT_CACHE_TTL
+)
 
 
 def get_deployment(name, **kwargs: Any) -> BaseDeployment:
     """Get the deployment implementation.
 
+    Instances are cached by deployment name and deployment config, so clients and
+    their keep-alive connections are reused across requests.
+
     Args:
         deployment (str): Deployment name.
 
@@ -17,16 +33,46 @@ def get_deployment(name, **kwargs: Any) -> BaseDeployment:
         ValueError: If the deployment is not supported.
     """
     deployment = AVAILABLE_MODEL_DEPLOYMENTS.get(name)
+    deployment_kwargs = {}
 
     # Check provided deployment against config const
     if deployment is not None:
-        return deployment.deployment_class(**kwargs, **deployment.kwargs)
+        deployment_kwargs = deployment.kwargs
+    else:
+        # Fallback to first available deployment
+        deployment = next(
+            (d for d in AVAILABLE_MODEL_DEPLOYMENTS.values() if d.is_available), None
+        )
+
+    if deployment is None:
+        raise ValueError(
+            f"Deployment {name} is not supported, and no available deployments were found."
+        )
+
+    deployment_config = kwargs.get("deployment_config") or {}
+    cache_key = get_deployment_cache_key(deployment.name, deployment_config)
+
+    model_deployment = deployment_cache.get(cache_key)
+    if model_deployment is None:
+        model_deployment = deployment.deployment_class(
+            deployment_config=deployment_config, **deployment_kwargs
+        )
+        deployment_cache.set(cache_key, model_deployment)
+
+    return model_deployment
 
-    # Fallback to first available deployment
-    for deployment in AVAILABLE_MODEL_DEPLOYMENTS.values():
-        if deployment.is_available:
-            return deployment.deployment_class(**kwargs)
 
-    raise ValueError(
-        f"Deployment {name} is not supported, and no available deployments were found."
-    )
+def get_deployment_cache_key(name: str, deployment_config: dict) -> tuple[str, str]:
+    """Get the cache key of a deployment instance.
+
+    The config is hashed so the request secrets are not kept as plain cache keys.
+
+    Args:
+        name (str): Deployment name.
+        deployment_config (dict): Deployment config overrides from the request.
+
+    Returns:
+        tuple[str, str]: Deployment name and hash of the deployment config.
+    """
+    config = json.dumps(deployment_config, sort_keys=True, default=str)
+    return name, hashlib.sha256(config.encode()).hexdigest()
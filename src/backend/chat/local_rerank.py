@@ -0,0 +1,107 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+from cohere.types import RerankResponse, RerankResponseResultsItem
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LocalReranker:
+    """
+    CPU-only BM25 reranker for deployments without a rerank endpoint.
+
+    It implements the invoke_rerank interface of the model deployments and returns
+    the same response type as the Cohere rerank endpoint, so collate can use it
+    in place of the deployment. Document frequencies are computed over the
+    documents of each call, only the query terms are scored.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+
+    def invoke_rerank(
+        self, query: str, documents: List[Dict[str, Any]], **kwargs: Any
+    ) -> RerankResponse:
+        """
+        Score documents against a query with BM25.
+
+        Args:
+            query (str): Search query.
+            documents (List[Dict[str, Any]]): Document texts, or dicts with a text field.
+            **kwargs (Any): top_n limits the number of results.
+
+        Returns:
+            RerankResponse: Results sorted by relevance score.
+        """
+        texts = [
+            document if isinstance(document, str) else document.get("text", "")
+            for document in documents
+        ]
+        scores = self.score(query, texts)
+
+        # Stable sort so documents with the same score keep their order
+        order = np.argsort(-scores, kind="stable")
+        top_n = kwargs.get("top_n")
+        if top_n:
+            order = order[:top_n]
+
+        return RerankResponse(
+            results=[
+                RerankResponseResultsItem(
+                    index=int(i), relevance_score=float(scores[i])
+                )
+                for i in order
+            ],
+        )
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        """
+        Compute the BM25 score of each text.
+
+        Args:
+            query (str): Search query.
+            texts (List[str]): Document texts.
+
+        Returns:
+            np.ndarray: Score per text.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not texts or not query_terms:
+            return np.zeros(len(texts))
+
+        # Term frequencies of the query terms, one row per document
+        term_frequencies = np.zeros((len(texts), len(query_terms)))
+        lengths = np.zeros(len(texts))
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[row] = sum(counts.values())
+            term_frequencies[row] = [counts.get(term, 0) for term in query_terms]
+
+        document_frequencies = np.count_nonzero(term_frequencies, axis=0)
+        idf = np.log(
+            1 + (len(texts) - document_frequencies + 0.5) / (document_frequencies + 0.5)
+        )
+
+        average_length = lengths.mean() or 1
+        normalization = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        weights = (
+            term_frequencies
+            * (self.k1 + 1)
+            / (term_frequencies + normalization[:, np.newaxis])
+        )
+        return weights @ idf
+
+
+local_reranker = LocalReranker()
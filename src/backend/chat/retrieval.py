@@ -0,0 +1,250 @@
+import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from distutils.util import strtobool
+from typing import Any, Callable, Dict, List
+
+from backend.services.concurrency import get_executor
+from backend.services.logger import get_logger
+from backend.services.metrics import registry
+from backend.services.tracing import ChatTrace
+
+# Seconds a retriever call may take before its results are dropped from the turn
+RETRIEVER_TIMEOUT = float(os.getenv("RETRIEVER_TIMEOUT", "20"))
+# Concurrent calls per retriever class across the requests of a worker
+RETRIEVER_MAX_CONCURRENCY = int(os.getenv("RETRIEVER_MAX_CONCURRENCY", "8"))
+# Call the retrievers with the user message while the search queries are generated
+SPECULATIVE_RETRIEVAL_ENABLED = bool(
+    strtobool(os.getenv("SPECULATIVE_RETRIEVAL_ENABLED", "false"))
+)
+# Word overlap above which a search query reuses the documents of the user message
+SPECULATIVE_QUERY_SIMILARITY = float(os.getenv("SPECULATIVE_QUERY_SIMILARITY", "0.8"))
+
+WORD_PATTERN = re.compile(r"\w+")
+
+speculative_queries = registry.counter(
+    "speculative_queries_total",
+    "Number of search queries of speculative retrieval by result: reused or fetched.",
+)
+
+logger = get_logger()
+
+
+def retrieve_documents(
+    retrievers: List[Any],
+    queries: List[str],
+    timeout: float | None = None,
+    trace: ChatTrace | None = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Calls every retriever with every query concurrently and groups the results by query.
+
+    Calls that fail or do not finish before the timeout are logged and skipped, so
+    a slow or failing retriever only removes its own documents from the turn.
+
+    Args:
+        retrievers (List[Any]): Retriever implementations.
+        queries (List[str]): Search queries.
+        timeout (float | None): Seconds to wait for the calls, defaults to RETRIEVER_TIMEOUT.
+        trace (ChatTrace | None): Trace recording the duration of each retriever.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Dictionary from queries of lists of documents.
+    """
+    return collect_documents(submit_retrievals(retrievers, queries, trace), timeout)
+
+
+def retrieve_speculatively(
+    retrievers: List[Any],
+    message: str,
+    generate_queries: Callable[[], List[str]],
+    timeout: float | None = None,
+    trace: ChatTrace | None = None,
+) -> tuple[List[str], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Calls the retrievers with the user message while the search queries are generated.
+
+    Once the queries are known, only the ones that differ from the message are
+    retrieved, the documents of the message are kept with theirs. The time the
+    retrievers ran during query generation is recorded as the speculative_overlap
+    stage of the trace.
+
+    Args:
+        retrievers (List[Any]): Retriever implementations.
+        message (str): User message.
+        generate_queries (Callable[[], List[str]]): Generates the search queries.
+        timeout (float | None): Seconds to wait for the calls, defaults to RETRIEVER_TIMEOUT.
+        trace (ChatTrace | None): Trace recording the duration of each retriever.
+
+    Returns:
+        tuple[List[str], Dict[str, List[Dict[str, Any]]]]: Search queries, and
+            dictionary from queries of lists of documents.
+    """
+    finish_times: Dict[int, float] = {}
+
+    def call_speculatively(index: int, retriever: Any) -> Any:
+        try:
+            return call_retriever(retriever, message, trace)
+        finally:
+            # Written before the future completes, so done futures have a finish time
+            finish_times[index] = time.perf_counter()
+
+    start_time = time.perf_counter()
+    futures: Dict[Future, tuple[Any, str]] = {
+        get_retriever_executor(retriever).submit(
+            call_speculatively, index, retriever
+        ): (retriever, message)
+        for index, retriever in enumerate(retrievers)
+    }
+
+    queries = generate_queries()
+    generation_end_time = time.perf_counter()
+
+    # The retrievers overlapped generation until they finished, or all of it
+    overlap = generation_end_time - start_time
+    if all(future.done() for future in futures):
+        overlap = max(finish_times.values(), default=start_time) - start_time
+
+    # No search queries were generated, the message is the query
+    if not queries:
+        queries = [message]
+
+    new_queries = []
+    for query in queries:
+        if is_similar_query(query, message):
+            speculative_queries.inc(result="reused")
+        elif query not in new_queries:
+            speculative_queries.inc(result="fetched")
+            new_queries.append(query)
+    futures.update(submit_retrievals(retrievers, new_queries, trace))
+
+    all_documents = collect_documents(futures, timeout)
+
+    if trace is not None:
+        trace.record("speculative_overlap", overlap)
+
+    return queries, all_documents
+
+
+def is_similar_query(query: str, message: str) -> bool:
+    """
+    Check whether a search query matches the user message closely enough to reuse
+    the message's documents.
+
+    Args:
+        query (str): Search query.
+        message (str): User message.
+
+    Returns:
+        bool: Whether the word overlap of the two is at least SPECULATIVE_QUERY_SIMILARITY.
+    """
+    query_words = set(WORD_PATTERN.findall(query.lower()))
+    message_words = set(WORD_PATTERN.findall(message.lower()))
+    if not query_words or not message_words:
+        return query_words == message_words
+
+    similarity = len(query_words & message_words) / len(query_words | message_words)
+    return similarity >= SPECULATIVE_QUERY_SIMILARITY
+
+
+def submit_retrievals(
+    retrievers: List[Any], queries: List[str], trace: ChatTrace | None = None
+) -> Dict[Future, tuple[Any, str]]:
+    """
+    Submits a call of every retriever with every query to the shared executor.
+
+    Args:
+        retrievers (List[Any]): Retriever implementations.
+        queries (List[str]): Search queries.
+        trace (ChatTrace | None): Trace recording the duration of each retriever.
+
+    Returns:
+        Dict[Future, tuple[Any, str]]: Retriever and query of each submitted call.
+    """
+    futures: Dict[Future, tuple[Any, str]] = {}
+    for retriever in retrievers:
+        executor = get_retriever_executor(retriever)
+        for query in queries:
+            future = executor.submit(call_retriever, retriever, query, trace)
+            futures[future] = (retriever, query)
+    return futures
+
+
+def get_retriever_executor(retriever: Any) -> ThreadPoolExecutor:
+    """
+    Get the thread pool of a retriever, so retrievers that hang only hold threads
+    of their own pool.
+
+    Args:
+        retriever (Any): Retriever implementation.
+
+    Returns:
+        ThreadPoolExecutor: Pool shared by the retrievers of the same class.
+    """
+    return get_executor(
+        f"retriever.{get_retriever_name(retriever)}", RETRIEVER_MAX_CONCURRENCY
+    )
+
+
+def collect_documents(
+    futures: Dict[Future, tuple[Any, str]], timeout: float | None = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Waits for submitted retriever calls and groups their results by query.
+
+    Args:
+        futures (Dict[Future, tuple[Any, str]]): Retriever and query of each call.
+        timeout (float | None): Seconds to wait for the calls, defaults to RETRIEVER_TIMEOUT.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Dictionary from queries of lists of documents.
+    """
+    if timeout is None:
+        timeout = RETRIEVER_TIMEOUT
+
+    _, not_done = wait(futures, timeout=timeout)
+
+    # Iterate in submission order so the output matches a sequential run
+    all_documents = {}
+    for future, (retriever, query) in futures.items():
+        retriever_name = get_retriever_name(retriever)
+        if future in not_done:
+            future.cancel()
+            logger.warning(
+                f"Retriever {retriever_name} timed out after {timeout}s for query: {query}"
+            )
+            continue
+
+        try:
+            documents = future.result()
+        except Exception as e:
+            logger.warning(
+                f"Retriever {retriever_name} failed for query: {query} - {str(e)}"
+            )
+            continue
+
+        all_documents.setdefault(query, []).extend(documents or [])
+
+    return all_documents
+
+
+def call_retriever(retriever: Any, query: str, trace: ChatTrace | None = None) -> Any:
+    if trace is None:
+        return retriever.call({"query": query})
+
+    with trace.span(f"retriever.{get_retriever_name(retriever)}"):
+        return retriever.call({"query": query})
+
+
+def get_retriever_name(retriever: Any) -> str:
+    """
+    Get the name of a retriever for logs and traces.
+
+    Args:
+        retriever (Any): Retriever implementation, possibly wrapped by the tool cache.
+
+    Returns:
+        str: Class name of the retriever.
+    """
+    return getattr(retriever, "retriever_name", None) or retriever.__class__.__name__
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import re
+from distutils.util import strtobool
+from typing import Dict, List
+
+from backend.model_deployments.base import BaseDeployment
+from backend.services.cache import LRUCache
+from backend.services.metrics import registry
+
+# Generated search queries cached by message and recent chat history
+SEARCH_QUERY_CACHE_SIZE = int(os.getenv("SEARCH_QUERY_CACHE_SIZE", "1024"))
+SEARCH_QUERY_CACHE_TTL = float(os.getenv("SEARCH_QUERY_CACHE_TTL", "3600"))
+# Number of chat history messages the queries are assumed to depend on
+SEARCH_QUERY_HISTORY_MESSAGES = int(os.getenv("SEARCH_QUERY_HISTORY_MESSAGES", "4"))
+# Skip search query generation for greetings and acknowledgements
+SEARCH_QUERY_SKIP_ENABLED = bool(
+    strtobool(os.getenv("SEARCH_QUERY_SKIP_ENABLED", "false"))
+)
+
+# Messages the model generates no search queries for, compared after lowercasing and
+# removing punctuation
+SMALL_TALK = frozenset(
+    [
+        "hi",
+        "hello",
+        "hey",
+        "hi there",
+        "hello there",
+        "good morning",
+        "good afternoon",
+        "good evening",
+        "thanks",
+        "thank you",
+        "thanks a lot",
+        "thank you very much",
+        "ok",
+        "okay",
+        "ok thanks",
+        "ok thank you",
+        "great",
+        "great thanks",
+        "cool",
+        "got it",
+        "perfect",
+        "bye",
+        "goodbye",
+    ]
+)
+WORD_PATTERN = re.compile(r"\w+")
+
+search_query_requests = registry.counter(
+    "search_query_requests_total",
+    "Number of search query generations by result: hit, miss or skip.",
+)
+
+search_query_cache = LRUCache(
+    "search_queries", max_size=SEARCH_QUERY_CACHE_SIZE, ttl=SEARCH_QUERY_CACHE_TTL
+)
+
+
+def generate_search_queries(
+    deployment_model: BaseDeployment,
+    message: str,
+    chat_history: List[Dict[str, str]] | None = None,
+    model: str | None = None,
+    cache: LRUCache | None = search_query_cache,
+    skip_enabled: bool = SEARCH_QUERY_SKIP_ENABLED,
+) -> List[str]:
+    """
+    Get the search queries of a message, calling the model only when needed.
+
+    Queries are cached by deployment, model, message and recent chat history. When
+    skipping is enabled, greetings and acknowledgements get no search queries
+    without calling the model, as the model would answer.
+
+    Args:
+        deployment_model (BaseDeployment): Deployment generating the queries.
+        message (str): User message.
+        chat_history (List[Dict[str, str]] | None): Chat history.
+        model (str | None): Model of the chat request.
+        cache (LRUCache | None): Query cache, None to always call the model.
+        skip_enabled (bool): Whether small talk skips generation.
+
+    Returns:
+        List[str]: Search queries.
+    """
+    if skip_enabled and is_small_talk(message):
+        search_query_requests.inc(result="skip")
+        return []
+
+    if cache is None:
+        return deployment_model.invoke_search_queries(message, chat_history)
+
+    key = get_search_queries_key(deployment_model, message, chat_history, model)
+    queries = cache.get(key)
+    if queries is not None:
+        search_query_requests.inc(result="hit")
+        return list(queries)
+
+    search_query_requests.inc(result="miss")
+    queries = deployment_model.invoke_search_queries(message, chat_history)
+    cache.set(key, tuple(queries))
+    return queries
+
+
+def get_search_queries_key(
+    deployment_model: BaseDeployment,
+    message: str,
+    chat_history: List[Dict[str, str]] | None = None,
+    model: str | None = None,
+) -> str:
+    """
+    Get the cache key of the search queries of a message.
+
+    Args:
+        deployment_model (BaseDeployment): Deployment generating the queries.
+        message (str): User message.
+        chat_history (List[Dict[str, str]] | None): Chat history, only the latest
+            SEARCH_QUERY_HISTORY_MESSAGES messages are part of the key.
+        model (str | None): Model of the chat request.
+
+    Returns:
+        str: Hex digest of the deployment, model, message and recent history.
+    """
+    history = chat_history or []
+    if SEARCH_QUERY_HISTORY_MESSAGES > 0:
+        history = history[-SEARCH_QUERY_HISTORY_MESSAGES:]
+    else:
+        history = []
+
+    payload = json.dumps(
+        [
+            deployment_model.__class__.__name__,
+            model,
+            " ".join(message.split()),
+            history,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_small_talk(message: str) -> bool:
+    """
+    Check whether a message is a greeting or an acknowledgement.
+
+    Only whole messages from SMALL_TALK match, short questions such as
+    "What about Paris?" still need the chat history to build their query.
+
+    Args:
+        message (str): User message.
+
+    Returns:
+        bool: Whether the message is small talk.
+    """
+    return " ".join(WORD_PATTERN.findall(message.lower())) in SMALL_TALK
+
+
+def get_search_query_stats() -> dict[str, float]:
+    """
+    Get the hit and skip rates of search query generation.
+
+    Returns:
+        dict[str, float]: Hits, misses and skips, with the hit and skip ratios.
+    """
+    hits = search_query_requests.get(result="hit")
+    misses = search_query_requests.get(result="miss")
+    skips = search_query_requests.get(result="skip")
+    total = hits + misses + skips
+    return {
+        "hits": hits,
+        "misses": misses,
+        "skips": skips,
+        "hit_ratio": hits / total if total else 0.0,
+        "skip_ratio": skips / total if total else 0.0,
+    }
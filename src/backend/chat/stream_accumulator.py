@@ -0,0 +1,67 @@
+import time
+
+
+class StreamAccumulator:
+    """
+    Collects the text chunks of a streamed generation and joins them once.
+
+    Appending to a string copies it for every chunk, chunks are instead kept in a
+    list and joined when the text is needed. The accumulator also tracks the time
+    to first token and the tokens per second of the stream, each chunk counts as a
+    token.
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.first_token_time = None
+        self.last_token_time = None
+        self.token_count = 0
+        self._chunks = []
+        self._text = None
+
+    def append(self, text: str) -> None:
+        now = time.perf_counter()
+        if self.first_token_time is None:
+            self.first_token_time = now
+        self.last_token_time = now
+        self.token_count += 1
+
+        if not text:
+            return
+
+        self._text = None
+        self._chunks.append(text)
+
+    def get_text(self) -> str:
+        """
+        Get the accumulated text, joined once and reused until more text is appended.
+
+        Returns:
+            str: Accumulated text.
+        """
+        if self._text is None:
+            self._text = "".join(self._chunks)
+            self._chunks = [self._text]
+        return self._text
+
+    @property
+    def time_to_first_token(self) -> float | None:
+        """
+        Seconds between the start of the stream and the first token.
+        """
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """
+        Tokens per second between the first and the last token.
+        """
+        if self.token_count < 2:
+            return None
+
+        elapsed = self.last_token_time - self.first_token_time
+        if elapsed <= 0:
+            return None
+        return (self.token_count - 1) / elapsed
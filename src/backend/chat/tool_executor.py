@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Any, Dict, List
+
+from backend.schemas.tool import ManagedTool, ToolCall
+from backend.services.concurrency import get_executor
+from backend.services.logger import get_logger
+
+# Defaults for tools that do not set their own limits in the tool config
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "30"))
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+
+logger = get_logger()
+
+
+class _CallStart:
+    """
+    Set by a tool call once it leaves the queue and starts running.
+    """
+
+    def __init__(self):
+        self.time: float | None = None
+        self._event = threading.Event()
+
+    def set(self) -> None:
+        self.time = time.perf_counter()
+        self._event.set()
+
+    def wait(self, timeout: float) -> bool:
+        return self._event.wait(timeout)
+
+
+class ToolCallExecutor:
+    """
+    Runs the tool calls requested by the model concurrently.
+
+    Results keep the order of the tool calls. Each tool is instantiated once per
+    execution and runs in its own thread pool shared across requests, sized by
+    its max concurrency, so a saturated or hung tool only holds its own threads.
+    Calls may wait for a thread of their tool up to their timeout, and get their
+    full timeout once running.
+    """
+
+    def __init__(self, tools: Dict[str, ManagedTool]):
+        self.tools = tools
+
+    def execute(self, tool_calls: List[ToolCall]) -> List[Dict[str, Any]]:
+        """
+        Execute the tool calls.
+
+        Args:
+            tool_calls (List[ToolCall]): Tool calls generated by the model.
+
+        Returns:
+            List[Dict[str, Any]]: Tool results, one per tool output, with the call,
+                the output and the call duration in milliseconds.
+        """
+        implementations = {}
+        pending = []
+
+        for tool_call in tool_calls:
+            tool = self.tools.get(tool_call.name)
+            if not tool:
+                logger.warning(f"Couldn't find tool {tool_call.name}")
+                continue
+
+            if tool.name not in implementations:
+                implementations[tool.name] = tool.implementation()
+
+            started = _CallStart()
+            future = self._get_executor(tool).submit(
+                self._call, implementations[tool.name], tool_call, started
+            )
+            pending.append((tool_call, tool, future, started, time.perf_counter()))
+
+        tool_results = []
+        for tool_call, tool, future, started, submitted_at in pending:
+            timeout = tool.timeout or TOOL_CALL_TIMEOUT
+
+            try:
+                queued = submitted_at + timeout - time.perf_counter()
+                if not started.wait(max(queued, 0)):
+                    raise TimeoutError()
+                remaining = started.time + timeout - time.perf_counter()
+                outputs, duration_ms = future.result(timeout=max(remaining, 0))
+            except TimeoutError:
+                future.cancel()
+                logger.warning(f"Tool {tool_call.name} timed out after {timeout}s")
+                outputs = [{"error": f"Tool {tool_call.name} timed out."}]
+                duration_ms = timeout * 1000
+            except Exception as e:
+                logger.warning(f"Tool {tool_call.name} failed: {str(e)}")
+                outputs = [{"error": f"Tool {tool_call.name} failed: {str(e)}"}]
+                duration_ms = (
+                    time.perf_counter() - (started.time or submitted_at)
+                ) * 1000
+
+            # If the tool returns a list of outputs, append each output to the tool_results list
+            # Otherwise, append the single output to the tool_results list
+            for output in outputs:
+                tool_results.append(
+                    {
+                        "call": tool_call,
+                        "outputs": [output],
+                        "duration_ms": duration_ms,
+                    }
+                )
+
+        return tool_results
+
+    def _call(
+        self, implementation: Any, tool_call: ToolCall, started: _CallStart
+    ) -> tuple[List[Any], float]:
+        started.set()
+        outputs = implementation.call(parameters=tool_call.parameters)
+        duration_ms = (time.perf_counter() - started.time) * 1000
+
+        outputs = outputs if isinstance(outputs, list) else [outputs]
+        return outputs, duration_ms
+
+    @staticmethod
+    def _get_executor(tool: ManagedTool) -> ThreadPoolExecutor:
+        return get_executor(
+            f"tool.{tool.name}", tool.max_concurrency or TOOL_MAX_CONCURRENCY
+        )
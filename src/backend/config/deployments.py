@@ -26,32 +26,33 @@ class ModelDeploymentName(StrEnum):
 use_community_features = bool(strtobool(os.getenv("USE_COMMUNITY_FEATURES", "false")))
 
 
+# Models are listed lazily through the model catalog, see backend/services/model_catalog.py
 ALL_MODEL_DEPLOYMENTS = {
     ModelDeploymentName.CoherePlatform: Deployment(
         name=ModelDeploymentName.CoherePlatform,
         deployment_class=CohereDeployment,
-        models=CohereDeployment.list_models(),
+        models=[],
         is_available=CohereDeployment.is_available(),
         env_vars=COHERE_ENV_VARS,
     ),
     ModelDeploymentName.SageMaker: Deployment(
         name=ModelDeploymentName.SageMaker,
         deployment_class=SageMakerDeployment,
-        models=SageMakerDeployment.list_models(),
+        models=[],
         is_available=SageMakerDeployment.is_available(),
         env_vars=SAGE_MAKER_ENV_VARS,
     ),
     ModelDeploymentName.Azure: Deployment(
         name=ModelDeploymentName.Azure,
         deployment_class=AzureDeployment,
-        models=AzureDeployment.list_models(),
+        models=[],
         is_available=AzureDeployment.is_available(),
         env_vars=AZURE_ENV_VARS,
     ),
     ModelDeploymentName.Bedrock: Deployment(
         name=ModelDeploymentName.Bedrock,
         deployment_class=BedrockDeployment,
-        models=BedrockDeployment.list_models(),
+        models=[],
         is_available=BedrockDeployment.is_available(),
         env_vars=BEDROCK_ENV_VARS,
     ),
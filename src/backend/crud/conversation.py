@@ -1,5 +1,9 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from backend.crud import message as message_crud
+from backend.crud.pagination import paginate
 from backend.database_models.conversation import Conversation
 from backend.schemas.conversation import UpdateConversation
 
@@ -42,28 +46,78 @@ def get_conversation(
     )
 
 
+def get_conversation_with_messages(
+    db: Session,
+    conversation_id: str,
+    user_id: str,
+    messages_limit: int | None = None,
+) -> Conversation | None:
+    """
+    Get a conversation by ID with its messages, their documents, citations and
+    files, and the conversation files.
+
+    The whole graph is loaded in a fixed number of queries instead of lazy
+    loading each relationship of each message.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        user_id (str): User ID.
+        messages_limit (int | None): Maximum number of most recent messages to load.
+
+    Returns:
+        Conversation: Conversation with the given conversation ID and user ID.
+    """
+    conversation = db.scalar(
+        select(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        .options(selectinload(Conversation.files))
+    )
+    if conversation is None:
+        return None
+
+    messages = message_crud.get_conversation_messages(
+        db, conversation_id, limit=messages_limit
+    )
+    set_committed_value(conversation, "text_messages", messages)
+    return conversation
+
+
 def get_conversations(
-    db: Session, user_id: str, offset: int = 0, limit: int = 100
-) -> list[Conversation]:
+    db: Session,
+    user_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> list[Row]:
     """
-    List all conversations.
+    List all conversations, most recently updated first.
+
+    Only the conversation columns are loaded, without messages or files.
 
     Args:
         db (Session): Database session.
         user_id (str): User ID.
         offset (int): Offset to start the list.
         limit (int): Limit of conversations to be listed.
+        cursor (str | None): Cursor returned with the previous page, used instead of offset.
 
     Returns:
-        list[Conversation]: List of conversations.
+        list[Row]: List of conversation rows.
+
+    Raises:
+        ValueError: If the cursor is invalid.
     """
-    return (
-        db.query(Conversation)
-        .filter(Conversation.user_id == user_id)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    query = select(
+        Conversation.id,
+        Conversation.user_id,
+        Conversation.title,
+        Conversation.description,
+        Conversation.created_at,
+        Conversation.updated_at,
+    ).where(Conversation.user_id == user_id)
+    query = paginate(query, Conversation, offset=offset, limit=limit, cursor=cursor)
+    return db.execute(query).all()
 
 
 def update_conversation(
@@ -1,6 +1,8 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from backend.database_models.file import File
+from backend.crud.pagination import paginate
+from backend.database_models.file import File, FileStatus
 from backend.schemas.file import UpdateFile
 
 
@@ -36,22 +38,32 @@ def get_file(db: Session, file_id: str, user_id: str) -> File:
     return db.query(File).filter(File.id == file_id, File.user_id == user_id).first()
 
 
-def get_files(db: Session, user_id: str, offset: int = 0, limit: int = 100):
+def get_files(
+    db: Session,
+    user_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> list[File]:
     """
-    List all files.
+    List all files, most recently updated first.
 
     Args:
         db (Session): Database session.
         user_id (str): User ID.
         offset (int): Offset to start the list.
         limit (int): Limit of files to be listed.
+        cursor (str | None): Cursor returned with the previous page, used instead of offset.
 
     Returns:
         list[File]: List of files.
+
+    Raises:
+        ValueError: If the cursor is invalid.
     """
-    return (
-        db.query(File).filter(File.user_id == user_id).offset(offset).limit(limit).all()
-    )
+    query = select(File).where(File.user_id == user_id)
+    query = paginate(query, File, offset=offset, limit=limit, cursor=cursor)
+    return db.scalars(query).all()
 
 
 def get_files_by_conversation_id(
@@ -75,6 +87,27 @@ def get_files_by_conversation_id(
     )
 
 
+def get_files_by_conversation_ids(
+    db: Session, conversation_ids: list[str], user_id: str
+) -> list[File]:
+    """
+    List all files from several conversations in one query.
+
+    Args:
+        db (Session): Database session.
+        conversation_ids (list[str]): Conversation IDs.
+        user_id (str): User ID.
+
+    Returns:
+        list[File]: List of files from the conversations.
+    """
+    return (
+        db.query(File)
+        .filter(File.conversation_id.in_(conversation_ids), File.user_id == user_id)
+        .all()
+    )
+
+
 def get_files_by_ids(db: Session, file_ids: list[str], user_id: str) -> list[File]:
     """
     Get files by IDs.
@@ -110,6 +143,50 @@ def update_file(db: Session, file: File, new_file: UpdateFile) -> File:
     return file
 
 
+def update_file_status(db: Session, file_id: str, status: FileStatus) -> None:
+    """
+    Update the ingestion status of a file.
+
+    Args:
+        db (Session): Database session.
+        file_id (str): File ID.
+        status (FileStatus): New status.
+    """
+    db.query(File).filter(File.id == file_id).update({"status": status})
+    db.commit()
+
+
+def count_files_by_content_hash(db: Session, content_hash: str) -> int:
+    """
+    Count the files referencing a stored content.
+
+    Args:
+        db (Session): Database session.
+        content_hash (str): SHA-256 hash of the content.
+
+    Returns:
+        int: Number of files with the content.
+    """
+    return db.query(File).filter(File.content_hash == content_hash).count()
+
+
+def lock_content_hash(db: Session, content_hash: str) -> None:
+    """
+    Lock a stored content until the end of the current transaction.
+
+    Creating a File for a content and collecting the content once unreferenced
+    both take the lock, so a content is never collected while a new File is
+    about to reference it. The lock is a PostgreSQL advisory lock, shared by all
+    workers and hosts using the database.
+
+    Args:
+        db (Session): Database session.
+        content_hash (str): SHA-256 hash of the content.
+    """
+    # Advisory locks take a bigint key, the first 60 bits of the hash
+    db.execute(select(func.pg_advisory_xact_lock(int(content_hash[:15], 16))))
+
+
 def delete_file(db: Session, file_id: str, user_id: str) -> None:
     """
     Delete a file by ID.
@@ -1,8 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, case, func, select
+from sqlalchemy.orm import Session, selectinload
 
-from backend.database_models.message import Message
+from backend.crud.pagination import paginate
+from backend.database_models.message import Message, MessageAgent
 from backend.schemas.message import UpdateMessage
 
+# The user message of a turn shares its position with the chatbot response
+AGENT_ORDER = case((Message.agent == MessageAgent.USER, 0), else_=1)
+
 
 def create_message(db: Session, message: Message) -> Message:
     """
@@ -41,27 +46,31 @@ def get_message(db: Session, message_id: str, user_id: str) -> Message:
 
 
 def get_messages(
-    db: Session, user_id: str, offset: int = 0, limit: int = 100
+    db: Session,
+    user_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
 ) -> list[Message]:
     """
-    List all messages.
+    List all messages, most recently updated first.
 
     Args:
         db (Session): Database session.
         offset (int): Offset to start the list.
         limit (int): Limit of messages to be listed.
         user_id (str): User ID.
+        cursor (str | None): Cursor returned with the previous page, used instead of offset.
 
     Returns:
         list[Message]: List of messages.
+
+    Raises:
+        ValueError: If the cursor is invalid.
     """
-    return (
-        db.query(Message)
-        .filter(Message.user_id == user_id)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    query = select(Message).where(Message.user_id == user_id)
+    query = paginate(query, Message, offset=offset, limit=limit, cursor=cursor)
+    return db.scalars(query).all()
 
 
 def get_messages_by_conversation_id(
@@ -85,6 +94,87 @@ def get_messages_by_conversation_id(
     )
 
 
+def get_last_message_position(db: Session, conversation_id: str) -> int | None:
+    """
+    Get the position of the last active message of a conversation.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+
+    Returns:
+        int | None: Last position, None if the conversation has no active messages.
+    """
+    return db.scalar(
+        select(func.max(Message.position)).where(
+            Message.conversation_id == conversation_id, Message.is_active
+        )
+    )
+
+
+def get_message_history(
+    db: Session,
+    conversation_id: str,
+    before_position: int,
+    limit: int | None = None,
+) -> list[Row]:
+    """
+    Get the agent and text of the active messages before a position, oldest first.
+
+    Only the two columns are loaded, without the message relationships.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        before_position (int): Messages from this position onwards are excluded.
+        limit (int | None): Maximum number of most recent messages to get.
+
+    Returns:
+        list[Row]: Rows with the agent and text of the messages.
+    """
+    query = (
+        select(Message.agent, Message.text)
+        .where(
+            Message.conversation_id == conversation_id,
+            Message.position < before_position,
+            Message.is_active,
+        )
+        .order_by(Message.position.desc(), AGENT_ORDER.desc())
+        .limit(limit)
+    )
+    return list(reversed(db.execute(query).all()))
+
+
+def get_conversation_messages(
+    db: Session, conversation_id: str, limit: int | None = None
+) -> list[Message]:
+    """
+    Get the messages of a conversation with their documents, citations and files.
+
+    The relationships are loaded with one query each, whatever the number of messages.
+
+    Args:
+        db (Session): Database session.
+        conversation_id (str): Conversation ID.
+        limit (int | None): Maximum number of most recent messages to get.
+
+    Returns:
+        list[Message]: Messages ordered by position.
+    """
+    query = (
+        select(Message)
+        .where(Message.conversation_id == conversation_id)
+        .options(
+            selectinload(Message.documents),
+            selectinload(Message.citations),
+            selectinload(Message.files),
+        )
+        .order_by(Message.position.desc(), AGENT_ORDER.desc())
+        .limit(limit)
+    )
+    return list(reversed(db.scalars(query).all()))
+
+
 def update_message(
     db: Session, message: Message, new_message: UpdateMessage
 ) -> Message:
@@ -0,0 +1,91 @@
+import base64
+import datetime
+import json
+from typing import Any
+
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(updated_at: datetime.datetime, id: str) -> str:
+    """
+    Encode the position of the last item of a page as an opaque cursor.
+
+    Args:
+        updated_at (datetime.datetime): Update time of the last item.
+        id (str): ID of the last item.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    data = json.dumps([updated_at.isoformat(), id])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, str]:
+    """
+    Decode a cursor returned by encode_cursor.
+
+    Args:
+        cursor (str): Cursor.
+
+    Returns:
+        tuple[datetime.datetime, str]: Update time and ID of the last item of the previous page.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    try:
+        updated_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.datetime.fromisoformat(updated_at), str(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def paginate(
+    query: Select, model: Any, offset: int = 0, limit: int = 100, cursor: str = None
+) -> Select:
+    """
+    Order a query by most recently updated and select a page.
+
+    With a cursor, the page starts after the item the cursor points to, which
+    uses the updated_at index instead of scanning the skipped rows like offset.
+
+    Args:
+        query (Select): Query to paginate.
+        model (Any): Model or aliased table with updated_at and id columns.
+        offset (int): Offset to start the list, ignored when a cursor is given.
+        limit (int): Limit of items in the page.
+        cursor (str): Cursor returned with the previous page.
+
+    Returns:
+        Select: Paginated query.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    query = query.order_by(model.updated_at.desc(), model.id.desc())
+
+    if cursor:
+        updated_at, id = decode_cursor(cursor)
+        query = query.where(tuple_(model.updated_at, model.id) < tuple_(updated_at, id))
+    else:
+        query = query.offset(offset)
+
+    return query.limit(limit)
+
+
+def get_next_cursor(items: list, limit: int) -> str | None:
+    """
+    Get the cursor of the page following the items.
+
+    Args:
+        items (list): Items of the current page, with updated_at and id attributes.
+        limit (int): Limit of items in the page.
+
+    Returns:
+        str | None: Cursor, None if this is the last page.
+    """
+    if not items or len(items) < limit:
+        return None
+
+    return encode_cursor(items[-1].updated_at, items[-1].id)
@@ -1,6 +1,6 @@
 from typing import List
 
-from sqlalchemy import Index, String
+from sqlalchemy import Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.database_models.base import Base
@@ -23,4 +23,7 @@ class Conversation(Base):
     def messages(self):
         return sorted(self.text_messages, key=lambda x: x.position)
 
-    __table_args__ = (Index("conversation_user_id", user_id),)
+    __table_args__ = (
+        Index("conversation_user_id", user_id),
+        Index("conversation_user_id_updated_at", user_id, text("updated_at DESC")),
+    )
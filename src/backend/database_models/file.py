@@ -1,9 +1,18 @@
-from sqlalchemy import ForeignKey, Index, String
+from enum import StrEnum
+
+from sqlalchemy import Enum, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.database_models.base import Base
 
 
+class FileStatus(StrEnum):
+    PENDING = "PENDING"
+    PROCESSING = "PROCESSING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+
 class File(Base):
     __tablename__ = "files"
 
@@ -19,10 +28,16 @@ class File(Base):
     file_name: Mapped[str]
     file_path: Mapped[str]
     file_size: Mapped[int] = mapped_column(default=0)
+    content_hash: Mapped[str] = mapped_column(String, nullable=True)
+    status: Mapped[FileStatus] = mapped_column(
+        Enum(FileStatus, native_enum=False),
+        default=FileStatus.PENDING,
+    )
 
     __table_args__ = (
         Index("file_conversation_id_user_id", conversation_id, user_id),
         Index("file_conversation_id", conversation_id),
         Index("file_message_id", message_id),
         Index("file_user_id", user_id),
+        Index("file_content_hash", content_hash),
     )
@@ -2,11 +2,13 @@ import logging
 import os
 from contextlib import asynccontextmanager
 
+import anyio
 from alembic.command import upgrade
 from alembic.config import Config
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
 
 from backend.config.auth import ENABLED_AUTH_STRATEGY_MAPPING
@@ -17,7 +19,11 @@ from backend.routers.deployment import router as deployment_router
 from backend.routers.experimental_features import router as experimental_feature_router
 from backend.routers.tool import router as tool_router
 from backend.routers.user import router as user_router
+from backend.services.concurrency import shutdown_executor
+from backend.services.file.ingestion import file_ingestion_queue
 from backend.services.logger import LoggingMiddleware
+from backend.services.metrics import registry
+from backend.services.write_behind import write_behind_queue
 
 load_dotenv()
 
@@ -25,11 +31,20 @@ load_dotenv()
 ORIGINS = ["*"]
 # Session expiration time in seconds, set to None to last only browser session
 SESSION_EXPIRY = 60 * 60 * 24 * 7  # A week
+# Threads available to run blocking chat work (DB, model and retriever calls) off
+# the event loop, this bounds the number of chats a worker can serve concurrently
+WORKER_THREADPOOL_SIZE = int(os.getenv("WORKER_THREADPOOL_SIZE", "100"))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = WORKER_THREADPOOL_SIZE
     yield
+    # Write the chat turns still queued before the worker exits
+    await anyio.to_thread.run_sync(write_behind_queue.stop)
+    await anyio.to_thread.run_sync(file_ingestion_queue.stop)
+    shutdown_executor()
 
 
 def create_app():
@@ -51,6 +66,7 @@ def create_app():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Trace-Id"],
     )
     app.add_middleware(LoggingMiddleware)
 
@@ -84,6 +100,14 @@ async def health():
     return {"status": "OK"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics of this worker in the Prometheus text format
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/migrate")
 async def apply_migrations():
     """
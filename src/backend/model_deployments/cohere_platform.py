@@ -37,10 +37,14 @@ class CohereDeployment(BaseDeployment):
         url = "https://api.cohere.ai/v1/models"
         headers = {
             "accept": "application/json",
-            "authorization": f"Bearer {cls.api_key}",
+            "authorization": f"Bearer {os.environ.get(COHERE_API_KEY_ENV_VAR)}",
         }
 
-        response = requests.get(url, headers=headers)
+        try:
+            response = requests.get(url, headers=headers, timeout=10)
+        except requests.exceptions.RequestException:
+            logging.warning("Couldn't get models from Cohere API.")
+            return []
 
         if not response.ok:
             logging.warning("Couldn't get models from Cohere API.")
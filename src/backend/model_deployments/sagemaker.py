@@ -81,10 +81,11 @@ class SageMakerDeployment(BaseDeployment):
             "chat_history": [x.to_dict() for x in chat_request.chat_history],
             "documents": chat_request.documents,
         }
-        self.params["Body"] = json.dumps(json_params)
+        # Deployment instances are shared across requests, don't mutate self.params
+        params = self.params | {"Body": json.dumps(json_params)}
 
         # Invoke the model and print the response
-        result = self.client.invoke_endpoint_with_response_stream(**self.params)
+        result = self.client.invoke_endpoint_with_response_stream(**params)
         event_stream = result["Body"]
         for index, line in enumerate(SageMakerDeployment.LineIterator(event_stream)):
             stream_event = json.loads(line.decode())
@@ -103,10 +104,10 @@ class SageMakerDeployment(BaseDeployment):
             "message": message,
             "chat_history": chat_history,
         }
-        self.params["Body"] = json.dumps(json_params)
+        params = self.params | {"Body": json.dumps(json_params)}
 
         # Invoke the model and print the response
-        result = self.client.invoke_endpoint(**self.params)
+        result = self.client.invoke_endpoint(**params)
         response = json.loads(result["Body"].read().decode())
         return [s["text"] for s in response["search_queries"]]
 
@@ -2,8 +2,9 @@ import os
 from distutils.util import strtobool
 from typing import Any, Generator
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Response
 from sse_starlette.sse import EventSourceResponse
+from starlette.concurrency import run_in_threadpool
 
 from backend.chat.custom.custom import CustomChat
 from backend.chat.custom.langchain import LangChainChat
@@ -23,6 +24,7 @@ from backend.services.request_validators import (
     validate_deployment_header,
     validate_user_header,
 )
+from backend.services.tracing import ChatTrace
 
 router = APIRouter(
     prefix="/v1",
@@ -51,36 +53,50 @@ async def chat_stream(
     Returns:
         EventSourceResponse: Server-sent event response with chatbot responses.
     """
-    (
-        session,
+    trace = ChatTrace()
+
+    # The database, retrievers and model clients are blocking, run them
+    # in the threadpool so they don't block the event loop
+    with trace.span("process_chat"):
+        (
+            session,
+            chat_request,
+            file_paths,
+            response_message,
+            conversation_id,
+            user_id,
+            deployment_name,
+            should_store,
+            managed_tools,
+            deployment_config,
+            turn_writer,
+        ) = await run_in_threadpool(process_chat, session, chat_request, request)
+
+    model_deployment_stream = await run_in_threadpool(
+        CustomChat().chat,
         chat_request,
-        file_paths,
-        response_message,
-        conversation_id,
-        user_id,
-        deployment_name,
-        should_store,
-        managed_tools,
-        deployment_config,
-    ) = process_chat(session, chat_request, request)
+        stream=True,
+        deployment_name=deployment_name,
+        deployment_config=deployment_config,
+        file_paths=file_paths,
+        managed_tools=managed_tools,
+        trace=trace,
+    )
 
+    # EventSourceResponse iterates synchronous generators in the threadpool
     return EventSourceResponse(
         generate_chat_stream(
             session,
-            CustomChat().chat(
-                chat_request,
-                stream=True,
-                deployment_name=deployment_name,
-                deployment_config=deployment_config,
-                file_paths=file_paths,
-                managed_tools=managed_tools,
-            ),
+            model_deployment_stream,
             response_message,
             conversation_id,
             user_id,
+            turn_writer,
             should_store=should_store,
+            trace=trace,
         ),
         media_type="text/event-stream",
+        headers={"X-Trace-Id": trace.trace_id},
     )
 
 
@@ -89,6 +105,7 @@ async def chat(
     session: DBSessionDep,
     chat_request: CohereChatRequest,
     request: Request,
+    response: Response,
 ) -> NonStreamedChatResponse:
     """
     Chat endpoint to handle user messages and return chatbot responses.
@@ -97,37 +114,50 @@ async def chat(
         chat_request (CohereChatRequest): Chat request data.
         session (DBSessionDep): Database session.
         request (Request): Request object.
+        response (Response): Response object, the trace ID is set in its headers.
 
     Returns:
         NonStreamedChatResponse: Chatbot response.
     """
-    (
-        session,
+    trace = ChatTrace()
+    response.headers["X-Trace-Id"] = trace.trace_id
+
+    with trace.span("process_chat"):
+        (
+            session,
+            chat_request,
+            file_paths,
+            response_message,
+            conversation_id,
+            user_id,
+            deployment_name,
+            should_store,
+            managed_tools,
+            deployment_config,
+            turn_writer,
+        ) = await run_in_threadpool(process_chat, session, chat_request, request)
+
+    model_deployment_response = await run_in_threadpool(
+        CustomChat().chat,
         chat_request,
-        file_paths,
-        response_message,
-        conversation_id,
-        user_id,
-        deployment_name,
-        should_store,
-        managed_tools,
-        deployment_config,
-    ) = process_chat(session, chat_request, request)
+        stream=False,
+        deployment_name=deployment_name,
+        deployment_config=deployment_config,
+        file_paths=file_paths,
+        managed_tools=managed_tools,
+        trace=trace,
+    )
 
-    return generate_chat_response(
+    return await run_in_threadpool(
+        generate_chat_response,
         session,
-        CustomChat().chat(
-            chat_request,
-            stream=False,
-            deployment_name=deployment_name,
-            deployment_config=deployment_config,
-            file_paths=file_paths,
-            managed_tools=managed_tools,
-        ),
+        model_deployment_response,
         response_message,
         conversation_id,
         user_id,
+        turn_writer,
         should_store=should_store,
+        trace=trace,
     )
 
 
@@ -151,6 +181,7 @@ def langchain_chat_stream(
         should_store,
         managed_tools,
         _,
+        turn_writer,
     ) = process_chat(session, chat_request, request)
 
     return EventSourceResponse(
@@ -160,6 +191,7 @@ def langchain_chat_stream(
             response_message,
             conversation_id,
             user_id,
+            turn_writer,
             should_store,
         ),
         media_type="text/event-stream",
@@ -1,10 +1,14 @@
+from pathlib import Path
+
 from fastapi import APIRouter, Depends
 from fastapi import File as RequestFile
-from fastapi import Form, HTTPException, Request
+from fastapi import Form, HTTPException, Query, Request, Response
 from fastapi import UploadFile as FastAPIUploadFile
+from starlette.concurrency import run_in_threadpool
 
 from backend.crud import conversation as conversation_crud
 from backend.crud import file as file_crud
+from backend.crud.pagination import get_next_cursor
 from backend.database_models import Conversation as ConversationModel
 from backend.database_models import File as FileModel
 from backend.database_models import get_session
@@ -16,7 +20,9 @@ from backend.schemas.conversation import (
     UpdateConversation,
 )
 from backend.schemas.file import DeleteFile, File, ListFile, UpdateFile, UploadFile
-from backend.services.file.service import FileService
+from backend.services.chat_history import chat_history_cache
+from backend.services.file import ingestion as file_ingestion
+from backend.services.file.service import FileService, FileTooLargeError
 from backend.services.request_validators import validate_user_header
 
 router = APIRouter(
@@ -28,15 +34,19 @@ router = APIRouter(
 # CONVERSATIONS
 @router.get("/{conversation_id}", response_model=Conversation)
 async def get_conversation(
-    conversation_id: str, session: DBSessionDep, request: Request
+    conversation_id: str,
+    session: DBSessionDep,
+    request: Request,
+    messages_limit: int | None = Query(default=None, ge=1),
 ) -> Conversation:
-    """ "
+    """
     Get a conversation by ID.
 
     Args:
         conversation_id (str): Conversation ID.
         session (DBSessionDep): Database session.
         request (Request): Request object.
+        messages_limit (int | None): Maximum number of most recent messages to return.
 
     Returns:
         Conversation: Conversation with the given ID.
@@ -45,7 +55,9 @@ async def get_conversation(
         HTTPException: If the conversation with the given ID is not found.
     """
     user_id = request.headers.get("User-Id", "")
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
+    conversation = conversation_crud.get_conversation_with_messages(
+        session, conversation_id, user_id, messages_limit=messages_limit
+    )
 
     if not conversation:
         raise HTTPException(
@@ -58,24 +70,62 @@ async def get_conversation(
 
 @router.get("", response_model=list[ConversationWithoutMessages])
 async def list_conversations(
-    *, offset: int = 0, limit: int = 100, session: DBSessionDep, request: Request
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    session: DBSessionDep,
+    request: Request,
+    response: Response,
 ) -> list[ConversationWithoutMessages]:
     """
-    List all conversations.
+    List all conversations, most recently updated first.
+
+    The cursor of the next page is returned in the X-Next-Cursor header when
+    there may be more conversations.
 
     Args:
         offset (int): Offset to start the list.
         limit (int): Limit of conversations to be listed.
+        cursor (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
         session (DBSessionDep): Database session.
         request (Request): Request object.
+        response (Response): Response object.
 
     Returns:
         list[ConversationWithoutMessages]: List of conversations.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
     """
     user_id = request.headers.get("User-Id")
-    return conversation_crud.get_conversations(
-        session, offset=offset, limit=limit, user_id=user_id
+
+    try:
+        conversations = conversation_crud.get_conversations(
+            session, offset=offset, limit=limit, user_id=user_id, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    files = file_crud.get_files_by_conversation_ids(
+        session, [conversation.id for conversation in conversations], user_id
     )
+    files_by_conversation = {}
+    for file in files:
+        files_by_conversation.setdefault(file.conversation_id, []).append(file)
+
+    next_cursor = get_next_cursor(conversations, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return [
+        ConversationWithoutMessages(
+            **conversation._mapping,
+            messages=[],
+            files=files_by_conversation.get(conversation.id, []),
+        )
+        for conversation in conversations
+    ]
 
 
 @router.put("/{conversation_id}", response_model=Conversation)
@@ -143,7 +193,20 @@ async def delete_conversation(
             detail=f"Conversation with ID: {conversation_id} not found.",
         )
 
+    files = [
+        (file.file_path, file.content_hash)
+        for file in file_crud.get_files_by_conversation_id(
+            session, conversation_id, user_id
+        )
+    ]
+
     conversation_crud.delete_conversation(session, conversation_id, user_id)
+    chat_history_cache.invalidate(conversation_id)
+
+    # Files are deleted with the conversation, collect the blobs no longer used
+    file_service = FileService()
+    for file_path, content_hash in files:
+        file_service.release_file(session, file_path, content_hash)
 
     return DeleteConversation()
 
@@ -169,10 +232,18 @@ async def upload_file(
 
     Raises:
         HTTPException: If the conversation with the given ID is not found. Status code 404.
+        HTTPException: If the file is larger than the maximum size. Status code 413.
         HTTPException: If the file wasn't uploaded correctly. Status code 500.
     """
 
     user_id = request.headers.get("User-Id", "")
+    file_service = FileService()
+
+    # Reject files known to be too large before creating anything
+    try:
+        file_service.check_file_size(file.size)
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     # Create new conversation
     if not conversation_id:
@@ -200,25 +271,46 @@ async def upload_file(
                 ConversationModel(user_id=user_id),
             )
 
-    # Handle uploading File
-    file_path = FileService().upload_file(file)
+    # Handle uploading File, the copy is blocking so run it off the event loop.
+    # Retry once if the stored content was collected before the File was created
+    upload_file = None
+    for _ in range(2):
+        try:
+            file_path, content_hash, file_size = await run_in_threadpool(
+                file_service.upload_file, file
+            )
+        except FileTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+        # Create File, the stored blob is named by its hash so keep the uploaded name
+        try:
+            upload_file = await run_in_threadpool(
+                file_service.create_file,
+                session,
+                FileModel(
+                    user_id=conversation.user_id,
+                    conversation_id=conversation.id,
+                    file_name=Path(file.filename).name,
+                    file_path=file_path,
+                    file_size=file_size,
+                    content_hash=content_hash,
+                ),
+            )
+            break
+        except FileNotFoundError:
+            await file.seek(0)
 
     # Raise exception if file wasn't uploaded
-    if not file_path.exists():
+    if upload_file is None:
         raise HTTPException(
             status_code=500, detail=f"Error while uploading file {file.filename}."
         )
 
-    # Create File
-    upload_file = FileModel(
-        user_id=conversation.user_id,
-        conversation_id=conversation.id,
-        file_name=file_path.name,
-        file_path=str(file_path),
-        file_size=file_path.stat().st_size,
-    )
-
-    upload_file = file_crud.create_file(session, upload_file)
+    # Parse and index the file in the background, before the first chat turn uses it
+    if file_ingestion.FILE_INGESTION_ENABLED:
+        file_ingestion.file_ingestion_queue.submit(
+            upload_file.id, upload_file.file_path
+        )
 
     return upload_file
 
@@ -334,8 +426,9 @@ async def delete_file(
             detail=f"File with ID: {file_id} not found.",
         )
 
-    # Delete File from local volume, and also the File DB object
-    FileService().delete_file(file.file_path)
+    # Delete the File DB object, and the stored file if no other File uses it
+    file_path, content_hash = file.file_path, file.content_hash
     file_crud.delete_file(session, file_id, user_id)
+    FileService().release_file(session, file_path, content_hash)
 
     return DeleteFile()
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Response
 
+from backend.chat.custom.utils import deployment_cache
 from backend.config.deployments import AVAILABLE_MODEL_DEPLOYMENTS
 from backend.database_models import get_session
 from backend.schemas.deployment import Deployment, UpdateDeploymentEnv
 from backend.services.env import update_env_file
+from backend.services.model_catalog import model_catalog
 from backend.services.request_validators import validate_env_vars
 
 router = APIRouter(
@@ -21,7 +23,9 @@ def list_deployments(all: bool = False) -> list[Deployment]:
         list[Deployment]: List of available deployment options.
     """
     available_deployments = [
-        deployment
+        deployment.model_copy(
+            update={"models": model_catalog.get_models(deployment.deployment_class)}
+        )
         for _, deployment in AVAILABLE_MODEL_DEPLOYMENTS.items()
         if all or deployment.is_available
     ]
@@ -50,3 +54,5 @@ async def set_env_vars(
         str: Empty string.
     """
     update_env_file(env_vars.env_vars)
+    # Cached deployments keep the keys and clients they were created with
+    deployment_cache.clear()
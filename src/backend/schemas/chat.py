@@ -175,6 +175,14 @@ class StreamEnd(ChatResponse):
         default=[],
     )
     finish_reason: str = Field()
+    trace_id: str | None = Field(
+        title="ID of the chat turn, used in the backend logs.",
+        default=None,
+    )
+    timings: Dict[str, float] | None = Field(
+        title="Milliseconds spent in each stage of the chat turn.",
+        default=None,
+    )
 
 
 class NonStreamedChatResponse(ChatResponse):
@@ -3,6 +3,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from backend.database_models.file import FileStatus
+
 
 class File(BaseModel):
     id: str
@@ -14,6 +16,7 @@ class File(BaseModel):
     file_name: str
     file_path: str
     file_size: int = Field(default=0, ge=0)
+    status: FileStatus = FileStatus.PENDING
 
     class Config:
         from_attributes = True
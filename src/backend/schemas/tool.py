@@ -27,6 +27,11 @@ class ManagedTool(Tool):
     error_message: Optional[str] = ""
     category: Category = Category.DataLoader
     implementation: Any = Field(exclude=True)
+    # Maximum number of concurrent calls and seconds per call for function tools
+    max_concurrency: Optional[int] = Field(default=None, exclude=True)
+    timeout: Optional[float] = Field(default=None, exclude=True)
+    # Seconds the results of data loader tools are cached, 0 to disable caching
+    cache_ttl: Optional[float] = Field(default=None, exclude=True)
 
     class Config:
         from_attributes = True
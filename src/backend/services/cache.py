@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from backend.services.metrics import registry
+
+cache_hits = registry.counter("cache_hits_total", "Number of cache hits.")
+cache_misses = registry.counter("cache_misses_total", "Number of cache misses.")
+cache_evictions = registry.counter(
+    "cache_evictions_total", "Number of entries evicted by size or expiry."
+)
+cache_size = registry.gauge("cache_size", "Number of entries in the cache.")
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional time to live.
+
+    Hits, misses, evictions and size are exported as metrics labelled with the
+    cache name.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 128,
+        ttl: float | None = None,
+        on_evict: Callable[[Hashable, Any], None] | None = None,
+    ):
+        """
+        Args:
+            name (str): Cache name, used as the metrics label.
+            max_size (int): Maximum number of entries before the least recently used is evicted.
+            ttl (float | None): Seconds an entry stays valid, None to never expire.
+            on_evict (Callable | None): Called with the key and value of evicted entries.
+        """
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._entries: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key.
+            default (Any): Value returned on a miss.
+
+        Returns:
+            Any: Cached value or default.
+        """
+        evicted = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                evicted = (key, self._entries.pop(key)[0])
+                entry = None
+
+            if entry is None:
+                cache_misses.inc(cache=self.name)
+                value = default
+            else:
+                cache_hits.inc(cache=self.name)
+                self._entries.move_to_end(key)
+                value = entry[0]
+            self._update_size()
+
+        if evicted:
+            self._evicted(*evicted)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Set a value, evicting the least recently used entries when full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+        """
+        evicted = []
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted_key, (evicted_value, _) = self._entries.popitem(last=False)
+                evicted.append((evicted_key, evicted_value))
+            self._update_size()
+
+        for evicted_key, evicted_value in evicted:
+            self._evicted(evicted_key, evicted_value)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Delete a value if present.
+
+        Args:
+            key (Hashable): Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._update_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._update_size()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict[str, float]: Hits, misses, evictions, hit ratio and size of the cache.
+        """
+        hits = cache_hits.get(cache=self.name)
+        misses = cache_misses.get(cache=self.name)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": cache_evictions.get(cache=self.name),
+            "hit_ratio": hits / total if total else 0.0,
+            "size": len(self),
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._is_expired(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_expired(self, entry: tuple[Any, float | None]) -> bool:
+        expires_at = entry[1]
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def _update_size(self) -> None:
+        cache_size.set(len(self._entries), cache=self.name)
+
+    def _evicted(self, key: Hashable, value: Any) -> None:
+        cache_evictions.inc(cache=self.name)
+        if self.on_evict:
+            self.on_evict(key, value)
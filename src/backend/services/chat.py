@@ -1,4 +1,5 @@
 import json
+from json.encoder import encode_basestring_ascii
 from typing import Any, Generator, List, Union
 from uuid import uuid4
 
@@ -9,10 +10,10 @@ from langchain_core.agents import AgentActionMessageLog
 from langchain_core.runnables.utils import AddableDict
 
 from backend.chat.enums import StreamEvent
+from backend.chat.stream_accumulator import StreamAccumulator
 from backend.config.tools import AVAILABLE_TOOLS
 from backend.crud import conversation as conversation_crud
 from backend.crud import file as file_crud
-from backend.crud import message as message_crud
 from backend.database_models.citation import Citation
 from backend.database_models.conversation import Conversation
 from backend.database_models.database import DBSessionDep
@@ -22,7 +23,6 @@ from backend.schemas.chat import (
     BaseChatRequest,
     ChatMessage,
     ChatResponseEvent,
-    ChatRole,
     NonStreamedChatResponse,
     StreamCitationGeneration,
     StreamEnd,
@@ -36,16 +36,38 @@ from backend.schemas.chat import (
     ToolInputType,
 )
 from backend.schemas.cohere_chat import CohereChatRequest
-from backend.schemas.conversation import UpdateConversation
-from backend.schemas.file import UpdateFile
 from backend.schemas.search_query import SearchQuery
 from backend.schemas.tool import ToolCall
+from backend.services.chat_history import chat_history_cache
+from backend.services.file.service import FileService
+from backend.services.logger import get_logger
+from backend.services.tracing import ChatTrace
+from backend.services.turn_writer import TurnWriter
+from backend.services.write_behind import write_turn
+
+logger = get_logger()
+
+# Serialized ChatResponseEvent of a text generation event up to is_finished, the
+# field order follows the schema
+TEXT_GENERATION_EVENT_PREFIX = (
+    '{"event": "' + StreamEvent.TEXT_GENERATION.value + '", "data": {"is_finished": '
+)
 
 
 def process_chat(
     session: DBSessionDep, chat_request: BaseChatRequest, request: Request
 ) -> tuple[
-    DBSessionDep, BaseChatRequest, Union[list[str], None], Message, str, str, dict
+    DBSessionDep,
+    BaseChatRequest,
+    Union[list[str], None],
+    Message,
+    str,
+    str,
+    str,
+    bool,
+    bool,
+    dict,
+    TurnWriter,
 ]:
     """
     Process a chat request.
@@ -72,42 +94,42 @@ def process_chat(
     conversation = get_or_create_conversation(
         session, chat_request, user_id, should_store
     )
+    # Nothing is written until the response is complete, the turn writer stores
+    # the whole turn in one transaction
+    turn_writer = TurnWriter(conversation, user_id)
 
     # Get position to put next message in
-    next_message_position = get_next_message_position(conversation)
+    if turn_writer.is_new_conversation:
+        history = {"next_position": 0, "messages": []}
+    else:
+        history = chat_history_cache.get(session, conversation.id)
+    next_message_position = history["next_position"]
     user_message = create_message(
-        session,
         chat_request,
         conversation.id,
         user_id,
         next_message_position,
         chat_request.message,
         MessageAgent.USER,
-        should_store,
         id=str(uuid4()),
     )
     chatbot_message = create_message(
-        session,
         chat_request,
         conversation.id,
         user_id,
         next_message_position,
         "",
         MessageAgent.CHATBOT,
-        False,
         id=str(uuid4()),
     )
+    turn_writer.add_user_message(user_message)
 
     file_paths = None
     if isinstance(chat_request, CohereChatRequest):
         file_paths = handle_file_retrieval(session, user_id, chat_request.file_ids)
-        attach_files_to_messages(
-            session, user_id, user_message.id, chat_request.file_ids
-        )
+        turn_writer.attach_files(chat_request.file_ids)
 
-    chat_history = create_chat_history(
-        conversation, next_message_position, chat_request
-    )
+    chat_history = create_chat_history(history, chat_request)
 
     # co.chat expects either chat_history or conversation_id, not both
     chat_request.chat_history = chat_history
@@ -129,6 +151,7 @@ def process_chat(
         should_store,
         managed_tools,
         model_config,
+        turn_writer,
     )
 
 
@@ -169,7 +192,7 @@ def get_or_create_conversation(
     should_store: bool,
 ) -> Conversation:
     """
-    Gets or creates a Conversation based on the chat request.
+    Gets or creates a Conversation based on the chat request, new conversations are not stored.
 
     Args:
         session (DBSessionDep): Database session.
@@ -183,57 +206,30 @@ def get_or_create_conversation(
     conversation_id = chat_request.conversation_id or ""
     conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
 
+    # New conversations are stored with the rest of the turn by the TurnWriter,
+    # generate the ID now so messages can reference it
     if conversation is None:
         conversation = Conversation(
             user_id=user_id,
-            id=chat_request.conversation_id,
+            id=chat_request.conversation_id or (str(uuid4()) if should_store else None),
         )
 
-        if should_store:
-            conversation_crud.create_conversation(session, conversation)
-
     return conversation
 
 
-def get_next_message_position(conversation: Conversation) -> int:
-    """
-    Gets message position to create next messages.
-
-    Args:
-        conversation (Conversation): current Conversation.
-
-    Returns:
-        int: Position to save new messages with
-    """
-
-    # Message starts the conversation
-    if len(conversation.messages) == 0:
-        return 0
-
-    # Get current max position from existing Messages
-    current_active_position = max(
-        [message.position for message in conversation.messages if message.is_active]
-    )
-
-    return current_active_position + 1
-
-
 def create_message(
-    session: DBSessionDep,
     chat_request: BaseChatRequest,
     conversation_id: str,
     user_id: str,
     user_message_position: int,
     text: str | None = None,
     agent: MessageAgent = MessageAgent.USER,
-    should_store: bool = True,
     id: str | None = None,
 ) -> Message:
     """
-    Create a message object and store it in the database.
+    Create a message object, stored later with the rest of the turn.
 
     Args:
-        session (DBSessionDep): Database session.
         chat_request (BaseChatRequest): Chat request data.
         conversation_id (str): Conversation ID.
         user_id (str): User ID.
@@ -241,12 +237,11 @@ def create_message(
         id (str): Message ID.
         text (str): Message text.
         agent (MessageAgent): Message agent.
-        should_store (bool): Whether to store the message in the database.
 
     Returns:
         Message: Message object.
     """
-    message = Message(
+    return Message(
         id=id,
         user_id=user_id,
         conversation_id=conversation_id,
@@ -256,16 +251,12 @@ def create_message(
         agent=agent,
     )
 
-    if should_store:
-        return message_crud.create_message(session, message)
-    return message
-
 
 def handle_file_retrieval(
     session: DBSessionDep, user_id: str, file_ids: List[str] | None = None
 ) -> list[str] | None:
     """
-    Retrieve file paths from the database.
+    Retrieve file paths from the database, as local paths readable by the retrievers.
 
     Args:
         session (DBSessionDep): Database session.
@@ -279,47 +270,21 @@ def handle_file_retrieval(
     # Use file_ids if provided
     if file_ids is not None:
         files = file_crud.get_files_by_ids(session, file_ids, user_id)
-        file_paths = [file.file_path for file in files]
+        file_service = FileService()
+        file_paths = [file_service.get_local_path(file.file_path) for file in files]
 
     return file_paths
 
 
-def attach_files_to_messages(
-    session: DBSessionDep,
-    user_id: str,
-    message_id: str,
-    file_ids: List[str] | None = None,
-) -> None:
-    """
-    Attach Files to Message if the File does not have a message_id foreign key.
-
-    Args:
-        session (DBSessionDep): Database session.
-        user_id (str): User ID.
-        message_id (str): Message ID to attach to if needed.
-        file_ids (List): List of File IDs.
-
-    Returns:
-        None
-    """
-    if file_ids is not None:
-        files = file_crud.get_files_by_ids(session, file_ids, user_id)
-        for file in files:
-            if file.message_id is None:
-                file_crud.update_file(session, file, UpdateFile(message_id=message_id))
-
-
 def create_chat_history(
-    conversation: Conversation,
-    user_message_position: int,
+    history: dict,
     chat_request: BaseChatRequest,
 ) -> list[ChatMessage]:
     """
     Create chat history from conversation messages or request.
 
     Args:
-        conversation (Conversation): Conversation object.
-        user_message_position (int): User message position.
+        history (dict): Cached conversation history.
         chat_request (BaseChatRequest): Chat request data.
 
     Returns:
@@ -328,43 +293,7 @@ def create_chat_history(
     if chat_request.chat_history is not None:
         return chat_request.chat_history
 
-    text_messages = [
-        message for message in conversation.messages[:user_message_position]
-    ]
-    return [
-        ChatMessage(
-            role=ChatRole(message.agent.value.upper()),
-            message=message.text,
-        )
-        for message in text_messages
-    ]
-
-
-def update_conversation_after_turn(
-    session: DBSessionDep,
-    response_message: Message,
-    conversation_id: str,
-    final_message_text: str,
-    user_id: str,
-) -> None:
-    """
-    After the last message in a conversation, updates the conversation description with that message's text
-
-    Args:
-        session (DBSessionDep): Database session.
-        response_message (Message): Response message object.
-        conversation_id (str): Conversation ID.
-        final_message_text (str): Final message text.
-    """
-    message_crud.create_message(session, response_message)
-
-    # Update conversation description with final message
-    conversation = conversation_crud.get_conversation(session, conversation_id, user_id)
-    new_conversation = UpdateConversation(
-        description=final_message_text,
-        user_id=conversation.user_id,
-    )
-    conversation_crud.update_conversation(session, conversation, new_conversation)
+    return chat_history_cache.get_chat_history(history)
 
 
 def generate_chat_stream(
@@ -373,7 +302,9 @@ def generate_chat_stream(
     response_message: Message,
     conversation_id: str,
     user_id: str,
+    turn_writer: TurnWriter,
     should_store: bool = True,
+    trace: ChatTrace | None = None,
     **kwargs: Any,
 ) -> Generator[bytes, Any, None]:
     """
@@ -385,19 +316,23 @@ def generate_chat_stream(
         response_message (Message): Response message object.
         conversation_id (str): Conversation ID.
         user_id (str): User ID.
+        turn_writer (TurnWriter): Writer storing the turn once the response is complete.
         should_store (bool): Whether to store the conversation in the database.
+        trace (ChatTrace | None): Trace of the turn, its timings are sent with the stream end.
         **kwargs (Any): Additional keyword arguments.
 
     Yields:
         bytes: Byte representation of chat response event.
     """
+    trace = trace or ChatTrace()
     stream_end_data = {
         "conversation_id": conversation_id,
         "response_id": response_message.id,
+        "trace_id": trace.trace_id,
     }
 
     # Given a stream of CohereEventStream objects, save the final message to DB and yield byte representations
-    final_message_text = ""
+    text_accumulator = StreamAccumulator()
 
     # Map the user facing document_ids field returned from model to storage ID for document model
     document_ids_to_document = {}
@@ -410,7 +345,14 @@ def generate_chat_stream(
             response_message.generation_id = event["generation_id"]
             stream_end_data["generation_id"] = event["generation_id"]
         elif event["event_type"] == StreamEvent.TEXT_GENERATION:
-            final_message_text += event["text"]
+            text_accumulator.append(event["text"])
+            if text_accumulator.token_count == 1:
+                trace.mark("first_token")
+            # Text events are sent for every token, skip the models when possible
+            encoded_event = encode_text_generation_event(event)
+            if encoded_event is not None:
+                yield encoded_event
+                continue
             stream_event = StreamTextGeneration.model_validate(event)
         elif event["event_type"] == StreamEvent.SEARCH_RESULTS:
             for document in event["documents"]:
@@ -488,11 +430,14 @@ def generate_chat_stream(
             stream_event = StreamCitationGeneration(**event | {"citations": citations})
             all_citations.extend(citations)
         elif event["event_type"] == StreamEvent.STREAM_END:
+            trace.mark("last_token")
+            final_message_text = text_accumulator.get_text()
             response_message.citations = all_citations
             response_message.text = final_message_text
 
             stream_end_data["citations"] = all_citations
             stream_end_data["text"] = final_message_text
+            stream_end_data["timings"] = trace.timings()
             stream_end = StreamEnd.model_validate(event | stream_end_data)
             stream_event = stream_end
 
@@ -505,11 +450,47 @@ def generate_chat_stream(
             )
         )
 
-    if should_store:
-        update_conversation_after_turn(
-            session, response_message, conversation_id, final_message_text, user_id
+    final_message_text = text_accumulator.get_text()
+    if text_accumulator.tokens_per_second is not None:
+        logger.info(
+            f"Streamed {text_accumulator.token_count} tokens, "
+            f"time to first token: {text_accumulator.time_to_first_token:.3f}s, "
+            f"tokens per second: {text_accumulator.tokens_per_second:.1f}"
         )
 
+    if should_store:
+        with trace.span("persistence"):
+            write_turn(session, turn_writer, response_message, final_message_text)
+    trace.log()
+
+
+def encode_text_generation_event(event: dict) -> str | None:
+    """
+    Encode a text generation event without building the event models.
+
+    The output is identical to serializing the event through StreamTextGeneration
+    and ChatResponseEvent. Strings are escaped with the C encoder of the json
+    module, the same one json.dumps uses.
+
+    Args:
+        event (dict): Text generation event from the model deployment.
+
+    Returns:
+        str | None: JSON event, None if the event needs to go through the models.
+    """
+    text = event.get("text")
+    is_finished = event.get("is_finished")
+    if type(text) is not str or type(is_finished) is not bool:
+        return None
+
+    return (
+        TEXT_GENERATION_EVENT_PREFIX
+        + ("true" if is_finished else "false")
+        + ', "text": '
+        + encode_basestring_ascii(text)
+        + "}}"
+    )
+
 
 def generate_chat_response(
     session: DBSessionDep,
@@ -517,7 +498,9 @@ def generate_chat_response(
     response_message: Message,
     conversation_id: str,
     user_id: str,
+    turn_writer: TurnWriter,
     should_store: bool = True,
+    trace: ChatTrace | None = None,
     **kwargs: Any,
 ) -> NonStreamedChatResponse:
     """
@@ -529,7 +512,9 @@ def generate_chat_response(
         response_message (Message): Response message object.
         conversation_id (str): Conversation ID.
         user_id (str): User ID.
+        turn_writer (TurnWriter): Writer storing the turn once the response is complete.
         should_store (bool): Whether to store the conversation in the database.
+        trace (ChatTrace | None): Trace of the turn.
         **kwargs (Any): Additional keyword arguments.
 
     Returns:
@@ -590,14 +575,13 @@ def generate_chat_response(
     response_message.text = non_streamed_chat_response.text
     response_message.generation_id = non_streamed_chat_response.generation_id
 
+    trace = trace or ChatTrace()
     if should_store:
-        update_conversation_after_turn(
-            session,
-            response_message,
-            conversation_id,
-            non_streamed_chat_response.text,
-            user_id,
-        )
+        with trace.span("persistence"):
+            write_turn(
+                session, turn_writer, response_message, non_streamed_chat_response.text
+            )
+    trace.log()
 
     return non_streamed_chat_response
 
@@ -608,6 +592,7 @@ def generate_langchain_chat_stream(
     response_message: Message,
     conversation_id: str,
     user_id: str,
+    turn_writer: TurnWriter,
     should_store: bool,
     **kwargs: Any,
 ):
@@ -731,6 +716,4 @@ def generate_langchain_chat_stream(
                     )
                 )
     if should_store:
-        update_conversation_after_turn(
-            session, response_message, conversation_id, final_message_text, user_id
-        )
+        write_turn(session, turn_writer, response_message, final_message_text)
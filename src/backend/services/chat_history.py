@@ -0,0 +1,178 @@
+import os
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from backend.crud import message as message_crud
+from backend.database_models.message import Message
+from backend.schemas.chat import ChatMessage, ChatRole
+from backend.services.cache import LRUCache
+
+# Number of conversations whose history is kept in memory, and seconds before it is
+# reloaded from the database. Turns written by other workers are detected on read
+CHAT_HISTORY_CACHE_SIZE = int(os.getenv("CHAT_HISTORY_CACHE_SIZE", "1024"))
+CHAT_HISTORY_CACHE_TTL = float(os.getenv("CHAT_HISTORY_CACHE_TTL", "300"))
+# Optional limits on the history sent to the model, 0 to send the full history
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "0"))
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "0"))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text, about four characters per token.
+
+    Args:
+        text (str): Text.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return len(text or "") // 4 + 1
+
+
+class ChatHistoryCache:
+    """
+    Per-conversation cache of the chat history and next message position.
+
+    Entries are plain dicts so any backend with get, set and delete methods can be
+    used, the default is an in-process LRU cache. Cached histories are appended
+    to when a turn is written, and invalidated when the conversation changes.
+    """
+
+    def __init__(
+        self,
+        backend: Any = None,
+        max_messages: int = CHAT_HISTORY_MAX_MESSAGES,
+        max_tokens: int = CHAT_HISTORY_MAX_TOKENS,
+        token_estimator: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Args:
+            backend (Any): Cache backend with get, set and delete methods, for example
+                a client to a cache shared by all workers. Defaults to an LRUCache.
+            max_messages (int): Maximum number of messages kept per conversation, 0 for no limit.
+            max_tokens (int): Token budget of the history sent to the model, 0 for no limit.
+            token_estimator (Callable[[str], int]): Estimates the number of tokens of a text.
+        """
+        self.backend = backend or LRUCache(
+            "chat_history", max_size=CHAT_HISTORY_CACHE_SIZE, ttl=CHAT_HISTORY_CACHE_TTL
+        )
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.token_estimator = token_estimator
+
+    def get(self, session: Session, conversation_id: str) -> dict:
+        """
+        Get the history of a conversation, loaded from the database on a miss.
+
+        A cached history is checked against the last message position in the
+        database, and reloaded if another worker wrote a turn since it was cached.
+        Cached histories ahead of the database, with turns still queued for writing,
+        are kept.
+
+        Args:
+            session (Session): Database session.
+            conversation_id (str): Conversation ID.
+
+        Returns:
+            dict: Next message position and [agent, text] pairs of the messages, oldest first.
+        """
+        last_position = message_crud.get_last_message_position(session, conversation_id)
+        history = self.backend.get(conversation_id)
+        if history is not None and (
+            last_position is None or last_position < history["next_position"]
+        ):
+            return history
+
+        next_position = 0 if last_position is None else last_position + 1
+        messages = message_crud.get_message_history(
+            session, conversation_id, next_position, limit=self.max_messages or None
+        )
+
+        history = {
+            "next_position": next_position,
+            "messages": [[message.agent.value, message.text] for message in messages],
+        }
+        self.backend.set(conversation_id, history)
+        return history
+
+    def append_turn(
+        self,
+        conversation_id: str,
+        user_message: Message,
+        response_message: Message,
+        create: bool = False,
+    ) -> None:
+        """
+        Append a written turn to the cached history of its conversation, if cached.
+
+        Args:
+            conversation_id (str): Conversation ID.
+            user_message (Message): User message of the turn.
+            response_message (Message): Chatbot message of the turn.
+            create (bool): Whether to cache the history if missing, for the first
+                turn of a conversation.
+        """
+        history = self.backend.get(conversation_id)
+        if history is None:
+            if not create:
+                return
+            history = {"next_position": 0, "messages": []}
+
+        messages = history["messages"] + [
+            [user_message.agent.value, user_message.text],
+            [response_message.agent.value, response_message.text],
+        ]
+        if self.max_messages:
+            messages = messages[-self.max_messages :]
+
+        self.backend.set(
+            conversation_id,
+            {"next_position": user_message.position + 1, "messages": messages},
+        )
+
+    def invalidate(self, conversation_id: str) -> None:
+        self.backend.delete(conversation_id)
+
+    def get_chat_history(self, history: dict) -> list[ChatMessage]:
+        """
+        Get the chat messages of a history, truncated to the token budget.
+
+        Args:
+            history (dict): History returned by get.
+
+        Returns:
+            list[ChatMessage]: Most recent chat messages within the budget, oldest first.
+        """
+        messages = history["messages"]
+        if self.max_tokens:
+            messages = self.truncate(messages, self.max_tokens)
+
+        return [
+            ChatMessage(role=ChatRole(agent.upper()), message=text)
+            for agent, text in messages
+        ]
+
+    def truncate(self, messages: list, max_tokens: int) -> list:
+        """
+        Keep the most recent messages that fit in a token budget.
+
+        Args:
+            messages (list): [agent, text] pairs, oldest first.
+            max_tokens (int): Token budget.
+
+        Returns:
+            list: Most recent messages within the budget, oldest first.
+        """
+        total_tokens = 0
+        start = len(messages)
+        for _, text in reversed(messages):
+            total_tokens += self.token_estimator(text)
+            if total_tokens > max_tokens:
+                break
+            start -= 1
+
+        return messages[start:]
+
+
+chat_history_cache = ChatHistoryCache()
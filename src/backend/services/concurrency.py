@@ -0,0 +1,60 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Upper bound on the number of blocking calls (rerank, model calls) the backend runs
+# concurrently across all requests of a worker
+MAX_WORKERS = int(os.getenv("THREAD_POOL_MAX_WORKERS", "16"))
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(
+    name: str = "default", max_workers: int | None = None
+) -> ThreadPoolExecutor:
+    """
+    Get a shared thread pool used to fan out blocking calls.
+
+    Calls that time out can't be cancelled once running, they keep their thread
+    until they return. Integrations that may hang, such as retrievers and tools,
+    get their own named pool so their stuck calls only hold their own threads.
+
+    Tasks submitted to a pool must not submit and wait on other tasks of the
+    same pool, otherwise a saturated pool can deadlock.
+
+    Args:
+        name (str): Pool name, one pool is created per name.
+        max_workers (int | None): Threads of the pool when it is created, defaults
+            to THREAD_POOL_MAX_WORKERS.
+
+    Returns:
+        ThreadPoolExecutor: Shared thread pool executor.
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers or MAX_WORKERS,
+                    thread_name_prefix=f"toolkit-{name}",
+                )
+                _executors[name] = executor
+
+    return executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """
+    Shut down the shared thread pools, cancelling calls that have not started.
+
+    Args:
+        wait (bool): Whether to wait for running calls to finish.
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,138 @@
+import hashlib
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, indexes are then only locked within a worker
+    fcntl = None
+
+INDEX_FOLDER_NAME = "indexes"
+# Written once an index is fully built, a folder without it is rebuilt
+COMPLETE_MARKER = ".complete"
+# Lock files are kept next to the index folders, deleting a held lock file would
+# let another worker lock a new file
+LOCK_SUFFIX = ".lock"
+
+_content_hashes: dict[tuple[str, int, int], str] = {}
+_index_locks: dict[str, threading.Lock] = {}
+_index_locks_lock = threading.Lock()
+
+
+def get_content_hash(file_path: str) -> str:
+    """
+    Get the SHA-256 hash of a file, cached until its size or modification time changes.
+
+    Args:
+        file_path (str): File path.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    stat = Path(file_path).stat()
+    key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+    content_hash = _content_hashes.get(key)
+    if content_hash is not None:
+        return content_hash
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+
+    content_hash = sha256.hexdigest()
+    _content_hashes[key] = content_hash
+    return content_hash
+
+
+def get_index_folder(file_path: str) -> Path:
+    """
+    Get the folder holding the vector indexes of a file, one per content version.
+    Indexes are kept in an indexes folder next to the file, the data folder for
+    uploaded files.
+
+    Args:
+        file_path (str): File path.
+
+    Returns:
+        Path: Index folder.
+    """
+    path = Path(file_path).resolve()
+    path_hash = hashlib.sha256(str(path).encode()).hexdigest()
+    return path.parent.joinpath(INDEX_FOLDER_NAME, path_hash[:32])
+
+
+def get_index_path(file_path: str) -> Path:
+    """
+    Get the vector index path of the current content of a file.
+
+    Args:
+        file_path (str): File path.
+
+    Returns:
+        Path: Index path.
+    """
+    return get_index_folder(file_path).joinpath(get_content_hash(file_path))
+
+
+def is_index_complete(index_path: Path) -> bool:
+    return index_path.joinpath(COMPLETE_MARKER).exists()
+
+
+def mark_index_complete(index_path: Path) -> None:
+    """
+    Mark an index as built and delete the indexes of previous file contents.
+
+    Args:
+        index_path (Path): Index path.
+    """
+    index_path.joinpath(COMPLETE_MARKER).touch()
+
+    for path in index_path.parent.iterdir():
+        if path != index_path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def get_index_lock(index_path: Path) -> Iterator[None]:
+    """
+    Hold the lock serializing the build of an index, so concurrent queries on the
+    same file embed it once.
+
+    Threads of a worker wait on an in-process lock, workers sharing the data
+    folder wait on an exclusive file lock next to the index folder. Building and
+    replacing versions of an index both happen under it.
+
+    Args:
+        index_path (Path): Index path.
+    """
+    index_folder = index_path.parent
+    lock_path = index_folder.parent.joinpath(f"{index_folder.name}{LOCK_SUFFIX}")
+
+    with _index_locks_lock:
+        thread_lock = _index_locks.setdefault(str(lock_path), threading.Lock())
+
+    with thread_lock:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def delete_index(file_path: str) -> None:
+    """
+    Delete the vector indexes of a file.
+
+    Args:
+        file_path (str): File path.
+    """
+    shutil.rmtree(get_index_folder(file_path), ignore_errors=True)
@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+from distutils.util import strtobool
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from backend.config.tools import AVAILABLE_TOOLS
+from backend.crud import file as file_crud
+from backend.database_models.database import engine
+from backend.database_models.file import FileStatus
+from backend.schemas.tool import Category
+from backend.services.file.service import FileService
+from backend.services.logger import get_logger
+from backend.services.metrics import registry
+
+# Parse, chunk and index uploaded files in background workers after upload,
+# instead of in the first chat turn that uses them
+FILE_INGESTION_ENABLED = bool(strtobool(os.getenv("FILE_INGESTION_ENABLED", "true")))
+FILE_INGESTION_WORKERS = int(os.getenv("FILE_INGESTION_WORKERS", "2"))
+FILE_INGESTION_QUEUE_SIZE = int(os.getenv("FILE_INGESTION_QUEUE_SIZE", "100"))
+FILE_INGESTION_SHUTDOWN_TIMEOUT = float(
+    os.getenv("FILE_INGESTION_SHUTDOWN_TIMEOUT", "30")
+)
+
+logger = get_logger()
+
+queue_size = registry.gauge(
+    "file_ingestion_queue_size", "Number of files waiting to be ingested."
+)
+files_ingested = registry.counter(
+    "file_ingestion_files_total", "Number of files ingested, by status."
+)
+
+_STOP = object()
+
+
+def ingest_file(file_path: str) -> None:
+    """
+    Build the indexes of a file for every available file loader tool.
+
+    Args:
+        file_path (str): Storage key or path of the file.
+    """
+    file_path = FileService().get_local_path(file_path)
+    for tool in AVAILABLE_TOOLS.values():
+        if tool.category != Category.FileLoader or not tool.is_available:
+            continue
+
+        retriever = tool.implementation(file_path, **tool.kwargs)
+        if hasattr(retriever, "ingest"):
+            retriever.ingest()
+
+
+class FileIngestionQueue:
+    """
+    Bounded queue of uploaded files ingested by a pool of background workers.
+
+    Workers update the status of the file as it is ingested. Retrievers use the
+    indexes built here, and wait on the index lock if a file is still being
+    ingested. A file that can't be queued stays pending and is indexed by its
+    first chat turn.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = lambda: Session(engine),
+        ingester: Callable[[str], None] = ingest_file,
+        workers: int = FILE_INGESTION_WORKERS,
+        max_size: int = FILE_INGESTION_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], Session]): Creates the worker database sessions.
+            ingester (Callable[[str], None]): Ingests the file at a path.
+            workers (int): Number of worker threads.
+            max_size (int): Maximum number of queued files.
+        """
+        self.session_factory = session_factory
+        self.ingester = ingester
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, file_id: str, file_path: str) -> bool:
+        """
+        Queue an uploaded file to be ingested.
+
+        Args:
+            file_id (str): File ID.
+            file_path (str): File path.
+
+        Returns:
+            bool: Whether the file was queued, False if the queue is full.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((file_id, file_path))
+        except queue.Full:
+            logger.warning(f"File ingestion queue full, {file_id} left pending")
+            return False
+
+        queue_size.set(self._queue.qsize())
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, name=f"file-ingestion-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def flush(self) -> None:
+        """
+        Block until all queued files are ingested.
+        """
+        self._queue.join()
+
+    def stop(self, timeout: float | None = FILE_INGESTION_SHUTDOWN_TIMEOUT) -> None:
+        """
+        Ingest the queued files and stop the workers.
+
+        Args:
+            timeout (float | None): Seconds to wait for each worker to finish.
+        """
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"File ingestion worker {thread.name} did not finish")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._ingest(*item)
+            finally:
+                self._queue.task_done()
+                queue_size.set(self._queue.qsize())
+
+    def _ingest(self, file_id: str, file_path: str) -> None:
+        self._set_status(file_id, FileStatus.PROCESSING)
+        try:
+            self.ingester(file_path)
+        except Exception as e:
+            logger.error(f"Failed to ingest file {file_id}: {str(e)}")
+            status = FileStatus.FAILED
+        else:
+            status = FileStatus.READY
+
+        self._set_status(file_id, status)
+        files_ingested.inc(status=status.value)
+
+    def _set_status(self, file_id: str, status: FileStatus) -> None:
+        try:
+            with self.session_factory() as session:
+                file_crud.update_file_status(session, file_id, status)
+        except Exception as e:
+            logger.warning(f"Failed to update status of file {file_id}: {str(e)}")
+
+
+file_ingestion_queue = FileIngestionQueue()
@@ -1,75 +1,216 @@
+import contextlib
+import hashlib
 import os
-import re
+import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
+
+from sqlalchemy.orm import Session
+
+from backend.crud import file as file_crud
+from backend.database_models.file import File
+from backend.services.file.index import delete_index
+from backend.services.file.storage import ReadThroughCache, get_file_storage
+
+# Bytes read at a time from uploads, and maximum upload size, 0 for no limit
+FILE_UPLOAD_CHUNK_SIZE = int(os.getenv("FILE_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+FILE_UPLOAD_MAX_SIZE = int(os.getenv("FILE_UPLOAD_MAX_SIZE", str(50 * 1024 * 1024)))
+
+BLOB_FOLDER_NAME = "blobs"
+
+
+class FileTooLargeError(ValueError):
+    pass
 
 
 class FileService:
     DEFAULT_DATA_FOLDER = "src/backend/data"
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_file_size: int = FILE_UPLOAD_MAX_SIZE,
+        storage: ReadThroughCache | None = None,
+    ):
+        """
+        Args:
+            max_file_size (int): Maximum upload size in bytes, 0 for no limit.
+            storage (ReadThroughCache | None): File storage, defaults to the storage
+                configured by FILE_STORAGE_BACKEND.
+        """
         current_directory = Path(Path.cwd())
         data_folder = Path(self.DEFAULT_DATA_FOLDER)
 
+        # Local folder of the uploads in progress
         self.folder_path = current_directory.joinpath(data_folder)
+        self.max_file_size = max_file_size
+        self.storage = storage or get_file_storage()
 
     def create_file_folder(self):
-        self.folder_path.mkdir(exist_ok=True)
+        self.folder_path.mkdir(parents=True, exist_ok=True)
 
-    def generate_new_filepath(self, file_path: Path) -> Path:
+    def get_blob_key(self, content_hash: str) -> str:
         """
-        Generate a new file path. The path is generated by concatenating the base name with a counter index.
+        Get the storage key of the blob storing a file content.
 
         Args:
-            file_path (Path): File path.
+            content_hash (str): SHA-256 hash of the content.
 
         Returns:
-            Path: New file path.
+            str: Blob key, sharded by the first characters of the hash.
+        """
+        return f"{BLOB_FOLDER_NAME}/{content_hash[:2]}/{content_hash}"
+
+    def upload_file(self, file: Any) -> tuple[str, str, int]:
         """
-        base = file_path.stem
-        suffix = file_path.suffix
+        Upload a file to the content-addressed storage.
+
+        The upload is copied in chunks to a temporary file and hashed on the way.
+        It is then moved to the blob of its hash, or dropped if the blob already
+        exists, so identical uploads share one blob and one index. Identical
+        concurrent uploads write the same content, so no lock is taken here, the
+        File row is created with create_file.
+
+        Args:
+            file (Any): File to be uploaded.
 
-        # Matches for existing counter index
-        # For example: x(2).pdf should generate x(3).pdf, and so on
-        match = re.match(r"(.+)\((\d+)\)$", base)
-        if match:
-            base, counter = match.groups()
-            counter = int(counter) + 1
-        else:
-            counter = 1
+        Returns:
+            tuple[str, str, int]: Blob key, SHA-256 hash and size of the content.
+
+        Raises:
+            FileTooLargeError: If the file is larger than max_file_size.
+        """
+        self.check_file_size(getattr(file, "size", None))
+        self.create_file_folder()
 
-        new_file_path = file_path.with_name(f"{base}({counter}){suffix}")
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=self.folder_path, prefix=".upload-", delete=False
+        )
+        try:
+            with temp_file:
+                content_hash = self.copy_file(file.file, temp_file)
+            size = os.path.getsize(temp_file.name)
 
-        # Recursively handles next generation step if needed
-        while new_file_path.exists():
-            new_file_path = self.generate_new_filepath(new_file_path)
+            blob_key = self.get_blob_key(content_hash)
+            if not self.storage.backend.exists(blob_key):
+                self.storage.backend.move_file(blob_key, Path(temp_file.name))
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_file.name)
 
-        return new_file_path
+        return blob_key, content_hash, size
 
-    def upload_file(self, file: Any) -> Path:
+    def create_file(self, session: Session, file: File) -> File:
         """
-        Upload a file to the data folder.
+        Create the File row of an uploaded content.
+
+        The content is locked while its blob is checked and the row is created, so
+        it can't be collected by a concurrent release_file in between.
 
         Args:
-            file (Any): File to be uploaded.
+            session (Session): Database session.
+            file (File): File referencing the blob returned by upload_file.
 
         Returns:
-            Path: File path.
+            File: Created file.
+
+        Raises:
+            FileNotFoundError: If the blob was collected since the upload, the
+                upload should be retried.
         """
-        # Check if folder already exists
-        if not self.folder_path.is_dir():
-            self.create_file_folder()
+        file_crud.lock_content_hash(session, file.content_hash)
+        if not self.storage.backend.exists(file.file_path):
+            session.rollback()
+            raise FileNotFoundError(f"Stored file {file.file_path} not found.")
 
-        # Check if file exists
-        file_path = self.folder_path.joinpath(file.filename)
-        if file_path.exists():
-            file_path = self.generate_new_filepath(file_path)
+        # Committing releases the lock
+        return file_crud.create_file(session, file)
+
+    def get_local_path(self, file_path: str) -> str:
+        """
+        Get a local path to a stored file, for readers that need one.
+
+        Args:
+            file_path (str): Storage key of the file, or the absolute path of files
+                stored before the storage backends.
+
+        Returns:
+            str: Local file path, downloaded to the worker cache for remote storage.
+        """
+        if Path(file_path).is_absolute():
+            return file_path
+
+        return str(self.storage.get_local_path(file_path))
+
+    def check_file_size(self, size: int | None) -> None:
+        """
+        Raise if a file size is over the limit.
+
+        Args:
+            size (int | None): File size in bytes, None if unknown.
+
+        Raises:
+            FileTooLargeError: If the file is larger than max_file_size.
+        """
+        if self.max_file_size and size is not None and size > self.max_file_size:
+            raise FileTooLargeError(
+                f"File is larger than the maximum size of {self.max_file_size} bytes."
+            )
+
+    def copy_file(self, source: BinaryIO, destination: BinaryIO) -> str:
+        """
+        Copy a file in chunks, checking its size as it is read.
+
+        Args:
+            source (BinaryIO): File to read.
+            destination (BinaryIO): File to write.
+
+        Returns:
+            str: SHA-256 hash of the content.
+
+        Raises:
+            FileTooLargeError: If the file is larger than max_file_size.
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        while chunk := source.read(FILE_UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            self.check_file_size(size)
+            sha256.update(chunk)
+            destination.write(chunk)
+
+        return sha256.hexdigest()
+
+    def release_file(
+        self, session: Session, file_path: str, content_hash: str | None
+    ) -> bool:
+        """
+        Delete a stored file once no File row references its content.
+
+        Call after deleting the File rows. Files uploaded before content-addressed
+        storage have no hash and are deleted right away.
+
+        Args:
+            session (Session): Database session.
+            file_path (str): Storage key or absolute path of the stored file.
+            content_hash (str | None): SHA-256 hash of the content.
 
-        # Write file to data folder
-        with file_path.open("wb") as buffer:
-            buffer.write(file.file.read())
+        Returns:
+            bool: Whether the file was deleted.
+        """
+        try:
+            if content_hash:
+                # Held until the end of the transaction, see create_file
+                file_crud.lock_content_hash(session, content_hash)
+                if file_crud.count_files_by_content_hash(session, content_hash):
+                    return False
 
-        return file_path
+            if Path(file_path).is_absolute():
+                return self.delete_file(file_path)
+
+            self.storage.delete(file_path)
+            return True
+        finally:
+            session.commit()
 
     def delete_file(self, file_name: str) -> bool:
         """
@@ -81,8 +222,10 @@ class FileService:
         Returns:
             str: File path.
         """
-        # Check if file exists
         file_path = self.folder_path.joinpath(file_name)
+        delete_index(file_path)
+
+        # Check if file exists
         if not file_path.exists():
             return True
 
@@ -91,5 +234,4 @@ class FileService:
             return True
         except OSError:
             print(f"Error deleting file at: {file_path}")
-        finally:
             return False
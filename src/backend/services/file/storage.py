@@ -0,0 +1,408 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import boto3
+
+from backend.services.file.index import INDEX_FOLDER_NAME, delete_index
+
+# Where uploaded files are stored: local, or s3 for any S3-compatible object store
+FILE_STORAGE_BACKEND = os.getenv("FILE_STORAGE_BACKEND", "local")
+FILE_STORAGE_S3_BUCKET = os.getenv("FILE_STORAGE_S3_BUCKET", "")
+FILE_STORAGE_S3_PREFIX = os.getenv("FILE_STORAGE_S3_PREFIX", "")
+FILE_STORAGE_S3_ENDPOINT_URL = os.getenv("FILE_STORAGE_S3_ENDPOINT_URL") or None
+# Per-worker cache of files downloaded from remote storage, and its size in bytes
+FILE_CACHE_FOLDER = os.getenv("FILE_CACHE_FOLDER", "src/backend/data/cache")
+FILE_CACHE_MAX_SIZE = int(os.getenv("FILE_CACHE_MAX_SIZE", str(1024 * 1024 * 1024)))
+
+DEFAULT_DATA_FOLDER = "src/backend/data"
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """
+    Abstract base class for the stores of uploaded files.
+
+    Files are addressed by keys, relative paths such as blobs/ab/abcdef.
+    """
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """
+        Open a stored file for streaming reads.
+
+        Args:
+            key (str): File key.
+
+        Returns:
+            BinaryIO: Readable file object, to be closed by the caller.
+        """
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        """
+        Read part of a stored file.
+
+        Args:
+            key (str): File key.
+            start (int): Offset of the first byte.
+            length (int): Number of bytes to read.
+
+        Returns:
+            bytes: Bytes read, fewer than length at the end of the file.
+        """
+
+    @abstractmethod
+    def write(self, key: str, source: BinaryIO) -> None:
+        """
+        Store a file from a stream, replacing any file with the same key.
+
+        Args:
+            key (str): File key.
+            source (BinaryIO): Readable file object.
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def get_size(self, key: str) -> int: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    def move_file(self, key: str, path: Path) -> None:
+        """
+        Store a local file and remove it.
+
+        Args:
+            key (str): File key.
+            path (Path): Local file path.
+        """
+        with open(path, "rb") as f:
+            self.write(key, f)
+        os.unlink(path)
+
+    def get_local_path(self, key: str) -> Path | None:
+        """
+        Get the local path of a stored file, if the backend stores files locally.
+
+        Args:
+            key (str): File key.
+
+        Returns:
+            Path | None: Local path, None for remote backends.
+        """
+        return None
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores files in a local folder, or a volume shared by the workers.
+    """
+
+    def __init__(self, root: str | Path):
+        """
+        Args:
+            root (str | Path): Folder holding the files.
+        """
+        self.root = Path(root)
+
+    def open(self, key: str) -> BinaryIO:
+        return self._get_path(key).open("rb")
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        with self.open(key) as f:
+            f.seek(start)
+            return f.read(length)
+
+    def write(self, key: str, source: BinaryIO) -> None:
+        path = self._get_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write next to the final path then rename, readers never see a partial file
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=".write-", delete=False
+        )
+        try:
+            with temp_file:
+                shutil.copyfileobj(source, temp_file, COPY_CHUNK_SIZE)
+            os.replace(temp_file.name, path)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_file.name)
+
+    def move_file(self, key: str, path: Path) -> None:
+        destination = self._get_path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, destination)
+
+    def exists(self, key: str) -> bool:
+        return self._get_path(key).exists()
+
+    def get_size(self, key: str) -> int:
+        return self._get_path(key).stat().st_size
+
+    def delete(self, key: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self._get_path(key))
+
+    def get_local_path(self, key: str) -> Path:
+        return self._get_path(key)
+
+    def _get_path(self, key: str) -> Path:
+        path = self.root.joinpath(key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid file key: {key}")
+        return path
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores files in a bucket of an S3-compatible object store, for example S3 or MinIO.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client: Any = None,
+        endpoint_url: str | None = None,
+    ):
+        """
+        Args:
+            bucket (str): Bucket name.
+            prefix (str): Prefix added to the keys.
+            client (Any): boto3 S3 client, created from the environment if not given.
+            endpoint_url (str | None): URL of an S3-compatible store, None for AWS.
+        """
+        if client is None:
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client
+
+    def open(self, key: str) -> BinaryIO:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._get_key(key))
+        return response["Body"]
+
+    def read_range(self, key: str, start: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self._get_key(key),
+            Range=f"bytes={start}-{start + length - 1}",
+        )
+        return response["Body"].read()
+
+    def write(self, key: str, source: BinaryIO) -> None:
+        # upload_fileobj streams the file in parts
+        self.client.upload_fileobj(source, self.bucket, self._get_key(key))
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._get_key(key))
+            return True
+        except Exception as e:
+            if _get_error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def get_size(self, key: str) -> int:
+        response = self.client.head_object(Bucket=self.bucket, Key=self._get_key(key))
+        return response["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._get_key(key))
+
+    def _get_key(self, key: str) -> str:
+        return f"{self.prefix.rstrip('/')}/{key}" if self.prefix else key
+
+
+def _get_error_code(error: Exception) -> str | None:
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code")
+
+
+class ReadThroughCache:
+    """
+    Gives local paths to stored files, for readers such as PDF loaders.
+
+    Files of local backends are used in place. Files of remote backends are
+    downloaded to a per-worker cache folder on first use, the least recently used
+    ones are evicted once the cache is over its size. Vector indexes built next to
+    cached files are evicted with them, so files deleted through another worker
+    don't leave their copy and indexes behind for good.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        folder: str | Path = FILE_CACHE_FOLDER,
+        max_size: int = FILE_CACHE_MAX_SIZE,
+    ):
+        """
+        Args:
+            backend (StorageBackend): Storage backend.
+            folder (str | Path): Cache folder.
+            max_size (int): Maximum total size of the cached files in bytes.
+        """
+        self.backend = backend
+        self.folder = Path(folder)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._download_locks: dict[str, threading.Lock] = {}
+
+    def get_local_path(self, key: str) -> Path:
+        """
+        Get a local path to a stored file, downloading it if needed.
+
+        Args:
+            key (str): File key.
+
+        Returns:
+            Path: Local file path.
+        """
+        local_path = self.backend.get_local_path(key)
+        if local_path is not None:
+            return local_path
+
+        path = self.folder.joinpath(key)
+        if self._touch(path):
+            return path
+
+        with self._lock:
+            download_lock = self._download_locks.setdefault(key, threading.Lock())
+
+        # Only readers of the same file wait for its download
+        try:
+            with download_lock:
+                if self._touch(path):
+                    return path
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = tempfile.NamedTemporaryFile(
+                    dir=path.parent, prefix=".download-", delete=False
+                )
+                try:
+                    with temp_file, self.backend.open(key) as source:
+                        shutil.copyfileobj(source, temp_file, COPY_CHUNK_SIZE)
+                    os.replace(temp_file.name, path)
+                finally:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(temp_file.name)
+        finally:
+            with self._lock:
+                self._download_locks.pop(key, None)
+
+        with self._lock:
+            self._evict(keep=path)
+
+        return path
+
+    def delete(self, key: str) -> None:
+        """
+        Delete a stored file, its cached copy and its vector indexes.
+
+        Args:
+            key (str): File key.
+        """
+        self.backend.delete(key)
+        delete_index(self.backend.get_local_path(key) or self.folder.joinpath(key))
+        self.evict(key)
+
+    def evict(self, key: str) -> None:
+        """
+        Remove a file from the cache.
+
+        Args:
+            key (str): File key.
+        """
+        if self.backend.get_local_path(key) is not None:
+            return
+
+        with self._lock:
+            self._remove(self.folder.joinpath(key))
+
+    def _evict(self, keep: Path) -> None:
+        files = [
+            (path.stat(), path)
+            for path in self.folder.rglob("*")
+            if path.is_file() and INDEX_FOLDER_NAME not in path.parts
+        ]
+        total_size = sum(stat.st_size for stat, _ in files)
+
+        for stat, path in sorted(files, key=lambda file: file[0].st_mtime):
+            if total_size <= self.max_size:
+                break
+            if path == keep:
+                continue
+
+            self._remove(path)
+            total_size -= stat.st_size
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        try:
+            # Modification time orders the cached files for eviction
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        delete_index(path)
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Get the storage backend configured by FILE_STORAGE_BACKEND.
+
+    Returns:
+        StorageBackend: Storage backend.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if FILE_STORAGE_BACKEND == "local":
+        return LocalStorageBackend(Path.cwd().joinpath(DEFAULT_DATA_FOLDER))
+    if FILE_STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            FILE_STORAGE_S3_BUCKET,
+            prefix=FILE_STORAGE_S3_PREFIX,
+            endpoint_url=FILE_STORAGE_S3_ENDPOINT_URL,
+        )
+
+    raise ValueError(f"File storage backend {FILE_STORAGE_BACKEND} is not supported.")
+
+
+_file_storage = None
+_file_storage_lock = threading.Lock()
+
+
+def get_file_storage() -> ReadThroughCache:
+    """
+    Get the shared file storage of the worker.
+
+    Returns:
+        ReadThroughCache: Configured storage backend behind the worker's read cache.
+    """
+    global _file_storage
+
+    if _file_storage is None:
+        with _file_storage_lock:
+            if _file_storage is None:
+                _file_storage = ReadThroughCache(get_storage_backend())
+
+    return _file_storage
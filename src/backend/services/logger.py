@@ -7,10 +7,15 @@ from starlette.requests import Request
 
 class LoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = await call_next(request)
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
-        logging.info(f"{request.method} {request.url.path}\n{request.headers}")
+        logging.info(
+            f"{request.method} {request.url.path} {response.status_code} {duration_ms:.0f}ms"
+        )
+        # Headers carry the user and deployment secrets, only log them when debugging
+        logging.debug(f"{request.method} {request.url.path}\n{request.headers}")
         return response
 
 
@@ -0,0 +1,173 @@
+"""
+Minimal in-process metrics registry, rendered in the Prometheus text exposition
+format by the /metrics endpoint.
+
+Metrics are per worker process, scrape each worker to get the full picture.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+LabelValues = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues) -> str:
+    if not labels:
+        return ""
+
+    formatted = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + formatted + "}"
+
+
+class Metric:
+    """
+    Base for all metrics, holds one value per set of label values.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    # Seconds, suited to request and stage latencies
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(
+        self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._observations: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            # Bucket counts, then the sum and count of the observations
+            observation = self._observations.setdefault(
+                key, [0] * len(self.buckets) + [0.0, 0]
+            )
+            for i, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    observation[i] += 1
+            observation[-2] += value
+            observation[-1] += 1
+
+    def get(self, **labels: str) -> float:
+        """
+        Get the number of observations.
+        """
+        observation = self._observations.get(tuple(sorted(labels.items())))
+        return observation[-1] if observation else 0
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            for labels, observation in self._observations.items():
+                for bucket, count in zip(self.buckets, observation):
+                    bucket_labels = labels + (("le", str(bucket)),)
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(bucket_labels)} {count}"
+                    )
+                inf_labels = labels + (("le", "+Inf"),)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(inf_labels)} {observation[-1]}"
+                )
+                lines.append(
+                    f"{self.name}_sum{_format_labels(labels)} {observation[-2]}"
+                )
+                lines.append(
+                    f"{self.name}_count{_format_labels(labels)} {observation[-1]}"
+                )
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class: type, name: str, description: str):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, description)
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        buckets: Tuple[float, ...] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, description, buckets)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Type
+
+from backend.model_deployments.base import BaseDeployment
+from backend.services.logger import get_logger
+
+# Seconds before the models of a deployment are refreshed in the background
+MODEL_CATALOG_TTL = float(os.getenv("MODEL_CATALOG_TTL", "3600"))
+# Optional JSON file used to warm start the catalog across restarts
+MODEL_CATALOG_CACHE_PATH = os.getenv("MODEL_CATALOG_CACHE_PATH")
+
+logger = get_logger()
+
+
+class ModelCatalog:
+    """
+    Lazily loaded catalog of the models available for each deployment.
+
+    The first lookup of a deployment calls its list_models, later lookups are served
+    from memory and refreshed in the background once older than the TTL. When a
+    cache path is set, the catalog is persisted to disk and loaded on first use.
+    """
+
+    def __init__(self, ttl: float = MODEL_CATALOG_TTL, cache_path: str | None = None):
+        self.ttl = ttl
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._entries: dict[str, dict] = {}
+        self._refreshing: set[str] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_models(self, deployment_class: Type[BaseDeployment]) -> list[str]:
+        """
+        Get the models of a deployment.
+
+        Args:
+            deployment_class (Type[BaseDeployment]): Deployment class.
+
+        Returns:
+            list[str]: Model names, possibly stale while a refresh is running.
+        """
+        self._load()
+        key = self._get_key(deployment_class)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return self.refresh(deployment_class)
+
+        # Retry empty results early, they are usually a failed first fetch
+        if not entry["models"] or time.time() - entry["fetched_at"] > self.ttl:
+            self._refresh_in_background(deployment_class)
+
+        return entry["models"]
+
+    def refresh(self, deployment_class: Type[BaseDeployment]) -> list[str]:
+        """
+        Fetch the models of a deployment and update the catalog.
+
+        Stale models are kept if the deployment fails to list its models.
+
+        Args:
+            deployment_class (Type[BaseDeployment]): Deployment class.
+
+        Returns:
+            list[str]: Model names.
+        """
+        key = self._get_key(deployment_class)
+
+        try:
+            models = deployment_class.list_models()
+        except Exception as e:
+            logger.warning(f"Couldn't list models for {key}: {str(e)}")
+            models = None
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if not models and previous and previous["models"]:
+                models = previous["models"]
+            self._entries[key] = {"models": models or [], "fetched_at": time.time()}
+
+        self._save()
+        return models or []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+    def _refresh_in_background(self, deployment_class: Type[BaseDeployment]) -> None:
+        key = self._get_key(deployment_class)
+
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.refresh(deployment_class)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        with self._lock:
+            self._loaded = True
+            if not self.cache_path or not self.cache_path.exists():
+                return
+
+            try:
+                self._entries = json.loads(self.cache_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Couldn't load model catalog: {str(e)}")
+
+    def _save(self) -> None:
+        if not self.cache_path:
+            return
+
+        with self._lock:
+            data = json.dumps(self._entries)
+
+        # Write to a temporary file first so readers never see a partial file
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(
+                f".{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_text(data)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Couldn't save model catalog: {str(e)}")
+
+    def _get_key(self, deployment_class: Type[BaseDeployment]) -> str:
+        return f"{deployment_class.__module__}.{deployment_class.__qualname__}"
+
+
+model_catalog = ModelCatalog(cache_path=MODEL_CATALOG_CACHE_PATH)
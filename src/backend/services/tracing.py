@@ -0,0 +1,87 @@
+import threading
+import time
+from contextlib import contextmanager
+from uuid import uuid4
+
+from backend.services.logger import get_logger
+from backend.services.metrics import registry
+
+logger = get_logger()
+
+chat_stage_duration = registry.histogram(
+    "chat_stage_duration_seconds", "Duration of the stages of a chat turn."
+)
+
+
+class ChatTrace:
+    """
+    Records the duration of the stages of a chat turn.
+
+    Every span is exported to the chat_stage_duration_seconds histogram labelled
+    with its stage, and returned by timings for the stream end event. Spans may be
+    recorded from several threads, for example concurrent retriever calls.
+    """
+
+    def __init__(self, trace_id: str | None = None):
+        """
+        Args:
+            trace_id (str | None): ID of the turn, generated if not given.
+        """
+        self.trace_id = trace_id or uuid4().hex
+        self.start_time = time.perf_counter()
+        self._spans: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+        Time the wrapped block as a stage of the turn.
+
+        Args:
+            stage (str): Stage name.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start_time)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of a stage.
+
+        A stage recorded several times keeps its longest duration, which is the one
+        on the critical path when the calls ran concurrently.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Duration in seconds.
+        """
+        chat_stage_duration.observe(seconds, stage=stage)
+        with self._lock:
+            self._spans[stage] = max(seconds, self._spans.get(stage, 0))
+
+    def mark(self, stage: str) -> None:
+        """
+        Record the time elapsed since the start of the turn, for example the first token.
+
+        Args:
+            stage (str): Stage name.
+        """
+        self.record(stage, time.perf_counter() - self.start_time)
+
+    def timings(self) -> dict[str, float]:
+        """
+        Get the duration of the stages recorded so far.
+
+        Returns:
+            dict[str, float]: Milliseconds per stage.
+        """
+        with self._lock:
+            return {
+                stage: round(seconds * 1000, 1)
+                for stage, seconds in self._spans.items()
+            }
+
+    def log(self) -> None:
+        logger.info(f"Chat trace {self.trace_id}: {self.timings()}")
@@ -0,0 +1,135 @@
+from typing import List
+
+from sqlalchemy import case, inspect, update
+from sqlalchemy.orm import Session
+
+from backend.database_models.conversation import Conversation
+from backend.database_models.file import File, FileStatus
+from backend.database_models.message import Message
+
+
+class TurnWriter:
+    """
+    Unit of work for a chat turn.
+
+    Collects the objects created while processing a turn and writes them in a
+    single transaction once the response is complete: the conversation if it is
+    new, the user and chatbot messages with their documents and citations, the
+    file links and status, and the conversation description.
+    """
+
+    def __init__(self, conversation: Conversation, user_id: str):
+        """
+        Args:
+            conversation (Conversation): Conversation of the turn, created by the
+                writer if it was never stored.
+            user_id (str): User ID.
+        """
+        self.conversation = conversation
+        self.conversation_id = conversation.id
+        self.user_id = user_id
+        self.is_new_conversation = inspect(conversation).transient
+        self.user_message: Message | None = None
+        self.file_ids: List[str] = []
+
+    def add_user_message(self, message: Message) -> None:
+        self.user_message = message
+
+    def attach_files(self, file_ids: List[str] | None) -> None:
+        """
+        Attach files to the user message if they are not attached to a message yet.
+
+        Args:
+            file_ids (List[str] | None): File IDs.
+        """
+        self.file_ids.extend(file_ids or [])
+
+    def write_conversation(self, session: Session, description: str) -> None:
+        """
+        Store a new conversation now, before the rest of the turn.
+
+        Used when the turn is written in the background, so the next turn of the
+        conversation finds it. The turn then only updates its description.
+
+        Args:
+            session (Session): Database session.
+            description (str): Conversation description, the final message text.
+        """
+        if not self.is_new_conversation:
+            return
+
+        self.conversation.description = description
+        try:
+            session.add(self.conversation)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        self.is_new_conversation = False
+
+    def write(
+        self, session: Session, response_message: Message, description: str
+    ) -> None:
+        """
+        Write the turn in a single transaction.
+
+        Args:
+            session (Session): Database session.
+            response_message (Message): Chatbot message with its documents and citations.
+            description (str): New conversation description, the final message text.
+        """
+        try:
+            self.add(session, response_message, description)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def add(
+        self, session: Session, response_message: Message, description: str
+    ) -> None:
+        """
+        Add the turn to the current transaction of the session without committing.
+
+        Messages, documents and citations are inserted in batches by the session,
+        the file links and status, and the description are set with one UPDATE each.
+
+        Args:
+            session (Session): Database session.
+            response_message (Message): Chatbot message with its documents and citations.
+            description (str): New conversation description, the final message text.
+        """
+        objects = [self.user_message, response_message]
+        if self.is_new_conversation:
+            self.conversation.description = description
+            objects.insert(0, self.conversation)
+
+        session.add_all([obj for obj in objects if obj is not None])
+        session.flush()
+
+        if self.file_ids and self.user_message is not None:
+            # Files never picked up by the ingestion workers were indexed by this turn
+            session.execute(
+                update(File)
+                .where(File.id.in_(self.file_ids), File.user_id == self.user_id)
+                .values(
+                    message_id=case(
+                        (File.message_id.is_(None), self.user_message.id),
+                        else_=File.message_id,
+                    ),
+                    status=case(
+                        (File.status == FileStatus.PENDING, FileStatus.READY),
+                        else_=File.status,
+                    ),
+                )
+            )
+
+        if not self.is_new_conversation:
+            session.execute(
+                update(Conversation)
+                .where(
+                    Conversation.id == self.conversation_id,
+                    Conversation.user_id == self.user_id,
+                )
+                .values(description=description)
+            )
@@ -0,0 +1,235 @@
+import os
+import queue
+import threading
+import time
+from distutils.util import strtobool
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from backend.database_models.database import engine
+from backend.database_models.message import Message
+from backend.services.chat_history import chat_history_cache
+from backend.services.logger import get_logger
+from backend.services.metrics import registry
+from backend.services.turn_writer import TurnWriter
+
+# Write finished turns from a background worker instead of the request, so the
+# stream releases its database connection as soon as the last event is sent
+WRITE_BEHIND_ENABLED = bool(strtobool(os.getenv("WRITE_BEHIND_ENABLED", "false")))
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "1000"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "50"))
+WRITE_BEHIND_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "3"))
+WRITE_BEHIND_SHUTDOWN_TIMEOUT = float(os.getenv("WRITE_BEHIND_SHUTDOWN_TIMEOUT", "30"))
+
+logger = get_logger()
+
+queue_size = registry.gauge(
+    "write_behind_queue_size", "Number of chat turns waiting to be written."
+)
+turns_written = registry.counter(
+    "write_behind_turns_written_total", "Number of chat turns written by the worker."
+)
+turns_failed = registry.counter(
+    "write_behind_turns_failed_total", "Number of chat turns dropped after retries."
+)
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of finished chat turns written by a background worker.
+
+    The worker drains the queue in batches, each batch is written in one
+    transaction. A failed batch is retried with backoff, then each turn is
+    written on its own so one bad turn doesn't drop the others.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = lambda: Session(engine),
+        max_size: int = WRITE_BEHIND_QUEUE_SIZE,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+        retry_delay: float = 0.5,
+    ):
+        """
+        Args:
+            session_factory (Callable[[], Session]): Creates the worker database sessions.
+            max_size (int): Maximum number of queued turns.
+            batch_size (int): Maximum number of turns written per transaction.
+            max_retries (int): Attempts to write a batch before writing turns one by one.
+            retry_delay (float): Seconds before the first retry, doubled on each retry.
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_size)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self, turn_writer: TurnWriter, response_message: Message, description: str
+    ) -> bool:
+        """
+        Queue a finished turn to be written by the worker.
+
+        Args:
+            turn_writer (TurnWriter): Writer of the turn.
+            response_message (Message): Chatbot message with its documents and citations.
+            description (str): New conversation description.
+
+        Returns:
+            bool: Whether the turn was queued, False if the queue is full.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((turn_writer, response_message, description))
+        except queue.Full:
+            return False
+
+        queue_size.set(self._queue.qsize())
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="write-behind", daemon=True
+                )
+                self._worker.start()
+
+    def flush(self) -> None:
+        """
+        Block until all queued turns are written.
+        """
+        self._queue.join()
+
+    def stop(self, timeout: float | None = WRITE_BEHIND_SHUTDOWN_TIMEOUT) -> None:
+        """
+        Write the queued turns and stop the worker.
+
+        Args:
+            timeout (float | None): Seconds to wait for the queued turns to be written.
+        """
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+
+        if worker is None:
+            return
+
+        self._queue.put(_STOP)
+        worker.join(timeout)
+        if worker.is_alive():
+            logger.warning(
+                f"Write-behind worker did not finish, {self._queue.qsize()} turns not written"
+            )
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            turns = [turn for turn in batch if turn is not _STOP]
+            try:
+                if turns:
+                    self._write_batch(turns)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                queue_size.set(self._queue.qsize())
+
+            if stop:
+                return
+
+    def _write_batch(self, turns: list[tuple]) -> None:
+        delay = self.retry_delay
+        for attempt in range(self.max_retries):
+            try:
+                self._write(turns)
+                turns_written.inc(len(turns))
+                return
+            except Exception as e:
+                logger.warning(
+                    f"Failed to write {len(turns)} turns (attempt {attempt + 1}): {str(e)}"
+                )
+                if attempt + 1 < self.max_retries:
+                    time.sleep(delay)
+                    delay *= 2
+
+        # Write the turns one by one so a single bad turn doesn't drop the batch
+        for turn in turns:
+            try:
+                self._write([turn])
+                turns_written.inc()
+            except Exception as e:
+                turns_failed.inc()
+                chat_history_cache.invalidate(turn[0].conversation_id)
+                logger.error(f"Dropped chat turn {turn[1].id}: {str(e)}")
+
+    def _write(self, turns: list[tuple]) -> None:
+        with self.session_factory() as session:
+            try:
+                for turn_writer, response_message, description in turns:
+                    turn_writer.add(session, response_message, description)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+
+write_behind_queue = WriteBehindQueue()
+
+
+def write_turn(
+    session: Session,
+    turn_writer: TurnWriter,
+    response_message: Message,
+    description: str,
+) -> None:
+    """
+    Write a finished turn, in the background if write-behind is enabled.
+
+    Falls back to writing with the request session when the queue is full. The
+    turn is appended to the cached history of the conversation.
+
+    Args:
+        session (Session): Request database session.
+        turn_writer (TurnWriter): Writer of the turn.
+        response_message (Message): Chatbot message with its documents and citations.
+        description (str): New conversation description.
+    """
+    # Append before writing, committing expires the attributes of the messages.
+    # The cached history includes queued turns, so the next turn sees this one
+    # even if the worker has not written it yet
+    conversation_id = turn_writer.conversation_id
+    if turn_writer.user_message is not None:
+        chat_history_cache.append_turn(
+            conversation_id,
+            turn_writer.user_message,
+            response_message,
+            create=turn_writer.is_new_conversation,
+        )
+
+    try:
+        # A queued new conversation would be created again by the next turn, which
+        # finds no conversation in the database. Store it now, queue the messages
+        if WRITE_BEHIND_ENABLED and turn_writer.is_new_conversation:
+            turn_writer.write_conversation(session, description)
+
+        if not (
+            WRITE_BEHIND_ENABLED
+            and write_behind_queue.submit(turn_writer, response_message, description)
+        ):
+            turn_writer.write(session, response_message, description)
+    except Exception:
+        chat_history_cache.invalidate(conversation_id)
+        raise
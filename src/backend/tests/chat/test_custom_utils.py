@@ -0,0 +1,53 @@
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from backend.chat.custom.utils import deployment_cache, get_deployment
+from backend.config.deployments import AVAILABLE_MODEL_DEPLOYMENTS
+from backend.schemas.deployment import Deployment
+from backend.tests.model_deployments.mock_deployments import MockCohereDeployment
+
+
+class MockPooledDeployment(MockCohereDeployment):
+    def __init__(self, **kwargs: Any):
+        self.deployment_config = kwargs.get("deployment_config")
+
+
+@pytest.fixture
+def mock_deployments():
+    deployments = {
+        "Pooled": Deployment(
+            name="Pooled",
+            models=[],
+            is_available=True,
+            deployment_class=MockPooledDeployment,
+            env_vars=[],
+        )
+    }
+    deployment_cache.clear()
+    with patch.dict(AVAILABLE_MODEL_DEPLOYMENTS, deployments, clear=True):
+        yield
+    deployment_cache.clear()
+
+
+def test_get_deployment_reuses_instance(mock_deployments) -> None:
+    first = get_deployment("Pooled", deployment_config={"key": "1"}, stream=True)
+    second = get_deployment("Pooled", deployment_config={"key": "1"}, stream=False)
+
+    assert first is second
+    assert first.deployment_config == {"key": "1"}
+
+
+def test_get_deployment_keys_on_config(mock_deployments) -> None:
+    first = get_deployment("Pooled", deployment_config={"key": "1"})
+    second = get_deployment("Pooled", deployment_config={"key": "2"})
+
+    assert first is not second
+    assert second.deployment_config == {"key": "2"}
+
+
+def test_get_deployment_falls_back_to_available(mock_deployments) -> None:
+    deployment = get_deployment("Unknown")
+
+    assert type(deployment) is MockPooledDeployment
@@ -0,0 +1,88 @@
+import os
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.chat import collate
+from backend.chat.local_rerank import LocalReranker
+
+is_benchmark_enabled = os.environ.get("RUN_BENCHMARKS") is not None
+
+
+def test_invoke_rerank_sorts_by_relevance() -> None:
+    reranker = LocalReranker()
+    documents = [
+        "Goats live on farms.",
+        "Mountain goats climb the mountain.",
+        "Cable cars go up the mountain.",
+    ]
+
+    res = reranker.invoke_rerank(query="mountain goat", documents=documents)
+
+    assert [r.index for r in res.results] == [1, 2, 0]
+    assert res.results[0].relevance_score > res.results[1].relevance_score
+
+
+def test_invoke_rerank_applies_top_n() -> None:
+    reranker = LocalReranker()
+
+    res = reranker.invoke_rerank(
+        query="cable", documents=["goat", "cable", {"text": "cable car"}], top_n=2
+    )
+
+    assert [r.index for r in res.results] == [1, 2]
+
+
+def test_invoke_rerank_keeps_order_without_matches() -> None:
+    reranker = LocalReranker()
+
+    res = reranker.invoke_rerank(query="penguin", documents=["a", "b", "c"])
+
+    assert [r.index for r in res.results] == [0, 1, 2]
+    assert all(r.relevance_score == 0 for r in res.results)
+
+
+def test_rerank_uses_local_reranker_without_deployment_rerank() -> None:
+    model = SimpleNamespace(rerank_enabled=False)
+    input = {"mountain": [{"text": "software"}, {"text": "mountain hill"}]}
+
+    assert collate.rerank(input, model, top_n=0) == {
+        "mountain": [{"text": "mountain hill"}, {"text": "software"}]
+    }
+
+
+def test_rerank_trims_local_rerank_by_default(monkeypatch) -> None:
+    monkeypatch.setattr(collate, "RERANK_TOP_N", 0)
+    monkeypatch.setattr(collate, "LOCAL_RERANK_TOP_N", 2)
+    model = SimpleNamespace(rerank_enabled=False)
+    input = {
+        "mountain": [
+            {"text": "software"},
+            {"text": "mountain hill"},
+            {"text": "mountain"},
+        ]
+    }
+
+    assert collate.rerank(input, model) == {
+        "mountain": [{"text": "mountain"}, {"text": "mountain hill"}]
+    }
+
+
+@pytest.mark.skipif(not is_benchmark_enabled, reason="RUN_BENCHMARKS not set")
+@pytest.mark.parametrize(
+    "document_count,max_seconds", [(10, 0.05), (100, 0.1), (1000, 1)]
+)
+def test_invoke_rerank_latency(document_count: int, max_seconds: float) -> None:
+    words = [f"word{i}" for i in range(500)]
+    rng = random.Random(0)
+    documents = [" ".join(rng.choices(words, k=200)) for _ in range(document_count)]
+    reranker = LocalReranker()
+
+    start = time.perf_counter()
+    res = reranker.invoke_rerank(query="word1 word2 word3", documents=documents)
+    elapsed = time.perf_counter() - start
+
+    assert len(res.results) == document_count
+    assert elapsed < max_seconds
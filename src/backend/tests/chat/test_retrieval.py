@@ -0,0 +1,156 @@
+import time
+from typing import Any, Dict, List
+
+from backend.chat.retrieval import (
+    RETRIEVER_MAX_CONCURRENCY,
+    is_similar_query,
+    retrieve_documents,
+    retrieve_speculatively,
+)
+from backend.services.tracing import ChatTrace
+from backend.tools.base import BaseTool
+
+
+class MockRetriever(BaseTool):
+    def __init__(self, name: str, delay: float = 0, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def call(self, parameters: dict, **kwargs: Any) -> List[Dict[str, Any]]:
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception("Retriever failed")
+        return [{"text": f"{self.name}: {parameters['query']}"}]
+
+
+def test_retrieve_documents() -> None:
+    retrievers = [MockRetriever("a"), MockRetriever("b")]
+
+    result = retrieve_documents(retrievers, ["q1", "q2"])
+
+    assert result == {
+        "q1": [{"text": "a: q1"}, {"text": "b: q1"}],
+        "q2": [{"text": "a: q2"}, {"text": "b: q2"}],
+    }
+
+
+def test_retrieve_documents_runs_calls_concurrently() -> None:
+    retrievers = [MockRetriever("a", delay=0.2), MockRetriever("b", delay=0.2)]
+
+    start = time.perf_counter()
+    result = retrieve_documents(retrievers, ["q1", "q2"])
+    elapsed = time.perf_counter() - start
+
+    assert len(result["q1"]) == 2
+    assert len(result["q2"]) == 2
+    assert elapsed < 0.6
+
+
+def test_retrieve_documents_traces_retrievers() -> None:
+    trace = ChatTrace()
+
+    retrieve_documents([MockRetriever("a", delay=0.01)], ["q1", "q2"], trace=trace)
+
+    assert trace.timings()["retriever.MockRetriever"] >= 10
+
+
+def test_retrieve_documents_skips_failed_retriever() -> None:
+    retrievers = [MockRetriever("a"), MockRetriever("b", fail=True)]
+
+    result = retrieve_documents(retrievers, ["q1"])
+
+    assert result == {"q1": [{"text": "a: q1"}]}
+
+
+def test_retrieve_documents_skips_slow_retriever() -> None:
+    retrievers = [MockRetriever("a"), MockRetriever("b", delay=1)]
+
+    start = time.perf_counter()
+    result = retrieve_documents(retrievers, ["q1"], timeout=0.2)
+    elapsed = time.perf_counter() - start
+
+    assert result == {"q1": [{"text": "a: q1"}]}
+    assert elapsed < 1
+
+
+def test_retrieve_speculatively_overlaps_query_generation() -> None:
+    trace = ChatTrace()
+    retrievers = [MockRetriever("a", delay=0.2)]
+
+    def generate_queries() -> List[str]:
+        time.sleep(0.2)
+        return ["Capital of France"]
+
+    start = time.perf_counter()
+    queries, result = retrieve_speculatively(
+        retrievers, "capital of France?", generate_queries, trace=trace
+    )
+    elapsed = time.perf_counter() - start
+
+    assert queries == ["Capital of France"]
+    assert result == {"capital of France?": [{"text": "a: capital of France?"}]}
+    assert elapsed < 0.35
+    assert trace.timings()["speculative_overlap"] >= 150
+
+
+def test_retrieve_speculatively_fetches_distinct_queries() -> None:
+    retrievers = [MockRetriever("a")]
+
+    queries, result = retrieve_speculatively(
+        retrievers, "what is it", lambda: ["cohere toolkit", "cohere toolkit"]
+    )
+
+    assert queries == ["cohere toolkit", "cohere toolkit"]
+    assert result == {
+        "what is it": [{"text": "a: what is it"}],
+        "cohere toolkit": [{"text": "a: cohere toolkit"}],
+    }
+
+
+def test_retrieve_speculatively_without_queries() -> None:
+    queries, result = retrieve_speculatively([MockRetriever("a")], "hi", lambda: [])
+
+    assert queries == ["hi"]
+    assert result == {"hi": [{"text": "a: hi"}]}
+
+
+def test_is_similar_query() -> None:
+    assert is_similar_query("Capital of France", "capital of france?")
+    assert not is_similar_query("Paris population", "capital of france")
+
+
+def test_retrieve_speculatively_overlap_of_fast_retrievers() -> None:
+    trace = ChatTrace()
+
+    def generate_queries() -> List[str]:
+        time.sleep(0.3)
+        return []
+
+    retrieve_speculatively(
+        [MockRetriever("a", delay=0.05)], "hi", generate_queries, trace=trace
+    )
+
+    assert 50 <= trace.timings()["speculative_overlap"] < 250
+
+
+class HungRetriever(MockRetriever):
+    pass
+
+
+def test_hung_retriever_does_not_starve_other_retrievers() -> None:
+    # Fill the pool of the hung retriever past its size
+    hung = HungRetriever("hung", delay=0.5)
+    queries = [f"q{i}" for i in range(RETRIEVER_MAX_CONCURRENCY * 2)]
+    retrieve_documents([hung], queries, timeout=0.05)
+
+    start = time.perf_counter()
+    result = retrieve_documents([MockRetriever("a")], ["q1"], timeout=0.3)
+    elapsed = time.perf_counter() - start
+
+    assert result == {"q1": [{"text": "a: q1"}]}
+    assert elapsed < 0.3
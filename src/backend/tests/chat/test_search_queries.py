@@ -0,0 +1,93 @@
+from typing import Dict, List
+
+from backend.chat.search_queries import (
+    generate_search_queries,
+    get_search_queries_key,
+    is_small_talk,
+)
+from backend.services.cache import LRUCache
+
+
+class MockQueryDeployment:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_search_queries(
+        self, message: str, chat_history: List[Dict[str, str]] | None = None
+    ) -> List[str]:
+        self.calls += 1
+        return [f"query: {message}"]
+
+
+def test_generate_search_queries_cached() -> None:
+    deployment = MockQueryDeployment()
+    cache = LRUCache("test_search_queries")
+    history = [{"role": "User", "message": "hello"}]
+
+    first = generate_search_queries(deployment, "Who is the CEO?", history, cache)
+    second = generate_search_queries(deployment, "Who is the CEO?", history, cache)
+
+    assert first == second == ["query: Who is the CEO?"]
+    assert deployment.calls == 1
+
+
+def test_generate_search_queries_history_changes_key() -> None:
+    deployment = MockQueryDeployment()
+    cache = LRUCache("test_search_queries")
+
+    generate_search_queries(deployment, "Who is the CEO?", [], cache)
+    generate_search_queries(
+        deployment, "Who is the CEO?", [{"role": "User", "message": "Cohere"}], cache
+    )
+
+    assert deployment.calls == 2
+
+
+def test_get_search_queries_key_uses_latest_history() -> None:
+    deployment = MockQueryDeployment()
+    recent = [{"role": "User", "message": str(i)} for i in range(4)]
+    old = [{"role": "User", "message": "old"}]
+
+    assert get_search_queries_key(
+        deployment, "message", old + recent
+    ) == get_search_queries_key(deployment, "message", recent)
+
+
+def test_generate_search_queries_key_includes_model() -> None:
+    deployment = MockQueryDeployment()
+    cache = LRUCache("test_search_queries")
+
+    generate_search_queries(deployment, "Who is the CEO?", model="a", cache=cache)
+    generate_search_queries(deployment, "Who is the CEO?", model="b", cache=cache)
+
+    assert deployment.calls == 2
+
+
+def test_generate_search_queries_skips_small_talk() -> None:
+    deployment = MockQueryDeployment()
+
+    queries = generate_search_queries(
+        deployment, "Thanks!", cache=None, skip_enabled=True
+    )
+
+    assert queries == []
+    assert deployment.calls == 0
+
+
+def test_generate_search_queries_does_not_skip_follow_up() -> None:
+    deployment = MockQueryDeployment()
+
+    queries = generate_search_queries(
+        deployment, "What about Paris?", cache=None, skip_enabled=True
+    )
+
+    assert queries == ["query: What about Paris?"]
+    assert deployment.calls == 1
+
+
+def test_is_small_talk() -> None:
+    assert is_small_talk("Hi there!")
+    assert is_small_talk("ok, thanks")
+    assert not is_small_talk("What about Paris?")
+    assert not is_small_talk("Capital of France")
+    assert not is_small_talk("")
@@ -0,0 +1,30 @@
+import time
+
+from backend.chat.stream_accumulator import StreamAccumulator
+
+
+def test_get_text_joins_chunks() -> None:
+    accumulator = StreamAccumulator()
+    for chunk in ["Hello", ",", " ", "wörld", ""]:
+        accumulator.append(chunk)
+
+    assert accumulator.get_text() == "Hello, wörld"
+    assert accumulator.token_count == 5
+
+    accumulator.append("!")
+    assert accumulator.get_text() == "Hello, wörld!"
+
+
+def test_tracks_time_to_first_token_and_tokens_per_second() -> None:
+    accumulator = StreamAccumulator()
+    assert accumulator.time_to_first_token is None
+    assert accumulator.tokens_per_second is None
+
+    time.sleep(0.05)
+    for _ in range(3):
+        accumulator.append("token")
+        time.sleep(0.02)
+
+    assert accumulator.time_to_first_token >= 0.05
+    # Two intervals of about 20ms between the three tokens
+    assert 10 < accumulator.tokens_per_second < 110
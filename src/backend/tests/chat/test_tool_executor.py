@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any
+
+from backend.chat.tool_executor import ToolCallExecutor
+from backend.schemas.tool import Category, ManagedTool, ToolCall
+from backend.tools.base import BaseTool
+
+
+class SleepTool(BaseTool):
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    def call(self, parameters: dict, **kwargs: Any) -> Any:
+        with self.lock:
+            SleepTool.running += 1
+            SleepTool.max_running = max(SleepTool.max_running, SleepTool.running)
+
+        time.sleep(parameters.get("delay", 0))
+
+        with self.lock:
+            SleepTool.running -= 1
+
+        if parameters.get("fail"):
+            raise Exception("boom")
+        return [{"text": parameters["text"]}]
+
+
+def get_tools(max_concurrency=None, timeout=None) -> dict[str, ManagedTool]:
+    return {
+        "sleep": ManagedTool(
+            name=f"sleep-{max_concurrency}-{timeout}",
+            implementation=SleepTool,
+            category=Category.Function,
+            max_concurrency=max_concurrency,
+            timeout=timeout,
+        )
+    }
+
+
+def test_execute_keeps_call_order() -> None:
+    tool_calls = [
+        ToolCall(name="sleep", parameters={"text": "slow", "delay": 0.2}),
+        ToolCall(name="sleep", parameters={"text": "fast"}),
+    ]
+
+    results = ToolCallExecutor(get_tools()).execute(tool_calls)
+
+    assert [result["outputs"] for result in results] == [
+        [{"text": "slow"}],
+        [{"text": "fast"}],
+    ]
+    assert [result["call"] for result in results] == tool_calls
+    assert results[0]["duration_ms"] >= 200
+
+
+def test_execute_runs_calls_concurrently() -> None:
+    tool_calls = [
+        ToolCall(name="sleep", parameters={"text": str(i), "delay": 0.2})
+        for i in range(3)
+    ]
+
+    start = time.perf_counter()
+    results = ToolCallExecutor(get_tools(max_concurrency=3)).execute(tool_calls)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 3
+    assert elapsed < 0.5
+
+
+def test_execute_limits_tool_concurrency() -> None:
+    SleepTool.max_running = 0
+    tool_calls = [
+        ToolCall(name="sleep", parameters={"text": str(i), "delay": 0.05})
+        for i in range(4)
+    ]
+
+    ToolCallExecutor(get_tools(max_concurrency=1)).execute(tool_calls)
+
+    assert SleepTool.max_running == 1
+
+
+def test_execute_handles_timeout_and_failure() -> None:
+    tool_calls = [
+        ToolCall(name="sleep", parameters={"text": "slow", "delay": 1}),
+        ToolCall(name="sleep", parameters={"text": "fail", "fail": True}),
+        ToolCall(name="unknown", parameters={}),
+    ]
+
+    results = ToolCallExecutor(get_tools(timeout=0.1)).execute(tool_calls)
+
+    assert len(results) == 2
+    assert "timed out" in results[0]["outputs"][0]["error"]
+    assert "boom" in results[1]["outputs"][0]["error"]
+
+
+def test_execute_timeout_starts_when_call_runs() -> None:
+    # The second call waits for the first one, then runs within its own timeout
+    tool_calls = [
+        ToolCall(name="sleep", parameters={"text": "first", "delay": 0.15}),
+        ToolCall(name="sleep", parameters={"text": "second", "delay": 0.15}),
+    ]
+
+    results = ToolCallExecutor(get_tools(max_concurrency=1, timeout=0.25)).execute(
+        tool_calls
+    )
+
+    assert [result["outputs"] for result in results] == [
+        [{"text": "first"}],
+        [{"text": "second"}],
+    ]
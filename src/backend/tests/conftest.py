@@ -15,11 +15,21 @@ from backend.main import app, create_app
 from backend.model_deployments.base import BaseDeployment
 from backend.schemas.deployment import Deployment
 from backend.schemas.user import User
+from backend.services.file import ingestion as file_ingestion
 from backend.tests.factories import get_factory
 
 DATABASE_URL = os.environ["DATABASE_URL"]
 
 
+@pytest.fixture(autouse=True)
+def disable_file_ingestion(monkeypatch):
+    """
+    Keeps uploads from starting ingestion workers, which use their own database
+    sessions instead of the test session
+    """
+    monkeypatch.setattr(file_ingestion, "FILE_INGESTION_ENABLED", False)
+
+
 @pytest.fixture
 def client():
     yield TestClient(app)
@@ -1,7 +1,12 @@
+import datetime
+
+import pytest
+
 from backend.crud import citation as citation_crud
 from backend.crud import conversation as conversation_crud
 from backend.crud import document as document_crud
 from backend.crud import message as message_crud
+from backend.crud.pagination import get_next_cursor
 from backend.database_models.conversation import Conversation
 from backend.schemas.conversation import UpdateConversation
 from backend.tests.factories import get_factory
@@ -58,7 +63,9 @@ def test_list_conversations_empty(session, user):
 def test_list_conversations_with_pagination(session, user):
     for i in range(10):
         get_factory("Conversation", session).create(
-            title=f"Conversation {i}", user_id=user.id
+            title=f"Conversation {i}",
+            user_id=user.id,
+            updated_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i),
         )
 
     conversations = conversation_crud.get_conversations(
@@ -66,8 +73,45 @@ def test_list_conversations_with_pagination(session, user):
     )
     assert len(conversations) == 5
 
+    # Most recently updated first
     for i, conversation in enumerate(conversations):
-        assert conversation.title == f"Conversation {i + 5}"
+        assert conversation.title == f"Conversation {4 - i}"
+
+
+def test_list_conversations_with_cursor(session, user):
+    for i in range(5):
+        get_factory("Conversation", session).create(
+            title=f"Conversation {i}",
+            user_id=user.id,
+            updated_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i),
+        )
+    # Same update time, ordered by ID
+    get_factory("Conversation", session).create(
+        id="a",
+        title="Conversation a",
+        user_id=user.id,
+        updated_at=datetime.datetime(2024, 1, 1),
+    )
+
+    titles = []
+    cursor = None
+    while True:
+        conversations = conversation_crud.get_conversations(
+            session, user_id=user.id, limit=2, cursor=cursor
+        )
+        titles.extend(conversation.title for conversation in conversations)
+        cursor = get_next_cursor(conversations, 2)
+        if cursor is None:
+            break
+
+    assert len(titles) == 6
+    assert titles[:4] == [f"Conversation {i}" for i in [4, 3, 2, 1]]
+    assert set(titles[4:]) == {"Conversation 0", "Conversation a"}
+
+
+def test_list_conversations_with_invalid_cursor(session, user):
+    with pytest.raises(ValueError):
+        conversation_crud.get_conversations(session, user_id=user.id, cursor="abc")
 
 
 def test_update_conversation(session, user):
@@ -1,6 +1,9 @@
+import datetime
+
 import pytest
 
 from backend.crud import file as file_crud
+from backend.crud.pagination import get_next_cursor
 from backend.database_models.file import File
 from backend.schemas.file import UpdateFile
 from backend.tests.factories import get_factory
@@ -68,14 +71,25 @@ def test_list_files_empty(session, user):
 def test_list_files_with_pagination(session, user):
     for i in range(10):
         _ = get_factory("File", session).create(
-            file_name=f"test.txt {i}", conversation_id="1", user_id=user.id
+            file_name=f"test.txt {i}",
+            conversation_id="1",
+            user_id=user.id,
+            updated_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i),
         )
 
     files = file_crud.get_files(session, user.id, offset=5, limit=5)
     assert len(files) == 5
 
-    for i, file in enumerate(files):
-        assert file.file_name == f"test.txt {i + 5}"
+    # Most recently updated first
+    for i, item in enumerate(files):
+        assert item.file_name == f"test.txt {4 - i}"
+
+    first_page = file_crud.get_files(session, user.id, limit=5)
+    cursor = get_next_cursor(first_page, 5)
+    files = file_crud.get_files(session, user.id, cursor=cursor, limit=5)
+    assert [item.file_name for item in files] == [
+        f"test.txt {i}" for i in range(4, -1, -1)
+    ]
 
 
 def test_list_files_by_conversation_id(session, user):
@@ -1,8 +1,11 @@
+import datetime
+
 import pytest
 
 from backend.crud import citation as citation_crud
 from backend.crud import document as document_crud
 from backend.crud import message as message_crud
+from backend.crud.pagination import get_next_cursor
 from backend.database_models.message import Message
 from backend.schemas.message import UpdateMessage
 from backend.tests.factories import get_factory
@@ -66,14 +69,27 @@ def test_list_messages_empty(session, user):
 def test_list_messages_with_pagination(session, user):
     for i in range(10):
         _ = get_factory("Message", session).create(
-            text=f"Hello, World! {i}", conversation_id="1", user_id=user.id
+            text=f"Hello, World! {i}",
+            conversation_id="1",
+            user_id=user.id,
+            updated_at=datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i),
         )
 
     messages = message_crud.get_messages(session, offset=5, limit=5, user_id=user.id)
     assert len(messages) == 5
 
-    for i, message in enumerate(messages):
-        assert message.text == f"Hello, World! {i + 5}"
+    # Most recently updated first
+    for i, item in enumerate(messages):
+        assert item.text == f"Hello, World! {4 - i}"
+
+    first_page = message_crud.get_messages(session, limit=5, user_id=user.id)
+    cursor = get_next_cursor(first_page, 5)
+    messages = message_crud.get_messages(
+        session, cursor=cursor, limit=5, user_id=user.id
+    )
+    assert [item.text for item in messages] == [
+        f"Hello, World! {i}" for i in range(4, -1, -1)
+    ]
 
 
 def test_list_messages_by_conversation_id(session, user):
@@ -95,6 +111,52 @@ def test_list_messages_by_conversation_id_empty(session, user):
     assert len(messages) == 0
 
 
+def test_get_last_message_position(session, user):
+    assert message_crud.get_last_message_position(session, "1") is None
+
+    for position, is_active in [(0, True), (1, True), (2, False)]:
+        _ = get_factory("Message", session).create(
+            conversation_id="1", user_id=user.id, position=position, is_active=is_active
+        )
+
+    assert message_crud.get_last_message_position(session, "1") == 1
+
+
+def test_get_message_history(session, user):
+    for position in range(3):
+        for agent in ["CHATBOT", "USER"]:
+            _ = get_factory("Message", session).create(
+                text=f"{agent} {position}",
+                conversation_id="1",
+                user_id=user.id,
+                position=position,
+                agent=agent,
+                is_active=True,
+            )
+    _ = get_factory("Message", session).create(
+        text="Inactive",
+        conversation_id="1",
+        user_id=user.id,
+        position=1,
+        is_active=False,
+    )
+
+    history = message_crud.get_message_history(session, "1", 2)
+    assert [message.text for message in history] == [
+        "USER 0",
+        "CHATBOT 0",
+        "USER 1",
+        "CHATBOT 1",
+    ]
+
+    history = message_crud.get_message_history(session, "1", 3, limit=3)
+    assert [message.text for message in history] == [
+        "CHATBOT 1",
+        "USER 2",
+        "CHATBOT 2",
+    ]
+
+
 def test_update_message(session, user):
     message = get_factory("Message", session).create(
         text="Hello, World!", conversation_id="1", user_id=user.id
@@ -1,9 +1,14 @@
+import hashlib
 import os
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from backend.database_models import Citation, Conversation, Document, File, Message
+from backend.services.file import ingestion as file_ingestion
+from backend.services.file.service import FileService
 from backend.tests.factories import get_factory
 
 
@@ -27,6 +32,46 @@ def test_list_conversations(session_client: TestClient, session: Session) -> Non
     assert len(results) == 1
 
 
+def test_list_conversations_with_cursor(
+    session_client: TestClient, session: Session
+) -> None:
+    for i in range(3):
+        conversation = get_factory("Conversation", session).create(user_id="123")
+        get_factory("File", session).create(
+            conversation_id=conversation.id, user_id="123", file_size=i + 1
+        )
+
+    response = session_client.get(
+        "/v1/conversations", headers={"User-Id": "123"}, params={"limit": 2}
+    )
+    first_page = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = session_client.get(
+        "/v1/conversations",
+        headers={"User-Id": "123"},
+        params={"limit": 2, "cursor": cursor},
+    )
+    second_page = response.json()
+
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    assert len(first_page) == 2
+    assert len(second_page) == 1
+    results = first_page + second_page
+    assert len({result["id"] for result in results}) == 3
+    assert sorted(result["total_file_size"] for result in results) == [1, 2, 3]
+    assert all("messages" not in result for result in results)
+
+
+def test_list_conversations_with_invalid_cursor(session_client: TestClient) -> None:
+    response = session_client.get(
+        "/v1/conversations", headers={"User-Id": "123"}, params={"cursor": "abc"}
+    )
+
+    assert response.status_code == 400
+
+
 def test_list_conversations_missing_user_id(
     session_client: TestClient, session: Session
 ) -> None:
@@ -80,6 +125,96 @@ def test_get_conversation_lists_message_files(
     assert response_conversation["messages"][0]["files"][0]["id"] == file.id
 
 
+def create_conversation_graph(session: Session, messages: int) -> Conversation:
+    user = get_factory("User", session).create()
+    conversation = get_factory("Conversation", session).create(user_id=user.id)
+    for position in range(messages):
+        message = get_factory("Message", session).create(
+            conversation_id=conversation.id,
+            user_id=user.id,
+            position=position,
+            text=f"Message {position}",
+        )
+        documents = [
+            get_factory("Document", session).create(
+                conversation_id=conversation.id,
+                user_id=user.id,
+                message_id=message.id,
+                document_id=f"doc_{i}",
+            )
+            for i in range(2)
+        ]
+        get_factory("Citation", session).create(
+            message_id=message.id,
+            user_id=user.id,
+            documents=documents,
+            document_ids=["doc_0", "doc_1"],
+        )
+        get_factory("File", session).create(
+            conversation_id=conversation.id, user_id=user.id, message_id=message.id
+        )
+    return conversation
+
+
+def count_queries(session: Session, fn) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(session.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(session.bind, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def test_get_conversation_query_count(
+    session_client: TestClient, session: Session
+) -> None:
+    counts = []
+    for messages in [1, 10]:
+        conversation = create_conversation_graph(session, messages)
+        headers = {"User-Id": conversation.user_id}
+        url = f"/v1/conversations/{conversation.id}"
+        # Start from an empty session, like a new request
+        session.expunge_all()
+
+        def get_conversation():
+            response = session_client.get(url, headers=headers)
+            assert response.status_code == 200
+            response_conversation = response.json()
+            assert len(response_conversation["messages"]) == messages
+            assert len(response_conversation["messages"][-1]["documents"]) == 2
+            assert len(response_conversation["messages"][-1]["citations"]) == 1
+            assert len(response_conversation["messages"][-1]["files"]) == 1
+            assert len(response_conversation["files"]) == messages
+
+        counts.append(count_queries(session, get_conversation))
+
+    # Conversation, its files, messages, documents, citations and message files
+    assert counts == [6, 6]
+
+
+def test_get_conversation_with_messages_limit(
+    session_client: TestClient, session: Session
+) -> None:
+    conversation = create_conversation_graph(session, 5)
+
+    response = session_client.get(
+        f"/v1/conversations/{conversation.id}",
+        headers={"User-Id": conversation.user_id},
+        params={"messages_limit": 2},
+    )
+
+    assert response.status_code == 200
+    assert [message["text"] for message in response.json()["messages"]] == [
+        "Message 3",
+        "Message 4",
+    ]
+
+
 def test_fail_get_nonexistent_conversation(
     session_client: TestClient, session: Session
 ) -> None:
@@ -379,11 +514,19 @@ def test_list_files_missing_user_id(
     assert response.json() == {"detail": "User-Id required in request headers."}
 
 
+def file_exists(file_key: str) -> bool:
+    return FileService().storage.backend.exists(file_key)
+
+
+def file_sha256(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
 def test_upload_file_existing_conversation(
     session_client: TestClient, session: Session
 ) -> None:
     file_path = "src/backend/tests/test_data/Mariana_Trench.pdf"
-    saved_file_path = "src/backend/data/Mariana_Trench.pdf"
     conversation = get_factory("Conversation", session).create()
     file_doc = {"file": open(file_path, "rb")}
 
@@ -397,19 +540,126 @@ def test_upload_file_existing_conversation(
     file = response.json()
 
     assert response.status_code == 200
-    assert "Mariana_Trench" in file["file_name"]
+    assert file["file_name"] == "Mariana_Trench.pdf"
     assert file["conversation_id"] == conversation.id
     assert file["user_id"] == conversation.user_id
+    assert file["status"] == "PENDING"
+    assert os.path.basename(file["file_path"]) == file_sha256(file_path)
+
+    # Clean up - remove the file from the storage
+    FileService().storage.delete(file["file_path"])
+
+
+def test_upload_file_queues_ingestion(
+    session_client: TestClient, session: Session, monkeypatch
+) -> None:
+    file_path = "src/backend/tests/test_data/Mariana_Trench.pdf"
+    conversation = get_factory("Conversation", session).create()
+    submitted = []
+    monkeypatch.setattr(file_ingestion, "FILE_INGESTION_ENABLED", True)
+    monkeypatch.setattr(
+        file_ingestion.file_ingestion_queue,
+        "submit",
+        lambda file_id, path: submitted.append((file_id, path)),
+    )
+
+    response = session_client.post(
+        "/v1/conversations/upload_file",
+        headers={"User-Id": conversation.user_id},
+        files={"file": open(file_path, "rb")},
+        data={"conversation_id": conversation.id},
+    )
+
+    file = response.json()
+
+    assert response.status_code == 200
+    assert submitted == [(file["id"], file["file_path"])]
 
-    # Clean up - remove the file from the directory
-    os.remove(saved_file_path)
+    # Clean up - remove the file from the storage
+    FileService().storage.delete(file["file_path"])
+
+
+def test_upload_file_too_large(session_client: TestClient, session: Session) -> None:
+    conversation = get_factory("Conversation", session).create()
+    file_doc = {"file": ("large.pdf", b"x" * 11)}
+
+    with patch(
+        "backend.routers.conversation.FileService",
+        lambda: FileService(max_file_size=10),
+    ):
+        response = session_client.post(
+            "/v1/conversations/upload_file",
+            headers={"User-Id": conversation.user_id},
+            files=file_doc,
+            data={"conversation_id": conversation.id},
+        )
+
+    assert response.status_code == 413
+    assert not os.path.exists(
+        FileService().get_local_path(
+            FileService().get_blob_key(hashlib.sha256(b"x" * 11).hexdigest())
+        )
+    )
+
+
+def test_identical_uploads_share_stored_file(
+    session_client: TestClient, session: Session
+) -> None:
+    file_path = "src/backend/tests/test_data/Mariana_Trench.pdf"
+    conversation = get_factory("Conversation", session).create()
+
+    files = []
+    for file_name in ["Mariana_Trench.pdf", "copy.pdf"]:
+        response = session_client.post(
+            "/v1/conversations/upload_file",
+            headers={"User-Id": conversation.user_id},
+            files={"file": (file_name, open(file_path, "rb"))},
+            data={"conversation_id": conversation.id},
+        )
+        assert response.status_code == 200
+        files.append(response.json())
+
+    assert files[0]["file_path"] == files[1]["file_path"]
+    assert [file["file_name"] for file in files] == ["Mariana_Trench.pdf", "copy.pdf"]
+
+    # The stored file is kept until its last File is deleted
+    for i, file in enumerate(files):
+        response = session_client.delete(
+            f"/v1/conversations/{conversation.id}/files/{file['id']}",
+            headers={"User-Id": conversation.user_id},
+        )
+        assert response.status_code == 200
+        assert file_exists(file["file_path"]) == (i == 0)
+
+
+def test_delete_conversation_deletes_stored_files(
+    session_client: TestClient, session: Session
+) -> None:
+    file_path = "src/backend/tests/test_data/Mariana_Trench.pdf"
+    conversation = get_factory("Conversation", session).create()
+
+    response = session_client.post(
+        "/v1/conversations/upload_file",
+        headers={"User-Id": conversation.user_id},
+        files={"file": open(file_path, "rb")},
+        data={"conversation_id": conversation.id},
+    )
+    file = response.json()
+    assert file_exists(file["file_path"])
+
+    response = session_client.delete(
+        f"/v1/conversations/{conversation.id}",
+        headers={"User-Id": conversation.user_id},
+    )
+
+    assert response.status_code == 200
+    assert not file_exists(file["file_path"])
 
 
 def test_upload_file_nonexistent_conversation_creates_new_conversation(
     session_client: TestClient, session: Session
 ) -> None:
     file_path = "src/backend/tests/test_data/Mariana_Trench.pdf"
-    saved_file_path = "src/backend/data/Mariana_Trench.pdf"
     file_doc = {"file": open(file_path, "rb")}
 
     response = session_client.post(
@@ -429,8 +679,8 @@ def test_upload_file_nonexistent_conversation_creates_new_conversation(
     assert "Mariana_Trench" in file["file_name"]
     assert file["conversation_id"] == created_conversation.id
 
-    # Clean up - remove the file from the directory
-    os.remove(saved_file_path)
+    # Clean up - remove the file from the storage
+    FileService().storage.delete(file["file_path"])
 
 
 def test_upload_file_nonexistent_conversation_fails_if_user_id_not_provided(
@@ -4,6 +4,7 @@ from unittest.mock import Mock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.chat.custom.utils import deployment_cache
 from backend.config.deployments import AVAILABLE_MODEL_DEPLOYMENTS, ModelDeploymentName
 
 
@@ -109,6 +110,25 @@ def test_set_env_vars(
     )
 
 
+def test_set_env_vars_clears_deployment_cache(
+    client: TestClient, mock_available_model_deployments: Mock
+) -> None:
+    deployment_cache.set(("Cohere Platform", "config"), object())
+
+    with patch("backend.services.env.set_key"):
+        response = client.post(
+            "/v1/deployments/Cohere+Platform/set_env_vars",
+            json={
+                "env_vars": {
+                    "COHERE_VAR_1": "TestCohereValue",
+                },
+            },
+        )
+
+    assert response.status_code == 200
+    assert deployment_cache.get(("Cohere Platform", "config")) is None
+
+
 def test_set_env_vars_with_invalid_deployment_name(
     client: TestClient, mock_available_model_deployments: Mock
 ):
@@ -6,3 +6,10 @@ def test_health_ok(client: TestClient) -> None:
 
     assert response.status_code == 200
     assert response.json() == {"status": "OK"}
+
+
+def test_metrics_ok(client: TestClient) -> None:
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
@@ -0,0 +1,51 @@
+import time
+
+from backend.services.cache import LRUCache
+from backend.services.metrics import registry
+
+
+def test_get_and_set() -> None:
+    cache = LRUCache("test_get_and_set")
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", 2) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_evicts_least_recently_used() -> None:
+    evicted = []
+    cache = LRUCache(
+        "test_evicts_least_recently_used",
+        max_size=2,
+        on_evict=lambda key, value: evicted.append(key),
+    )
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert evicted == ["b"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_entries() -> None:
+    cache = LRUCache("test_expires_entries", ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_exports_metrics() -> None:
+    cache = LRUCache("test_exports_metrics")
+    cache.get("a")
+
+    assert 'cache_misses_total{cache="test_exports_metrics"} 1' in registry.render()
@@ -0,0 +1,68 @@
+import json
+import os
+import time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from backend.chat.enums import StreamEvent
+from backend.schemas.chat import ChatResponseEvent, StreamTextGeneration
+from backend.services.chat import encode_text_generation_event
+
+is_benchmark_enabled = os.environ.get("RUN_BENCHMARKS") is not None
+
+
+def encode_with_models(event: dict) -> str:
+    stream_event = StreamTextGeneration.model_validate(event)
+    return json.dumps(
+        jsonable_encoder(
+            ChatResponseEvent(event=stream_event.event_type.value, data=stream_event)
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["Hello", "", " ", 'say "hi"\n\t\\', "héllo wörld", "日本語", "😀", "\x00\x1f\x7f"],
+)
+@pytest.mark.parametrize("is_finished", [False, True])
+def test_encode_text_generation_event_matches_models(text, is_finished) -> None:
+    event = {
+        "event_type": StreamEvent.TEXT_GENERATION,
+        "text": text,
+        "is_finished": is_finished,
+    }
+
+    encoded = encode_text_generation_event(event)
+    stream_event = StreamTextGeneration.model_validate(event)
+    response_event = ChatResponseEvent(
+        event=stream_event.event_type.value, data=stream_event
+    )
+
+    assert encoded == encode_with_models(event)
+    assert json.loads(encoded) == json.loads(response_event.model_dump_json())
+
+
+def test_encode_text_generation_event_falls_back() -> None:
+    assert encode_text_generation_event({"text": "Hello"}) is None
+    assert encode_text_generation_event({"text": None, "is_finished": False}) is None
+
+
+@pytest.mark.skipif(not is_benchmark_enabled, reason="RUN_BENCHMARKS not set")
+def test_encode_text_generation_event_is_faster() -> None:
+    event = {
+        "event_type": StreamEvent.TEXT_GENERATION,
+        "text": " token",
+        "is_finished": False,
+    }
+
+    def measure(encode) -> float:
+        start = time.perf_counter()
+        for _ in range(2000):
+            encode(event)
+        return time.perf_counter() - start
+
+    models_time = measure(encode_with_models)
+    fast_time = measure(encode_text_generation_event)
+
+    assert fast_time * 5 < models_time
@@ -0,0 +1,84 @@
+from backend.database_models.message import Message, MessageAgent
+from backend.schemas.chat import ChatRole
+from backend.services.cache import LRUCache
+from backend.services.chat_history import ChatHistoryCache
+from backend.tests.factories import get_factory
+
+
+def get_cache(**kwargs) -> ChatHistoryCache:
+    return ChatHistoryCache(backend=LRUCache("test_chat_history"), **kwargs)
+
+
+def create_turn(session, user_id, position):
+    for agent in [MessageAgent.USER, MessageAgent.CHATBOT]:
+        get_factory("Message", session).create(
+            text=f"{agent.value} {position}",
+            conversation_id="1",
+            user_id=user_id,
+            position=position,
+            agent=agent,
+            is_active=True,
+        )
+
+
+def test_get_loads_history_once(session, user):
+    get_factory("Conversation", session).create(id="1", user_id=user.id)
+    create_turn(session, user.id, 0)
+    cache = get_cache()
+
+    history = cache.get(session, "1")
+    assert history["next_position"] == 1
+    assert history["messages"] == [["USER", "USER 0"], ["CHATBOT", "CHATBOT 0"]]
+
+    # Served from the cache while the database has no newer message
+    cache.backend.set("1", {**history, "messages": []})
+    assert cache.get(session, "1")["messages"] == []
+
+    # A turn written by another worker reloads the history
+    create_turn(session, user.id, 1)
+    assert cache.get(session, "1")["next_position"] == 2
+
+
+def test_append_turn(session, user):
+    get_factory("Conversation", session).create(id="1", user_id=user.id)
+    cache = get_cache(max_messages=3)
+
+    user_message = Message(text="Hi", position=0, agent=MessageAgent.USER)
+    response_message = Message(text="Hello", position=0, agent=MessageAgent.CHATBOT)
+
+    # Conversations that are not cached are loaded on the next turn
+    cache.append_turn("1", user_message, response_message)
+    assert cache.backend.get("1") is None
+
+    cache.get(session, "1")
+    cache.append_turn("1", user_message, response_message)
+    user_message.position = 1
+    cache.append_turn("1", user_message, response_message)
+
+    history = cache.get(session, "1")
+    assert history["next_position"] == 2
+    assert history["messages"] == [
+        ["CHATBOT", "Hello"],
+        ["USER", "Hi"],
+        ["CHATBOT", "Hello"],
+    ]
+
+
+def test_get_chat_history_truncates_to_token_budget() -> None:
+    cache = get_cache(max_tokens=10, token_estimator=lambda text: len(text.split()))
+    history = {
+        "next_position": 2,
+        "messages": [
+            ["USER", "one two three four five six"],
+            ["CHATBOT", "one two three four five"],
+            ["USER", "one two three"],
+        ],
+    }
+
+    chat_history = cache.get_chat_history(history)
+
+    assert [message.message for message in chat_history] == [
+        "one two three four five",
+        "one two three",
+    ]
+    assert chat_history[0].role == ChatRole.CHATBOT
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from backend.services.file.index import (
+    fcntl,
+    get_content_hash,
+    get_index_folder,
+    get_index_lock,
+    get_index_path,
+    is_index_complete,
+    mark_index_complete,
+)
+from backend.services.file.service import FileService
+
+
+def test_index_path_changes_with_content(tmp_path) -> None:
+    file_path = tmp_path / "file.pdf"
+    file_path.write_bytes(b"content")
+    index_path = get_index_path(str(file_path))
+
+    assert index_path.parent == get_index_folder(str(file_path))
+    assert index_path.name == get_content_hash(str(file_path))
+    assert index_path.is_relative_to(tmp_path / "indexes")
+
+    file_path.write_bytes(b"new content")
+
+    assert get_index_path(str(file_path)) != index_path
+
+
+def test_mark_index_complete_deletes_previous_versions(tmp_path) -> None:
+    file_path = tmp_path / "file.pdf"
+    file_path.write_bytes(b"content")
+    old_index_path = get_index_path(str(file_path))
+    old_index_path.mkdir(parents=True)
+    file_path.write_bytes(b"new content")
+    index_path = get_index_path(str(file_path))
+    index_path.mkdir(parents=True)
+
+    assert not is_index_complete(index_path)
+    mark_index_complete(index_path)
+
+    assert is_index_complete(index_path)
+    assert not old_index_path.exists()
+
+
+def test_delete_file_deletes_index(tmp_path) -> None:
+    file_path = tmp_path / "file.pdf"
+    file_path.write_bytes(b"content")
+    index_path = get_index_path(str(file_path))
+    index_path.mkdir(parents=True)
+
+    FileService().delete_file(str(file_path))
+
+    assert not file_path.exists()
+    assert not get_index_folder(str(file_path)).exists()
+
+
+@pytest.mark.skipif(fcntl is None, reason="File locks need fcntl")
+def test_index_lock_waits_for_other_workers(tmp_path) -> None:
+    file_path = tmp_path / "file.pdf"
+    file_path.write_bytes(b"content")
+    index_path = get_index_path(str(file_path))
+    acquired = threading.Event()
+
+    def build() -> None:
+        with get_index_lock(index_path):
+            acquired.set()
+
+    # A separate open file description stands in for another worker process
+    with get_index_lock(index_path):
+        lock_path = next(get_index_folder(str(file_path)).parent.glob("*.lock"))
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        thread = threading.Thread(target=build)
+        thread.start()
+        assert not acquired.wait(0.2)
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    thread.join(1)
+    assert acquired.is_set()
@@ -0,0 +1,52 @@
+from sqlalchemy.orm import Session
+
+from backend.database_models.file import File, FileStatus
+from backend.services.file.ingestion import FileIngestionQueue
+from backend.tests.factories import get_factory
+
+
+def test_ingests_files_and_updates_status(session: Session) -> None:
+    conversation = get_factory("Conversation", session).create()
+    files = [
+        get_factory("File", session).create(conversation_id=conversation.id)
+        for _ in range(3)
+    ]
+    assert all(file.status == FileStatus.PENDING for file in files)
+    file_ids = [file.id for file in files]
+    file_paths = [file.file_path for file in files]
+    ingested = []
+    ingestion_queue = FileIngestionQueue(lambda: session, ingested.append, workers=1)
+
+    for file_id, file_path in zip(file_ids, file_paths):
+        ingestion_queue.submit(file_id, file_path)
+    ingestion_queue.flush()
+    ingestion_queue.stop()
+
+    assert ingested == file_paths
+    for file_id in file_ids:
+        assert session.get(File, file_id).status == FileStatus.READY
+
+
+def test_failed_ingestion_sets_failed_status(session: Session) -> None:
+    conversation = get_factory("Conversation", session).create()
+    file = get_factory("File", session).create(conversation_id=conversation.id)
+
+    def ingester(file_path: str) -> None:
+        raise Exception("Unreadable file")
+
+    file_id = file.id
+    ingestion_queue = FileIngestionQueue(lambda: session, ingester, workers=1)
+    ingestion_queue.submit(file_id, file.file_path)
+    ingestion_queue.flush()
+    ingestion_queue.stop()
+
+    assert session.get(File, file_id).status == FileStatus.FAILED
+
+
+def test_submit_returns_false_when_full(session: Session) -> None:
+    ingestion_queue = FileIngestionQueue(lambda: session, lambda path: None, max_size=1)
+    # Queue without workers so the queue fills up
+    ingestion_queue.start = lambda: None
+
+    assert ingestion_queue.submit("file_1", "path_1")
+    assert not ingestion_queue.submit("file_2", "path_2")
@@ -0,0 +1,132 @@
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend.database_models import File
+from backend.services.file.service import FileService, FileTooLargeError
+from backend.services.file.storage import LocalStorageBackend, ReadThroughCache
+from backend.tests.factories import get_factory
+
+
+def get_file_service(folder_path, **kwargs) -> FileService:
+    storage = ReadThroughCache(LocalStorageBackend(folder_path), folder_path / "cache")
+    file_service = FileService(storage=storage, **kwargs)
+    file_service.folder_path = folder_path
+    return file_service
+
+
+def get_upload(file_name: str, content: bytes, size: int | None = None):
+    return SimpleNamespace(filename=file_name, file=io.BytesIO(content), size=size)
+
+
+def test_upload_file_stores_content_by_hash(tmp_path) -> None:
+    content = b"content" * 1000
+    content_hash = hashlib.sha256(content).hexdigest()
+    file_service = get_file_service(tmp_path)
+
+    file_key, uploaded_hash, size = file_service.upload_file(
+        get_upload("a.pdf", content)
+    )
+
+    assert uploaded_hash == content_hash
+    assert size == len(content)
+    assert file_key == f"blobs/{content_hash[:2]}/{content_hash}"
+    file_path = file_service.get_local_path(file_key)
+    assert file_path == str(tmp_path / "blobs" / content_hash[:2] / content_hash)
+    assert open(file_path, "rb").read() == content
+    # The temporary file is removed once stored
+    assert [path.name for path in tmp_path.iterdir()] == ["blobs"]
+
+
+def test_upload_file_deduplicates_content(tmp_path) -> None:
+    file_service = get_file_service(tmp_path)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(
+                lambda i: file_service.upload_file(
+                    get_upload(f"{i}.pdf", str(i % 2).encode())
+                ),
+                range(4),
+            )
+        )
+
+    assert results[0] == results[2]
+    assert results[1] == results[3]
+    assert results[0] != results[1]
+    assert len(list(tmp_path.glob("blobs/*/*"))) == 2
+    assert [path.name for path in tmp_path.iterdir()] == ["blobs"]
+
+
+def test_release_file_keeps_referenced_content(tmp_path, session: Session) -> None:
+    file_service = get_file_service(tmp_path)
+    file_key, content_hash, _ = file_service.upload_file(get_upload("a.pdf", b"a"))
+    conversation = get_factory("Conversation", session).create()
+    get_factory("File", session).create(
+        conversation_id=conversation.id,
+        file_path=file_key,
+        content_hash=content_hash,
+    )
+
+    assert not file_service.release_file(session, file_key, content_hash)
+    assert file_service.storage.backend.exists(file_key)
+
+    session.query(File).delete()
+
+    assert file_service.release_file(session, file_key, content_hash)
+    assert not file_service.storage.backend.exists(file_key)
+
+
+def test_create_file_after_upload(tmp_path, session: Session) -> None:
+    file_service = get_file_service(tmp_path)
+    file_key, content_hash, size = file_service.upload_file(get_upload("a.pdf", b"a"))
+    conversation = get_factory("Conversation", session).create()
+
+    file = file_service.create_file(
+        session,
+        File(
+            user_id=conversation.user_id,
+            conversation_id=conversation.id,
+            file_name="a.pdf",
+            file_path=file_key,
+            file_size=size,
+            content_hash=content_hash,
+        ),
+    )
+
+    assert session.get(File, file.id).content_hash == content_hash
+
+
+def test_create_file_fails_if_content_was_collected(tmp_path, session: Session) -> None:
+    file_service = get_file_service(tmp_path)
+    file_key, content_hash, size = file_service.upload_file(get_upload("a.pdf", b"a"))
+    conversation = get_factory("Conversation", session).create()
+    # Collected by a concurrent release before the File row was created
+    assert file_service.release_file(session, file_key, content_hash)
+
+    with pytest.raises(FileNotFoundError):
+        file_service.create_file(
+            session,
+            File(
+                user_id=conversation.user_id,
+                conversation_id=conversation.id,
+                file_name="a.pdf",
+                file_path=file_key,
+                file_size=size,
+                content_hash=content_hash,
+            ),
+        )
+
+
+@pytest.mark.parametrize("size", [None, 11])
+def test_upload_file_rejects_large_files(tmp_path, size) -> None:
+    file_service = get_file_service(tmp_path, max_file_size=10)
+
+    with pytest.raises(FileTooLargeError):
+        file_service.upload_file(get_upload("a.pdf", b"x" * 11, size=size))
+
+    assert list(tmp_path.iterdir()) == []
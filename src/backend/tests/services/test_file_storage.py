@@ -0,0 +1,204 @@
+import io
+import os
+import threading
+
+import pytest
+
+from backend.services.file.index import get_index_folder
+from backend.services.file.storage import (
+    LocalStorageBackend,
+    ReadThroughCache,
+    S3StorageBackend,
+)
+
+
+class FakeS3Error(Exception):
+    def __init__(self, code: str):
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """
+    In-memory stand-in for the boto3 S3 client methods used by the backend.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.gets = 0
+
+    def upload_fileobj(self, source, bucket, key):
+        self.objects[(bucket, key)] = source.read()
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.gets += 1
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("NoSuchKey")
+
+        data = self.objects[(Bucket, Key)]
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = data[int(start) : int(end) + 1]
+        return {"Body": io.BytesIO(data)}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("404")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+@pytest.fixture(params=["local", "s3"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        return LocalStorageBackend(tmp_path / "storage")
+    return S3StorageBackend("bucket", prefix="files", client=FakeS3Client())
+
+
+def test_write_and_read(backend) -> None:
+    backend.write("blobs/ab/abc", io.BytesIO(b"0123456789"))
+
+    assert backend.exists("blobs/ab/abc")
+    assert backend.get_size("blobs/ab/abc") == 10
+    with backend.open("blobs/ab/abc") as f:
+        assert f.read() == b"0123456789"
+    assert backend.read_range("blobs/ab/abc", 2, 3) == b"234"
+    assert backend.read_range("blobs/ab/abc", 8, 5) == b"89"
+
+
+def test_move_file(backend, tmp_path) -> None:
+    path = tmp_path / "upload"
+    path.write_bytes(b"content")
+
+    backend.move_file("blobs/ab/abc", path)
+
+    assert not path.exists()
+    assert backend.read_range("blobs/ab/abc", 0, 100) == b"content"
+
+
+def test_delete(backend) -> None:
+    backend.write("blobs/ab/abc", io.BytesIO(b"content"))
+
+    backend.delete("blobs/ab/abc")
+    backend.delete("blobs/ab/abc")
+
+    assert not backend.exists("blobs/ab/abc")
+
+
+def test_s3_keys_are_prefixed() -> None:
+    client = FakeS3Client()
+    backend = S3StorageBackend("bucket", prefix="files/", client=client)
+
+    backend.write("blobs/ab/abc", io.BytesIO(b"content"))
+
+    assert list(client.objects) == [("bucket", "files/blobs/ab/abc")]
+
+
+def test_local_rejects_keys_outside_root(tmp_path) -> None:
+    backend = LocalStorageBackend(tmp_path / "storage")
+
+    with pytest.raises(ValueError):
+        backend.exists("../outside")
+
+
+def test_cache_uses_local_files_in_place(tmp_path) -> None:
+    backend = LocalStorageBackend(tmp_path / "storage")
+    backend.write("blobs/ab/abc", io.BytesIO(b"content"))
+    cache = ReadThroughCache(backend, tmp_path / "cache")
+
+    path = cache.get_local_path("blobs/ab/abc")
+
+    assert path == tmp_path / "storage" / "blobs" / "ab" / "abc"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_cache_downloads_remote_files_once(tmp_path) -> None:
+    client = FakeS3Client()
+    backend = S3StorageBackend("bucket", client=client)
+    backend.write("blobs/ab/abc", io.BytesIO(b"content"))
+    cache = ReadThroughCache(backend, tmp_path / "cache")
+
+    path = cache.get_local_path("blobs/ab/abc")
+    assert cache.get_local_path("blobs/ab/abc") == path
+
+    assert path.read_bytes() == b"content"
+    assert client.gets == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    backend = S3StorageBackend("bucket", client=FakeS3Client())
+    for key in ["a", "b", "c"]:
+        backend.write(key, io.BytesIO(b"x" * 10))
+    cache = ReadThroughCache(backend, tmp_path / "cache", max_size=20)
+
+    path_a = cache.get_local_path("a")
+    path_b = cache.get_local_path("b")
+    # Make b the least recently used file
+    os.utime(path_b, (0, 0))
+    path_c = cache.get_local_path("c")
+
+    assert path_a.exists()
+    assert not path_b.exists()
+    assert path_c.exists()
+
+
+def test_cache_delete_removes_stored_and_cached_file(tmp_path) -> None:
+    backend = S3StorageBackend("bucket", client=FakeS3Client())
+    backend.write("blobs/ab/abc", io.BytesIO(b"content"))
+    cache = ReadThroughCache(backend, tmp_path / "cache")
+    path = cache.get_local_path("blobs/ab/abc")
+
+    cache.delete("blobs/ab/abc")
+
+    assert not backend.exists("blobs/ab/abc")
+    assert not path.exists()
+
+
+def test_cache_hits_do_not_wait_for_downloads(tmp_path) -> None:
+    client = FakeS3Client()
+    backend = S3StorageBackend("bucket", client=client)
+    for key in ["fast", "slow"]:
+        backend.write(key, io.BytesIO(b"content"))
+    cache = ReadThroughCache(backend, tmp_path / "cache")
+    cache.get_local_path("fast")
+
+    downloading = threading.Event()
+    release = threading.Event()
+    get_object = client.get_object
+
+    def slow_get_object(Bucket, Key, Range=None):
+        if Key == "slow":
+            downloading.set()
+            release.wait(5)
+        return get_object(Bucket, Key, Range)
+
+    client.get_object = slow_get_object
+    thread = threading.Thread(target=cache.get_local_path, args=("slow",))
+    thread.start()
+    downloading.wait(5)
+
+    try:
+        assert cache.get_local_path("fast").read_bytes() == b"content"
+        assert thread.is_alive()
+    finally:
+        release.set()
+        thread.join()
+
+    assert (tmp_path / "cache" / "slow").exists()
+
+
+def test_cache_evicts_indexes_with_files(tmp_path) -> None:
+    backend = S3StorageBackend("bucket", client=FakeS3Client())
+    for key in ["a", "b"]:
+        backend.write(key, io.BytesIO(b"x" * 10))
+    cache = ReadThroughCache(backend, tmp_path / "cache", max_size=10)
+
+    path_a = cache.get_local_path("a")
+    index_folder = get_index_folder(str(path_a))
+    index_folder.joinpath("hash").mkdir(parents=True)
+    os.utime(path_a, (0, 0))
+    cache.get_local_path("b")
+
+    assert not path_a.exists()
+    assert not index_folder.exists()
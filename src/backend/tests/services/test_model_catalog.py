@@ -0,0 +1,72 @@
+import json
+import time
+from typing import List
+
+from backend.services.model_catalog import ModelCatalog
+from backend.tests.model_deployments.mock_deployments import MockCohereDeployment
+
+
+class CountingDeployment(MockCohereDeployment):
+    calls = 0
+    models = ["command-r"]
+
+    @classmethod
+    def list_models(cls) -> List[str]:
+        cls.calls += 1
+        if cls.models is None:
+            raise Exception("Network error")
+        return cls.models
+
+
+def wait_for_refresh(catalog: ModelCatalog) -> None:
+    for _ in range(100):
+        if not catalog._refreshing:
+            return
+        time.sleep(0.01)
+
+
+def test_get_models_is_cached() -> None:
+    CountingDeployment.calls = 0
+    CountingDeployment.models = ["command-r"]
+    catalog = ModelCatalog()
+
+    assert catalog.get_models(CountingDeployment) == ["command-r"]
+    assert catalog.get_models(CountingDeployment) == ["command-r"]
+    assert CountingDeployment.calls == 1
+
+
+def test_get_models_refreshes_stale_entries_in_background() -> None:
+    CountingDeployment.calls = 0
+    CountingDeployment.models = ["command-r"]
+    catalog = ModelCatalog(ttl=0)
+
+    assert catalog.get_models(CountingDeployment) == ["command-r"]
+    CountingDeployment.models = ["command-r", "command-r-plus"]
+    # Stale value is served while the refresh runs
+    assert catalog.get_models(CountingDeployment) == ["command-r"]
+    wait_for_refresh(catalog)
+
+    assert catalog.get_models(CountingDeployment) == ["command-r", "command-r-plus"]
+
+
+def test_refresh_keeps_stale_models_on_error() -> None:
+    CountingDeployment.models = ["command-r"]
+    catalog = ModelCatalog()
+    catalog.get_models(CountingDeployment)
+
+    CountingDeployment.models = None
+
+    assert catalog.refresh(CountingDeployment) == ["command-r"]
+
+
+def test_catalog_persists_to_disk(tmp_path) -> None:
+    CountingDeployment.calls = 0
+    CountingDeployment.models = ["command-r"]
+    cache_path = tmp_path / "model_catalog.json"
+
+    ModelCatalog(cache_path=str(cache_path)).get_models(CountingDeployment)
+    assert "command-r" in json.dumps(json.loads(cache_path.read_text()))
+
+    warm_catalog = ModelCatalog(cache_path=str(cache_path))
+    assert warm_catalog.get_models(CountingDeployment) == ["command-r"]
+    assert CountingDeployment.calls == 1
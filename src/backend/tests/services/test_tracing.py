@@ -0,0 +1,67 @@
+import time
+
+from backend.services.metrics import Histogram
+from backend.services.tracing import ChatTrace, chat_stage_duration
+
+
+def test_span_records_duration() -> None:
+    trace = ChatTrace()
+
+    with trace.span("test_span_records_duration"):
+        time.sleep(0.01)
+
+    timings = trace.timings()
+    assert timings["test_span_records_duration"] >= 10
+    assert chat_stage_duration.get(stage="test_span_records_duration") >= 1
+
+
+def test_span_records_duration_on_error() -> None:
+    trace = ChatTrace()
+
+    try:
+        with trace.span("test_span_records_duration_on_error"):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert "test_span_records_duration_on_error" in trace.timings()
+
+
+def test_record_keeps_longest_duration() -> None:
+    trace = ChatTrace()
+
+    trace.record("test_record_keeps_longest_duration", 0.2)
+    trace.record("test_record_keeps_longest_duration", 0.1)
+
+    assert trace.timings() == {"test_record_keeps_longest_duration": 200.0}
+
+
+def test_mark_records_time_since_start() -> None:
+    trace = ChatTrace()
+    time.sleep(0.01)
+
+    trace.mark("test_mark_records_time_since_start")
+
+    assert trace.timings()["test_mark_records_time_since_start"] >= 10
+
+
+def test_trace_ids_are_unique() -> None:
+    assert ChatTrace().trace_id != ChatTrace().trace_id
+    assert ChatTrace("trace").trace_id == "trace"
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram("test_histogram_render", "Test histogram.", buckets=(1, 5))
+    histogram.observe(0.5, stage="a")
+    histogram.observe(3, stage="a")
+
+    assert histogram.get(stage="a") == 2
+    assert histogram.render() == [
+        "# HELP test_histogram_render Test histogram.",
+        "# TYPE test_histogram_render histogram",
+        'test_histogram_render_bucket{stage="a",le="1"} 1',
+        'test_histogram_render_bucket{stage="a",le="5"} 2',
+        'test_histogram_render_bucket{stage="a",le="+Inf"} 2',
+        'test_histogram_render_sum{stage="a"} 3.5',
+        'test_histogram_render_count{stage="a"} 2',
+    ]
@@ -0,0 +1,109 @@
+from sqlalchemy import event
+
+from backend.database_models.citation import Citation
+from backend.database_models.conversation import Conversation
+from backend.database_models.document import Document
+from backend.database_models.file import FileStatus
+from backend.database_models.message import Message, MessageAgent
+from backend.services.turn_writer import TurnWriter
+from backend.tests.factories import get_factory
+
+
+def get_message(conversation_id, user_id, agent, text="") -> Message:
+    return Message(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        text=text,
+        position=0,
+        is_active=True,
+        agent=agent,
+    )
+
+
+def test_write_new_conversation(session, user):
+    conversation = Conversation(id="conversation", user_id=user.id)
+    writer = TurnWriter(conversation, user.id)
+    writer.add_user_message(
+        get_message(conversation.id, user.id, MessageAgent.USER, "Hello")
+    )
+
+    response_message = get_message(conversation.id, user.id, MessageAgent.CHATBOT)
+    response_message.id = "response"
+    document = Document(
+        document_id="doc_0",
+        text="Document",
+        user_id=user.id,
+        conversation_id=conversation.id,
+        message_id=response_message.id,
+    )
+    response_message.documents = [document]
+    response_message.citations = [
+        Citation(
+            text="Doc",
+            user_id=user.id,
+            start=0,
+            end=3,
+            document_ids=["doc_0"],
+            documents=[document],
+        )
+    ]
+
+    assert writer.is_new_conversation
+    writer.write(session, response_message, "Hi there")
+
+    conversation = session.get(Conversation, "conversation")
+    assert conversation.description == "Hi there"
+    assert [message.agent for message in conversation.messages] == [
+        MessageAgent.USER,
+        MessageAgent.CHATBOT,
+    ]
+    response_message = session.get(Message, "response")
+    assert response_message.documents[0].document_id == "doc_0"
+    assert response_message.citations[0].documents[0].document_id == "doc_0"
+
+
+def test_write_existing_conversation_attaches_files(session, user):
+    conversation = get_factory("Conversation", session).create(user_id=user.id)
+    existing_message = get_factory("Message", session).create(
+        conversation_id=conversation.id, user_id=user.id, position=0
+    )
+    attached_file = get_factory("File", session).create(
+        conversation_id=conversation.id,
+        user_id=user.id,
+        message_id=existing_message.id,
+    )
+    file = get_factory("File", session).create(
+        conversation_id=conversation.id,
+        user_id=user.id,
+        message_id=None,
+        status=FileStatus.PENDING,
+    )
+
+    writer = TurnWriter(conversation, user.id)
+    user_message = get_message(conversation.id, user.id, MessageAgent.USER)
+    writer.add_user_message(user_message)
+    writer.attach_files([attached_file.id, file.id])
+
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args[2])
+
+    event.listen(session.bind, "before_cursor_execute", count_statement)
+    try:
+        writer.write(
+            session,
+            get_message(conversation.id, user.id, MessageAgent.CHATBOT),
+            "Updated",
+        )
+    finally:
+        event.remove(session.bind, "before_cursor_execute", count_statement)
+
+    assert not writer.is_new_conversation
+    # One insert for both messages, one update for the files and the description
+    assert len(statements) == 3
+    assert attached_file.message_id == existing_message.id
+    assert file.message_id == user_message.id
+    assert file.status == FileStatus.READY
+    session.refresh(conversation)
+    assert conversation.description == "Updated"
@@ -0,0 +1,167 @@
+import threading
+from types import SimpleNamespace
+
+from backend.crud import conversation as conversation_crud
+from backend.database_models.conversation import Conversation
+from backend.database_models.message import Message, MessageAgent
+from backend.services import write_behind
+from backend.services.chat_history import chat_history_cache
+from backend.services.turn_writer import TurnWriter
+from backend.services.write_behind import WriteBehindQueue
+
+
+class FakeSession:
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.commits = []
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def commit(self):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise Exception("connection lost")
+        self.commits.append(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+class FakeTurnWriter:
+    def __init__(self, name, fail=False, block=None):
+        self.name = name
+        self.conversation_id = name
+        self.fail = fail
+        self.block = block
+
+    def add(self, session, response_message, description):
+        if self.block:
+            self.block.wait()
+        if self.fail:
+            raise Exception("bad turn")
+        session.pending.append(self.name)
+
+
+def submit(write_queue, turn_writer) -> bool:
+    return write_queue.submit(
+        turn_writer, SimpleNamespace(id=turn_writer.name), "description"
+    )
+
+
+def test_writes_turns_in_batches() -> None:
+    session = FakeSession()
+    block = threading.Event()
+    write_queue = WriteBehindQueue(lambda: session, batch_size=10)
+
+    # The first turn blocks the worker so the others are queued together
+    submit(write_queue, FakeTurnWriter("first", block=block))
+    for i in range(3):
+        submit(write_queue, FakeTurnWriter(str(i)))
+    block.set()
+    write_queue.stop()
+
+    assert [name for batch in session.commits for name in batch] == [
+        "first",
+        "0",
+        "1",
+        "2",
+    ]
+    assert len(session.commits) <= 2
+
+
+def test_retries_failed_batch() -> None:
+    session = FakeSession(fail_times=2)
+    write_queue = WriteBehindQueue(lambda: session, max_retries=3, retry_delay=0)
+
+    submit(write_queue, FakeTurnWriter("turn"))
+    write_queue.flush()
+    write_queue.stop()
+
+    assert session.commits == [["turn"]]
+
+
+def test_bad_turn_does_not_drop_batch() -> None:
+    session = FakeSession()
+    block = threading.Event()
+    write_queue = WriteBehindQueue(lambda: session, max_retries=1, retry_delay=0)
+
+    submit(write_queue, FakeTurnWriter("first", block=block))
+    submit(write_queue, FakeTurnWriter("bad", fail=True))
+    submit(write_queue, FakeTurnWriter("good"))
+    block.set()
+    write_queue.stop()
+
+    written = [name for batch in session.commits for name in batch]
+    assert "good" in written
+    assert "bad" not in written
+
+
+def test_submit_returns_false_when_full() -> None:
+    block = threading.Event()
+    write_queue = WriteBehindQueue(lambda: FakeSession(), max_size=1)
+
+    assert submit(write_queue, FakeTurnWriter("first", block=block))
+    # Wait for the worker to take the first turn off the queue
+    while write_queue._queue.qsize():
+        pass
+    assert submit(write_queue, FakeTurnWriter("second"))
+    assert not submit(write_queue, FakeTurnWriter("third"))
+
+    block.set()
+    write_queue.stop()
+
+
+def write_turn(session, conversation, user_id, position) -> None:
+    turn_writer = TurnWriter(conversation, user_id)
+    messages = [
+        Message(
+            conversation_id=turn_writer.conversation_id,
+            user_id=user_id,
+            text=f"{agent.value} {position}",
+            position=position,
+            is_active=True,
+            agent=agent,
+        )
+        for agent in [MessageAgent.USER, MessageAgent.CHATBOT]
+    ]
+    turn_writer.add_user_message(messages[0])
+    write_behind.write_turn(session, turn_writer, messages[1], f"turn {position}")
+
+
+def test_follow_up_turn_of_queued_new_conversation(session, user, monkeypatch):
+    write_queue = WriteBehindQueue(lambda: session)
+    # Keep the turns queued until both are submitted
+    start = write_queue.start
+    write_queue.start = lambda: None
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(write_behind, "write_behind_queue", write_queue)
+
+    write_turn(session, Conversation(id="queued", user_id=user.id), user.id, 0)
+
+    # The next turn finds the conversation and continues its history
+    conversation = conversation_crud.get_conversation(session, "queued", user.id)
+    assert conversation is not None
+    turn_writer = TurnWriter(conversation, user.id)
+    assert not turn_writer.is_new_conversation
+    history = chat_history_cache.get(session, "queued")
+    assert history["next_position"] == 1
+    write_turn(session, conversation, user.id, history["next_position"])
+
+    start()
+    write_queue.stop()
+
+    messages = session.query(Message).filter(Message.conversation_id == "queued")
+    assert sorted((m.position, m.agent) for m in messages) == [
+        (0, MessageAgent.CHATBOT),
+        (0, MessageAgent.USER),
+        (1, MessageAgent.CHATBOT),
+        (1, MessageAgent.USER),
+    ]
+    conversation = session.get(Conversation, "queued")
+    assert conversation.description == "turn 1"
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from backend.schemas.tool import ManagedTool
+from backend.tools.cache import (
+    CachedTool,
+    SQLiteResultStore,
+    ToolResultCache,
+    cache_tool,
+    get_cache_key,
+)
+
+
+class MockTool:
+    def __init__(self, delay: float = 0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def call(self, parameters: dict, **kwargs: Any) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception("Tool failed")
+        return [{"text": parameters["query"]}]
+
+
+def get_cached_tool(tool: MockTool, ttl: float = 60, **kwargs: Any) -> CachedTool:
+    return CachedTool(tool, "mock", {}, ttl, ToolResultCache(**kwargs))
+
+
+def test_get_cache_key_normalizes_parameters() -> None:
+    key = get_cache_key("wikipedia", {"query": "  Cohere   AI "}, {"chunk_size": 300})
+
+    assert key == get_cache_key(
+        "wikipedia", {"query": "cohere ai"}, {"chunk_size": 300}
+    )
+    assert key != get_cache_key("wikipedia", {"query": "cohere"}, {"chunk_size": 300})
+    assert key != get_cache_key(
+        "wikipedia", {"query": "cohere ai"}, {"chunk_size": 500}
+    )
+    assert key != get_cache_key("arxiv", {"query": "cohere ai"}, {"chunk_size": 300})
+
+
+def test_cached_tool_hit() -> None:
+    tool = MockTool()
+    cached_tool = get_cached_tool(tool)
+
+    assert cached_tool.call({"query": "Cohere"}) == [{"text": "Cohere"}]
+    assert cached_tool.call({"query": "cohere"}) == [{"text": "Cohere"}]
+    assert tool.calls == 1
+    assert cached_tool.retriever_name == "MockTool"
+
+
+def test_cached_tool_expires() -> None:
+    tool = MockTool()
+    cached_tool = get_cached_tool(tool, ttl=0.05)
+
+    cached_tool.call({"query": "cohere"})
+    time.sleep(0.1)
+    cached_tool.call({"query": "cohere"})
+
+    assert tool.calls == 2
+
+
+def test_cached_tool_does_not_cache_failures() -> None:
+    tool = MockTool(fail=True)
+    cached_tool = get_cached_tool(tool)
+
+    for _ in range(2):
+        with pytest.raises(Exception, match="Tool failed"):
+            cached_tool.call({"query": "cohere"})
+
+    assert tool.calls == 2
+
+
+def test_cached_tool_coalesces_concurrent_misses() -> None:
+    tool = MockTool(delay=0.2)
+    cached_tool = get_cached_tool(tool)
+    results = []
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cached_tool.call({"query": "cohere"}))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tool.calls == 1
+    assert results == [[{"text": "cohere"}]] * 5
+
+
+def test_cached_tool_shared_store(tmp_path) -> None:
+    store = SQLiteResultStore(tmp_path / "tools.sqlite3")
+    tool = MockTool()
+
+    get_cached_tool(tool, store=store).call({"query": "cohere"})
+    # A new in-memory cache, as in another worker, reads the shared store
+    result = get_cached_tool(tool, store=store).call({"query": "cohere"})
+
+    assert result == [{"text": "cohere"}]
+    assert tool.calls == 1
+    store.close()
+
+
+def test_sqlite_result_store_expires(tmp_path) -> None:
+    store = SQLiteResultStore(tmp_path / "tools.sqlite3")
+
+    store.set("key", [{"text": "cohere"}], ttl=-1)
+
+    assert store.get("key") is None
+    store.close()
+
+
+def test_cache_tool_disabled_by_ttl() -> None:
+    tool = MockTool()
+    managed_tool = ManagedTool(name="mock", implementation=MockTool, cache_ttl=0)
+
+    assert cache_tool(managed_tool, tool) is tool
+
+
+def test_cache_tool_enabled(monkeypatch) -> None:
+    monkeypatch.setattr("backend.tools.cache.TOOL_CACHE_ENABLED", True)
+    tool = MockTool()
+    managed_tool = ManagedTool(name="mock", implementation=MockTool, cache_ttl=60)
+
+    cached_tool = cache_tool(managed_tool, tool)
+
+    assert isinstance(cached_tool, CachedTool)
+    assert cached_tool.ttl == 60
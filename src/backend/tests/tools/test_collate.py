@@ -1,4 +1,7 @@
 import os
+import threading
+import time
+from types import SimpleNamespace
 
 import pytest
 
@@ -24,6 +27,134 @@ def test_rerank() -> None:
     }
 
 
+class MockRerankDeployment:
+    """
+    Scores documents by the number of characters they share with the query.
+    """
+
+    rerank_enabled = True
+
+    def __init__(self, delay: float = 0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def invoke_rerank(self, query, documents, **kwargs):
+        with self.lock:
+            self.calls.append((query, documents, kwargs))
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception("Rerank failed")
+
+        results = [
+            SimpleNamespace(index=i, relevance_score=len(set(query) & set(document)))
+            for i, document in enumerate(documents)
+        ]
+        results.sort(key=lambda x: x.relevance_score, reverse=True)
+        return SimpleNamespace(results=results[: kwargs.get("top_n")])
+
+
+def test_rerank_sorts_by_relevance() -> None:
+    model = MockRerankDeployment()
+    input = {
+        "abc": [{"text": "xyz"}, {"text": "abx"}, {"text": "abc"}],
+    }
+
+    assert collate.rerank(input, model, top_n=0) == {
+        "abc": [{"text": "abc"}, {"text": "abx"}, {"text": "xyz"}],
+    }
+
+
+def test_rerank_runs_queries_concurrently() -> None:
+    model = MockRerankDeployment(delay=0.2)
+    input = {query: [{"text": query}] for query in ["q1", "q2", "q3"]}
+
+    start = time.perf_counter()
+    result = collate.rerank(input, model, top_n=0)
+    elapsed = time.perf_counter() - start
+
+    assert list(result) == ["q1", "q2", "q3"]
+    assert elapsed < 0.5
+
+
+def test_rerank_sends_duplicate_texts_once() -> None:
+    model = MockRerankDeployment()
+    input = {
+        "abc": [
+            {"text": "abc", "url": "1"},
+            {"text": "xyz"},
+            {"text": "abc", "url": "2"},
+        ],
+    }
+
+    result = collate.rerank(input, model, top_n=0)
+
+    assert model.calls[0][1] == ["abc", "xyz"]
+    assert result == {"abc": [{"text": "abc", "url": "1"}, {"text": "xyz"}]}
+
+
+def test_rerank_sends_texts_once_across_queries() -> None:
+    model = MockRerankDeployment()
+    input = {
+        "abc": [{"text": "abx"}, {"text": "xyz"}],
+        "xyz": [{"text": "abx", "url": "2"}, {"text": "xyz"}, {"text": "xya"}],
+    }
+
+    result = collate.rerank(input, model, top_n=0)
+
+    assert sorted(call[:2] for call in model.calls) == [
+        ("abc", ["abx", "xyz"]),
+        ("xyz", ["xya"]),
+    ]
+    # Shared texts keep the score of the query they were sent with
+    assert result == {
+        "abc": [{"text": "abx"}, {"text": "xyz"}],
+        "xyz": [{"text": "abx", "url": "2"}, {"text": "xya"}, {"text": "xyz"}],
+    }
+
+
+def test_rerank_applies_top_n() -> None:
+    model = MockRerankDeployment()
+    input = {
+        "abc": [{"text": "xyz"}, {"text": "abx"}, {"text": "abc"}],
+    }
+
+    result = collate.rerank(input, model, top_n=2)
+
+    assert model.calls[0][1] == ["xyz", "abx", "abc"]
+    assert result == {"abc": [{"text": "abc"}, {"text": "abx"}]}
+
+
+def test_rerank_falls_back_to_title_and_snippet() -> None:
+    model = MockRerankDeployment()
+    input = {
+        "abc": [
+            {"url": "no text"},
+            {"snippet": "xyz"},
+            {"title": "abc", "text": ""},
+        ],
+    }
+
+    result = collate.rerank(input, model, top_n=0)
+
+    assert model.calls[0][1] == ["xyz", "abc"]
+    assert result == {
+        "abc": [
+            {"title": "abc", "text": ""},
+            {"snippet": "xyz"},
+            {"url": "no text"},
+        ],
+    }
+
+
+def test_rerank_keeps_documents_when_rerank_fails() -> None:
+    model = MockRerankDeployment(fail=True)
+    input = {"abc": [{"text": "xyz"}, {"text": "abc"}]}
+
+    assert collate.rerank(input, model, top_n=0) == input
+
+
 def test_interleave() -> None:
     input = {
         "q1": [{"q1a": "a"}, {"q1b": "b"}, {"q1c": "c"}],
@@ -41,3 +172,61 @@ def test_interleave() -> None:
         {"q2c": "c"},
         {"q3c": "c"},
     ]
+
+
+def test_fuse_ranks_documents_found_by_several_queries_first() -> None:
+    input = {
+        "q1": [{"text": "a"}, {"text": "b"}, {"text": "c"}],
+        "q2": [{"text": "d"}, {"text": "c"}],
+    }
+
+    assert collate.fuse(input) == [
+        {"text": "c"},
+        {"text": "a"},
+        {"text": "d"},
+        {"text": "b"},
+    ]
+
+
+def test_fuse_deduplicates_by_url_and_text() -> None:
+    input = {
+        "q1": [{"url": "u1", "text": "Chunk one"}, {"url": "u1", "text": "Chunk two"}],
+        "q2": [{"url": "u1", "text": "chunk  one"}, {"url": "u2", "text": "Chunk one"}],
+    }
+
+    assert collate.fuse(input) == [
+        {"url": "u1", "text": "Chunk one"},
+        {"url": "u1", "text": "Chunk two"},
+        {"url": "u2", "text": "Chunk one"},
+    ]
+
+
+def test_fuse_applies_budget() -> None:
+    input = {
+        "q1": [{"text": "aaaa"}, {"text": "bbbbbbbb"}, {"text": "cc"}, {"text": "d"}],
+    }
+
+    assert collate.fuse(input, max_chars=7) == [
+        {"text": "aaaa"},
+        {"text": "cc"},
+        {"text": "d"},
+    ]
+    assert collate.fuse(input, max_documents=2) == [
+        {"text": "aaaa"},
+        {"text": "bbbbbbbb"},
+    ]
+
+
+def test_combine_documents_defaults_to_interleave() -> None:
+    model = SimpleNamespace(rerank_enabled=False)
+    input = {"q1": [{"text": "a"}, {"text": "b"}], "q2": [{"text": "a"}]}
+
+    assert collate.combine_documents(input, model) == [
+        {"text": "a"},
+        {"text": "a"},
+        {"text": "b"},
+    ]
+    assert collate.combine_documents(input, model, mode="fusion") == [
+        {"text": "a"},
+        {"text": "b"},
+    ]
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -155,3 +156,38 @@ def test_vector_db_retriever_no_docs() -> None:
         result = retriever.call({"query": query})
 
     assert result == []
+
+
+def test_vector_db_retriever_reuses_persisted_index(tmp_path) -> None:
+    file_path = tmp_path / "file.pdf"
+    file_path.write_bytes(b"content")
+    docs = [Document(page_content="Mariana Trench")]
+
+    def from_documents(documents, embedding, persist_directory):
+        Path(persist_directory).mkdir(parents=True)
+        Path(persist_directory, "chroma.sqlite3").touch()
+        return db
+
+    db = MagicMock()
+    db.as_retriever().get_relevant_documents.return_value = docs
+    with patch("backend.tools.lang_chain.CohereEmbeddings"), patch(
+        "backend.tools.lang_chain.PyPDFLoader"
+    ) as mock_loader, patch("backend.tools.lang_chain.Chroma") as mock_chroma:
+        mock_chroma.from_documents.side_effect = from_documents
+        mock_chroma.return_value = db
+
+        retriever = LangChainVectorDBRetriever(str(file_path))
+        first = retriever.call({"query": "trench"})
+        second = LangChainVectorDBRetriever(str(file_path)).call({"query": "ocean"})
+
+        assert first == second == [{"text": "Mariana Trench"}]
+        assert mock_loader.call_count == 1
+        assert mock_chroma.from_documents.call_count == 1
+        persist_directory = mock_chroma.call_args.kwargs["persist_directory"]
+
+        # A new version of the file is indexed again and replaces the old index
+        file_path.write_bytes(b"new content")
+        LangChainVectorDBRetriever(str(file_path)).call({"query": "trench"})
+
+        assert mock_chroma.from_documents.call_count == 2
+        assert not Path(persist_directory).exists()
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from distutils.util import strtobool
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from backend.schemas.tool import ManagedTool
+from backend.services.cache import LRUCache
+from backend.services.logger import get_logger
+from backend.services.metrics import registry
+
+# Cache the results of data loader tools such as Wikipedia or internet search, off by
+# default since cached results can be up to a TTL old
+TOOL_CACHE_ENABLED = bool(strtobool(os.getenv("TOOL_CACHE_ENABLED", "false")))
+# Default seconds a result stays valid, overridden by the cache_ttl of a tool
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "600"))
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+# Optional SQLite file shared by the workers of a host and kept across restarts
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH")
+
+logger = get_logger()
+
+tool_cache_requests = registry.counter(
+    "tool_cache_requests_total",
+    "Number of cached tool calls by tool and result: hit, shared_hit, coalesced or miss.",
+)
+
+
+def normalize_parameters(value: Any) -> Any:
+    """
+    Normalize tool parameters so equivalent queries share a cache entry.
+
+    Strings are lowercased with their whitespace collapsed, dicts are sorted by key.
+
+    Args:
+        value (Any): Parameters, or a value nested in them.
+
+    Returns:
+        Any: Normalized value.
+    """
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {
+            str(key): normalize_parameters(value[key]) for key in sorted(value, key=str)
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize_parameters(item) for item in value]
+    return value
+
+
+def get_cache_key(tool_name: str, parameters: dict, tool_kwargs: dict) -> str:
+    """
+    Get the cache key of a tool call.
+
+    Args:
+        tool_name (str): Tool name.
+        parameters (dict): Call parameters, for example the search query.
+        tool_kwargs (dict): Keyword arguments the tool was created with.
+
+    Returns:
+        str: Hex digest of the tool name and its normalized arguments.
+    """
+    payload = json.dumps(
+        [
+            tool_name,
+            normalize_parameters(parameters),
+            normalize_parameters(tool_kwargs),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SQLiteResultStore:
+    """
+    On-disk tier of the tool cache, shared by the processes using the same file.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Args:
+            path (str | Path): SQLite database file, created if missing.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tool_results "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Any:
+        """
+        Get a result if present and not expired.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Any: Cached result, None if missing or expired.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM tool_results WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Store a result, expired rows are deleted on the way.
+
+        Args:
+            key (str): Cache key.
+            value (Any): JSON serializable result.
+            ttl (float): Seconds the result stays valid.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl),
+            )
+            self._connection.execute(
+                "DELETE FROM tool_results WHERE expires_at <= ?", (now,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ToolResultCache:
+    """
+    Two-tier cache of tool results: an in-process LRU cache in front of an optional
+    shared store.
+
+    Concurrent misses on the same key are coalesced, the first caller runs the
+    tool and the others wait for its result. Failed calls are not cached.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TOOL_CACHE_SIZE,
+        store: SQLiteResultStore | None = None,
+    ):
+        """
+        Args:
+            max_size (int): Maximum number of results kept in memory.
+            store (SQLiteResultStore | None): Shared tier, any object with get and set.
+        """
+        # Entries hold their own expiry since the TTL differs per tool
+        self.memory = LRUCache("tool_results", max_size=max_size)
+        self.store = store
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_call(
+        self, tool_name: str, key: str, ttl: float, call: Callable[[], Any]
+    ) -> Any:
+        """
+        Get a cached result, or call the tool and cache its result.
+
+        Args:
+            tool_name (str): Tool name, used as the metrics label.
+            key (str): Cache key.
+            ttl (float): Seconds the result stays valid.
+            call (Callable[[], Any]): Runs the tool.
+
+        Returns:
+            Any: Tool result.
+        """
+        entry = self.memory.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            tool_cache_requests.inc(tool=tool_name, result="hit")
+            return entry[0]
+
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            tool_cache_requests.inc(tool=tool_name, result="coalesced")
+            return future.result()
+
+        try:
+            value = self._get_shared(key)
+            if value is not None:
+                tool_cache_requests.inc(tool=tool_name, result="shared_hit")
+            else:
+                tool_cache_requests.inc(tool=tool_name, result="miss")
+                value = call()
+                self._set_shared(key, value, ttl)
+
+            self.memory.set(key, (value, time.monotonic() + ttl))
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> dict[str, float]:
+        return self.memory.stats()
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def _get_shared(self, key: str) -> Any:
+        if self.store is None:
+            return None
+
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read the tool cache store: {str(e)}")
+            return None
+
+    def _set_shared(self, key: str, value: Any, ttl: float) -> None:
+        if self.store is None:
+            return
+
+        try:
+            self.store.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Failed to write the tool cache store: {str(e)}")
+
+
+class CachedTool:
+    """
+    Wraps a tool implementation so its calls are served from the tool cache.
+    """
+
+    def __init__(
+        self,
+        tool: Any,
+        name: str,
+        tool_kwargs: dict,
+        ttl: float,
+        cache: ToolResultCache,
+    ):
+        """
+        Args:
+            tool (Any): Tool implementation.
+            name (str): Tool name, part of the cache key.
+            tool_kwargs (dict): Keyword arguments the tool was created with.
+            ttl (float): Seconds a result stays valid.
+            cache (ToolResultCache): Result cache.
+        """
+        self.tool = tool
+        self.name = name
+        self.tool_kwargs = tool_kwargs
+        self.ttl = ttl
+        self.cache = cache
+        # Retrievers are logged and traced by class name, keep the wrapped one
+        self.retriever_name = tool.__class__.__name__
+
+    def call(self, parameters: dict, **kwargs: Any) -> List[Dict[str, Any]]:
+        key = get_cache_key(self.name, {**parameters, **kwargs}, self.tool_kwargs)
+        return self.cache.get_or_call(
+            self.name, key, self.ttl, lambda: self.tool.call(parameters, **kwargs)
+        )
+
+
+_tool_cache = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """
+    Get the tool cache of the worker.
+
+    Returns:
+        ToolResultCache: Tool cache, backed by TOOL_CACHE_PATH when set.
+    """
+    global _tool_cache
+
+    if _tool_cache is None:
+        with _tool_cache_lock:
+            if _tool_cache is None:
+                store = SQLiteResultStore(TOOL_CACHE_PATH) if TOOL_CACHE_PATH else None
+                _tool_cache = ToolResultCache(store=store)
+
+    return _tool_cache
+
+
+def cache_tool(managed_tool: ManagedTool, tool: Any) -> Any:
+    """
+    Wrap a data loader tool with the tool cache.
+
+    Args:
+        managed_tool (ManagedTool): Tool configuration, its cache_ttl overrides TOOL_CACHE_TTL.
+        tool (Any): Tool implementation.
+
+    Returns:
+        Any: Cached tool, or the implementation if caching is disabled for it.
+    """
+    ttl = (
+        managed_tool.cache_ttl if managed_tool.cache_ttl is not None else TOOL_CACHE_TTL
+    )
+    if not TOOL_CACHE_ENABLED or ttl <= 0:
+        return tool
+
+    return CachedTool(
+        tool, managed_tool.name, managed_tool.kwargs, ttl, get_tool_cache()
+    )
@@ -1,4 +1,5 @@
 import os
+import shutil
 from typing import Any, Dict, List
 
 from langchain.text_splitter import CharacterTextSplitter
@@ -7,8 +8,17 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.retrievers import WikipediaRetriever
 from langchain_community.vectorstores import Chroma
 
+from backend.services.file.index import (
+    get_index_lock,
+    get_index_path,
+    is_index_complete,
+    mark_index_complete,
+)
 from backend.tools.base import BaseTool
 
+# Database file Chroma writes in the persist directory once the collection is stored
+CHROMA_DATABASE_FILE = "chroma.sqlite3"
+
 """
 Plug in your lang chain retrieval implementation here. 
 We have an example flows with wikipedia and vector DBs.
@@ -65,16 +75,51 @@ class LangChainVectorDBRetriever(BaseTool):
         return cls.cohere_api_key is not None
 
     def call(self, parameters: dict, **kwargs: Any) -> List[Dict[str, Any]]:
-        cohere_embeddings = CohereEmbeddings(cohere_api_key=self.cohere_api_key)
-
-        # Load text files and split into chunks
-        loader = PyPDFLoader(self.filepath)
-        text_splitter = CharacterTextSplitter(chunk_size=300, chunk_overlap=0)
-        pages = loader.load_and_split(text_splitter)
-
-        # Create a vector store from the documents
-        db = Chroma.from_documents(documents=pages, embedding=cohere_embeddings)
+        db = self.get_vector_store()
         query = parameters.get("query", "")
         input_docs = db.as_retriever().get_relevant_documents(query)
 
         return [dict({"text": doc.page_content}) for doc in input_docs]
+
+    def ingest(self) -> None:
+        """
+        Build the index of the file ahead of the first query.
+        """
+        self.get_vector_store()
+
+    def get_vector_store(self) -> Chroma:
+        """
+        Get the vector store of the file, embedding it on first use.
+
+        The index is persisted on disk and keyed by the file path and content hash,
+        so later calls, from any query or turn, only embed the query.
+
+        Returns:
+            Chroma: Vector store of the file.
+        """
+        cohere_embeddings = CohereEmbeddings(cohere_api_key=self.cohere_api_key)
+        index_path = get_index_path(self.filepath)
+
+        with get_index_lock(index_path):
+            if is_index_complete(index_path):
+                return Chroma(
+                    persist_directory=str(index_path),
+                    embedding_function=cohere_embeddings,
+                )
+
+            # Load text files and split into chunks
+            loader = PyPDFLoader(self.filepath)
+            text_splitter = CharacterTextSplitter(chunk_size=300, chunk_overlap=0)
+            pages = loader.load_and_split(text_splitter)
+
+            # Create a vector store from the documents, persisted for later calls
+            shutil.rmtree(index_path, ignore_errors=True)
+            db = Chroma.from_documents(
+                documents=pages,
+                embedding=cohere_embeddings,
+                persist_directory=str(index_path),
+            )
+            if index_path.joinpath(CHROMA_DATABASE_FILE).exists():
+                mark_index_complete(index_path)
+
+            return db
@@ -24,6 +24,7 @@ export type { DeleteUser } from './models/DeleteUser';
 export type { Deployment } from './models/Deployment';
 export type { Document } from './models/Document';
 export type { File } from './models/File';
+export { FileStatus } from './models/FileStatus';
 export type { HTTPValidationError } from './models/HTTPValidationError';
 export type { LangchainChatRequest } from './models/LangchainChatRequest';
 export type { ListFile } from './models/ListFile';
@@ -2,6 +2,8 @@
 /* istanbul ignore file */
 /* tslint:disable */
 /* eslint-disable */
+import type { FileStatus } from './FileStatus';
+
 export type File = {
   id: string;
   created_at: string;
@@ -11,4 +13,5 @@ export type File = {
   file_name: string;
   file_path: string;
   file_size?: number;
+  status?: FileStatus;
 };
@@ -21,4 +21,6 @@ export type StreamEnd = {
   search_queries?: Array<SearchQuery>;
   tool_calls?: Array<ToolCall>;
   finish_reason: string;
+  trace_id?: string | null;
+  timings?: Record<string, number> | null;
 };
@@ -350,13 +350,13 @@ export class DefaultService {
   }
   /**
    * Get Conversation
-   * "
    * Get a conversation by ID.
    *
    * Args:
    * conversation_id (str): Conversation ID.
    * session (DBSessionDep): Database session.
    * request (Request): Request object.
+   * messages_limit (int | None): Maximum number of most recent messages to return.
    *
    * Returns:
    * Conversation: Conversation with the given ID.
@@ -368,8 +368,10 @@ export class DefaultService {
    */
   public static getConversationV1ConversationsConversationIdGet({
     conversationId,
+    messagesLimit,
   }: {
     conversationId: string;
+    messagesLimit?: number | null;
   }): CancelablePromise<Conversation> {
     return __request(OpenAPI, {
       method: 'GET',
@@ -377,6 +379,9 @@ export class DefaultService {
       path: {
         conversation_id: conversationId,
       },
+      query: {
+        messages_limit: messagesLimit,
+      },
       errors: {
         422: `Validation Error`,
       },
@@ -455,25 +460,35 @@ export class DefaultService {
   }
   /**
    * List Conversations
-   * List all conversations.
+   * List all conversations, most recently updated first.
+   *
+   * The cursor of the next page is returned in the X-Next-Cursor header when
+   * there may be more conversations.
    *
    * Args:
    * offset (int): Offset to start the list.
    * limit (int): Limit of conversations to be listed.
+   * cursor (str | None): Cursor of the page, from the X-Next-Cursor header of the previous page.
    * session (DBSessionDep): Database session.
    * request (Request): Request object.
+   * response (Response): Response object.
    *
    * Returns:
    * list[ConversationWithoutMessages]: List of conversations.
+   *
+   * Raises:
+   * HTTPException: If the cursor is invalid.
    * @returns ConversationWithoutMessages Successful Response
    * @throws ApiError
    */
   public static listConversationsV1ConversationsGet({
     offset,
     limit = 100,
+    cursor,
   }: {
     offset?: number;
     limit?: number;
+    cursor?: string | null;
   }): CancelablePromise<Array<ConversationWithoutMessages>> {
     return __request(OpenAPI, {
       method: 'GET',
@@ -481,6 +496,7 @@ export class DefaultService {
       query: {
         offset: offset,
         limit: limit,
+        cursor: cursor,
       },
       errors: {
         422: `Validation Error`,